@@ -1,50 +1,237 @@
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.offline as pyo
+import sys
 import numpy as np
-from datetime import datetime
+import traceback
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from data_cache import load_cached_frame, save_cached_frame, default_cache_dir
+from ingest import prepare_frame, read_source, load_streamed_frame, DEFAULT_CHUNK_SIZE
+from aggregates import AggregateCube
+from geography import GeoHierarchy
+from slice_index import SliceIndex, split_by
+from incremental import BuildManifest, depends_on, chart_slices, slice_fingerprint, method_fingerprint, helpers_fingerprint, input_fingerprints
+from profiling import NULL_PROFILER, profiled, output_size
+
+# Plotting, export, map, forecasting and serving modules are imported where they are
+# used, so a run only loads the subsystems it needs (plotly.graph_objects and the
+# scipy-backed reconciliation are the slow ones)
+
+# Dashboard being rendered inside a chart worker process (see generate_all_charts)
+_worker_dashboard = None
+
+def _init_chart_worker(dashboard):
+    global _worker_dashboard
+    _worker_dashboard = dashboard
+
+def _build_chart_in_worker(chart_name, exporter):
+    return _worker_dashboard.build_chart(chart_name, exporter)
+
+# Files and settings the region map reads besides the data (see depends_on)
+def _map_files():
+    from geo_assets import DEFAULT_GEOJSON
+    return [DEFAULT_GEOJSON]
+
+def _map_settings():
+    from geo_assets import DEFAULT_TOLERANCE, DEFAULT_DIGITS, GEO_ASSET_VERSION
+    from name_index import REGION_ALIASES, FUZZY_CUTOFF
+    return {'tolerance': DEFAULT_TOLERANCE, 'digits': DEFAULT_DIGITS, 'version': GEO_ASSET_VERSION,
+            'aliases': REGION_ALIASES, 'fuzzy_cutoff': FUZZY_CUTOFF}
 
 class GDPAnalysisDashboard:
-    def __init__(self, excel_file='cleaned_data.xlsx'):
+    # Output file name -> chart method, in dashboard order
+    CHART_METHODS = {
+        # By Region Tab
+        'region_top_industries': 'top_thriving_industries_by_region',
+        'region_gdp_contribution': 'gdp_contribution_per_region',
+        'region_yearly_gdp': 'total_gdp_by_region_yearly',
+        'region_gdp_trends': 'regional_gdp_trends',
+        'region_growth_rate': 'growth_rate_calculation',
+        'province_contribution': 'province_contribution_to_regional_gdp',
+        
+        # By Industry Tab
+        'industry_top_regions': 'top_regions_by_industry',
+        'industry_lowest_regions': 'lowest_regions_by_industry',
+        'national_industry_composition': 'national_gdp_composition_by_industry',
+        'industry_trends': 'gdp_trend_by_industry',
+        'regions_industries_heatmap': 'gdp_heatmap_regions_vs_industries',
+        
+        # Growth Tab
+        'two_year_growth': 'two_year_growth_comparison',
+        'growth_trends': 'growth_rate_over_time_by_region',
+        'fastest_growing_regions': 'fastest_growing_vs_shrinking_regions',
+        'industry_growth_leaders': 'industry_growth_leaders',
+        
+        # Percent Share Tab
+        'province_share_timeline': 'province_gdp_share_within_region',
+        'share_change_over_time': 'change_in_percent_share_over_time',
+        'growth_gap_analysis': 'province_vs_regional_growth_gap',
+        
+        # Map Tab
+        'regional_gdp_map': 'regional_gdp_map'
+    }
+    
+    # Combined dashboard tab -> charts shown on it
+    CHART_TABS = {
+        'RegionTab': ['region_top_industries', 'region_gdp_contribution', 'region_yearly_gdp', 'region_gdp_trends', 'region_growth_rate', 'province_contribution'],
+        'IndustryTab': ['industry_top_regions', 'industry_lowest_regions', 'national_industry_composition', 'industry_trends', 'regions_industries_heatmap'],
+        'GrowthTab': ['two_year_growth', 'growth_trends', 'fastest_growing_regions', 'industry_growth_leaders'],
+        'ShareTab': ['province_share_timeline', 'share_change_over_time', 'growth_gap_analysis'],
+        'MapTab': ['regional_gdp_map']
+    }
+    
+    def __init__(self, excel_file='cleaned_data.xlsx', use_cache=True, cache_dir=None, compact_dropdowns=False,
+                 streaming=False, chunk_size=DEFAULT_CHUNK_SIZE, metrics=None, profiler=None):
         """
         Initialize the GDP Analysis Dashboard
         Reads data from Excel file and prepares it for analysis
+        The prepared frame is cached in a columnar .npz next to the workbook, so warm
+        starts skip Excel parsing; the cache rebuilds itself when the workbook changes
+        With compact_dropdowns=True the dropdown charts carry one data table and swap
+        data client-side instead of toggling one hidden trace per option
+        With streaming=True the workbook (or a .csv) is read chunk_size rows at a time
+        into a chunked columnar store, so peak memory during ingestion stays bounded;
+        metrics (e.g. ['GDP']) keeps only those Metric rows, dropping the rest per chunk
+        Pass a profiling.Profiler to record time and memory per stage (load, prepare,
+        aggregates, each chart and HTML file, the combined dashboard)
         """
-        self.df = pd.read_excel(excel_file)
-        self.prepare_data()
-        
+        self.excel_file = excel_file
+        self.compact_dropdowns = compact_dropdowns
+        self.metrics = metrics
+        self.profiler = profiler or NULL_PROFILER
+        self._aggregates = None
+        self._slice_index = None
+        self._geography = None
+        self.geometry_url = None
+        
+        if streaming:
+            with self.profiler.stage('load', 'io', streaming=True):
+                self.df = load_streamed_frame(excel_file, metrics, chunk_size, cache_dir)
+            print(f"Loaded prepared data in chunks of {chunk_size} rows from {excel_file}")
+            self.describe_data()
+            return
+        
+        # The frame cache holds every metric, so a metric filter reads the workbook directly
+        use_cache = use_cache and metrics is None
+        with self.profiler.stage('load', 'io') as record:
+            cached = load_cached_frame(excel_file, cache_dir) if use_cache else None
+            record['cached'] = cached is not None
+            if cached is None:
+                raw = read_source(excel_file)
+        
+        if cached is not None:
+            self.df = cached
+            print(f"Loaded prepared data from cache for {excel_file}")
+            self.describe_data()
+        else:
+            self.df = raw
+            self.prepare_data()
+            if use_cache:
+                save_cached_frame(self.df, excel_file, cache_dir)
+        
+    @classmethod
+    def from_frame(cls, df, compact_dropdowns=False, metrics=None, profiler=None):
+        """
+        Build a dashboard from a raw frame with the cleaned_data.xlsx columns
+        instead of reading a file (e.g. synthetic data in benchmark.py)
+        """
+        dashboard = cls.__new__(cls)
+        dashboard.excel_file = None
+        dashboard.compact_dropdowns = compact_dropdowns
+        dashboard.metrics = metrics
+        dashboard.profiler = profiler or NULL_PROFILER
+        dashboard._aggregates = None
+        dashboard._slice_index = None
+        dashboard._geography = None
+        dashboard.geometry_url = None
+        dashboard.df = df
+        dashboard.prepare_data()
+        return dashboard
+        
+    @profiled('prepare')
     def prepare_data(self):
         """
         Clean and prepare data for analysis
         """
-        # Convert Year columns to numeric if they're not already
-        self.df['Start_Year'] = pd.to_numeric(self.df['Start_Year'], errors='coerce')
-        self.df['End_Year'] = pd.to_numeric(self.df['End_Year'], errors='coerce')
-        self.df['Value'] = pd.to_numeric(self.df['Value'], errors='coerce')
+        # Numeric year/value columns, no rows missing critical data, categorical text
+        # dimensions; the same steps the streaming loader applies to each chunk
+        self.df = prepare_frame(self.df, self.metrics)
         
-        # Remove rows with missing critical data
-        self.df = self.df.dropna(subset=['Value', 'Start_Year'])
+        self.describe_data()
         
+    def describe_data(self):
+        """
+        Print a short summary of the loaded data
+        """
         print(f"Data loaded successfully: {len(self.df)} records")
-        print(f"Regions: {self.df['Region'].unique()}")
-        print(f"Industries: {self.df['Industry'].unique()}")
+        print(f"Regions: {self.df['Region'].unique().tolist()}")
+        print(f"Industries: {self.df['Industry'].unique().tolist()}")
+        
+    @property
+    def aggregates(self):
+        """
+        Shared Region x Industry x Location x Year aggregate cube, built on first use
+        All chart methods read their rollups and growth rates from here
+        """
+        if self._aggregates is None:
+            with self.profiler.stage('aggregates'):
+                self._aggregates = AggregateCube(self.df)
+        return self._aggregates
+    
+    @property
+    def geography(self):
+        """
+        GeoHierarchy of the prepared rows (level codes, parent links, subtree totals), built on first use
+        """
+        if self._geography is None:
+            with self.profiler.stage('geography'):
+                self._geography = GeoHierarchy(self.df)
+        return self._geography
+    
+    @property
+    def slice_index(self):
+        """
+        SliceIndex over the prepared rows (level, Region, Industry, Start_Year), built on first use
+        """
+        if self._slice_index is None:
+            with self.profiler.stage('slice_index'):
+                self._slice_index = SliceIndex(self.df, self.geography.row_levels)
+        return self._slice_index
+    
+    def warm_up(self):
+        """
+        Build the shared aggregate cube and row index now rather than on first use,
+        so chart workers started afterwards all begin with them
+        Returns (aggregates, slice_index)
+        """
+        return self.aggregates, self.slice_index
+    
+    def query(self, region=None, industry=None, years=None, level=None, location=None):
+        """
+        Prepared rows matching every given filter, in their original order
+        Each filter takes one value or a list (None leaves it open); level is one of
+        geography.LEVELS ('region' for the region totals, 'province' for provinces and
+        cities), and location filters
+        Location_Name. Resolved through slice_index, so only the matching rows are
+        touched and copied, e.g. dash.query(region='Region I (Ilocos Region)',
+        industry='Construction', years=[2022, 2023], level='province')
+        """
+        return self.slice_index.query(region, industry, years, level, location)
         
     # ==================== BY REGION TAB CHARTS ====================
     
+    @depends_on('all')
     def top_thriving_industries_by_region(self):
         """
         Chart 1: Top Thriving Industries in Each Region
         Creates a grouped bar chart showing top industries per region
         """
+        import plotly.express as px
+        from ranking import top_n
         # Get latest year data for each region-industry combination
-        latest_data = self.df.loc[self.df.groupby(['Region', 'Industry'])['Start_Year'].idxmax()]
+        latest_data = top_n(self.df, ['Region', 'Industry'], 'Start_Year', k=1)
         
         # Get top 3 industries per region by GDP value
-        top_industries = latest_data.groupby('Region').apply(
-            lambda x: x.nlargest(3, 'Value')
-        ).reset_index(drop=True)
+        top_industries = top_n(latest_data, 'Region', 'Value', k=3).reset_index(drop=True)
         
         fig = px.bar(
             top_industries,
@@ -64,14 +251,16 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('latest_year')
     def gdp_contribution_per_region(self):
         """
         Chart 2: GDP Contribution per Region (Pie Chart)
         Shows regional contribution to total national GDP
         """
+        import plotly.express as px
         # Sum GDP by region for latest available year
-        latest_year = self.df['Start_Year'].max()
-        regional_gdp = self.df[self.df['Start_Year'] == latest_year].groupby('Region')['Value'].sum().reset_index()
+        latest_year = self.aggregates.years[-1]
+        regional_gdp = self.aggregates.at_year(['Region'], latest_year)
         
         fig = px.pie(
             regional_gdp,
@@ -86,13 +275,15 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def total_gdp_by_region_yearly(self):
         """
         Chart 3: Total GDP of each region per year (2018-2023)
         Stacked bar chart showing regional GDP over time
         """
+        import plotly.express as px
         # Group by region and year, sum GDP values
-        yearly_regional_gdp = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
+        yearly_regional_gdp = self.aggregates.rollup(['Region', 'Start_Year'])
         
         fig = px.bar(
             yearly_regional_gdp,
@@ -108,13 +299,15 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def regional_gdp_trends(self):
         """
         Chart 4: Region-wise GDP Trends (Line Chart)
         Shows GDP growth trends for each region over time
         """
+        import plotly.express as px
         # Group by region and year, sum GDP values
-        yearly_regional_gdp = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
+        yearly_regional_gdp = self.aggregates.rollup(['Region', 'Start_Year'])
         
         fig = px.line(
             yearly_regional_gdp,
@@ -130,30 +323,27 @@ class GDPAnalysisDashboard:
         
         return fig
     
-    def growth_rate_calculation(self):
+    @depends_on('year:{base_year}', 'year:{target_year}')
+    def growth_rate_calculation(self, base_year=2018, target_year=2023):
         """
         Chart 5: Growth Rate Map (2023 vs 2018)
-        Calculates and visualizes growth rates between 2018 and 2023
+        Calculates and visualizes growth rates between base_year and target_year
         """
-        # Get 2018 and 2023 data
-        gdp_2018 = self.df[self.df['Start_Year'] == 2018].groupby('Region')['Value'].sum()
-        gdp_2023 = self.df[self.df['Start_Year'] == 2023].groupby('Region')['Value'].sum()
-        
-        # Calculate growth rate
-        growth_data = pd.DataFrame({
-            'Region': gdp_2018.index,
-            'GDP_2018': gdp_2018.values,
-            'GDP_2023': gdp_2023.reindex(gdp_2018.index).values
+        import plotly.express as px
+        # Growth between the two years for every region at once
+        regional = self.aggregates.panel(['Region', 'Start_Year'])
+        growth_data = regional.entity_frame({
+            f'GDP_{base_year}': regional.value_at(base_year),
+            f'GDP_{target_year}': regional.value_at(target_year),
+            'Growth_Rate': regional.change(base_year, target_year)
         })
-        
-        growth_data['Growth_Rate'] = ((growth_data['GDP_2023'] - growth_data['GDP_2018']) / growth_data['GDP_2018'] * 100)
         growth_data = growth_data.dropna()
         
         fig = px.bar(
             growth_data,
             x='Region',
             y='Growth_Rate',
-            title='Regional GDP Growth Rate (2023 vs 2018)',
+            title=f'Regional GDP Growth Rate ({target_year} vs {base_year})',
             labels={'Growth_Rate': 'Growth Rate (%)', 'Region': 'Region'},
             color='Growth_Rate',
             color_continuous_scale='RdYlGn'
@@ -166,27 +356,34 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('province_latest')
     def province_contribution_to_regional_gdp(self):
         """
         Chart 6: Province Contribution to Regional GDP - WITH REGION DROPDOWN
         Bar chart showing provinces within each region
         """
-        # Filter for province-level data
-        province_data = self.df[self.df['Location_Type'].str.contains('Province|City', case=False, na=False)]
-        latest_year = province_data['Start_Year'].max()
-        
-        province_latest = province_data[province_data['Start_Year'] == latest_year]
-        province_contribution = province_latest.groupby(['Region', 'Location_Name'])['Value'].sum().reset_index()
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
+        # Province-level totals for the latest year with province data
+        latest_year = self.aggregates.rollup(['Start_Year'], level='province')['Start_Year'].max()
+        province_contribution = self.aggregates.at_year(['Region', 'Location_Name'], latest_year, level='province')
         
         # Get unique regions
         regions = province_contribution['Region'].unique()
         
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                province_contribution, 'Region', 'Location_Name', 'Value', regions,
+                [f"Province Contribution to {region} GDP ({latest_year})" for region in regions]
+            )
+            fig.update_layout(xaxis_title="Province/City", yaxis_title="GDP Value (Billions)", height=600)
+            return fig
+        
         # Create figure
         fig = go.Figure()
         
         # Add traces for each region (initially show first region)
-        for i, region in enumerate(regions):
-            region_data = province_contribution[province_contribution['Region'] == region]
+        for i, (region, region_data) in enumerate(split_by(province_contribution, 'Region')):
             fig.add_trace(
                 go.Bar(
                     x=region_data['Location_Name'],
@@ -232,23 +429,38 @@ class GDPAnalysisDashboard:
     
     # ==================== BY INDUSTRY TAB CHARTS ====================
     
+    @depends_on('latest_year')
     def top_regions_by_industry(self):
         """
         Chart 7: Top 10 Regions by GDP in different industries - WITH INDUSTRY DROPDOWN
         Shows leading regions for each major industry
         """
-        latest_year = self.df['Start_Year'].max()
-        industry_data = self.df[self.df['Start_Year'] == latest_year]
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
+        from ranking import top_n
+        latest_year = self.aggregates.years[-1]
+        industry_data = self.query(years=latest_year)
         
         # Get unique industries
         industries = industry_data['Industry'].unique()
+        ranked = top_n(industry_data, 'Industry', 'Value', k=10, sort_groups=False)
+        
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                ranked, 'Industry', 'Value', 'Region', industries,
+                [f"Top 10 Regions by {industry} GDP" for industry in industries],
+                trace=dict(type='bar', orientation='h')
+            )
+            fig.update_layout(xaxis_title="GDP Value (Billions)", yaxis_title="Region", height=600)
+            return fig
         
         # Create figure
         fig = go.Figure()
         
         # Add traces for each industry
+        ranked_by_industry = dict(split_by(ranked, 'Industry'))
         for i, industry in enumerate(industries):
-            industry_top = industry_data[industry_data['Industry'] == industry].nlargest(10, 'Value')
+            industry_top = ranked_by_industry[industry]
             fig.add_trace(
                 go.Bar(
                     x=industry_top['Value'],
@@ -293,23 +505,38 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('latest_year')
     def lowest_regions_by_industry(self):
         """
         Chart 8: Lowest 10 Regions in different industries - WITH INDUSTRY DROPDOWN
         Shows regions with lowest GDP in each industry
         """
-        latest_year = self.df['Start_Year'].max()
-        industry_data = self.df[self.df['Start_Year'] == latest_year]
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
+        from ranking import bottom_n
+        latest_year = self.aggregates.years[-1]
+        industry_data = self.query(years=latest_year)
         
         # Get unique industries
         industries = industry_data['Industry'].unique()
+        ranked = bottom_n(industry_data, 'Industry', 'Value', k=10, sort_groups=False)
+        
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                ranked, 'Industry', 'Value', 'Region', industries,
+                [f"Lowest 10 Regions by {industry} GDP" for industry in industries],
+                trace=dict(type='bar', orientation='h')
+            )
+            fig.update_layout(xaxis_title="GDP Value (Billions)", yaxis_title="Region", height=600)
+            return fig
         
         # Create figure
         fig = go.Figure()
         
         # Add traces for each industry
+        ranked_by_industry = dict(split_by(ranked, 'Industry'))
         for i, industry in enumerate(industries):
-            industry_bottom = industry_data[industry_data['Industry'] == industry].nsmallest(10, 'Value')
+            industry_bottom = ranked_by_industry[industry]
             fig.add_trace(
                 go.Bar(
                     x=industry_bottom['Value'],
@@ -354,22 +581,34 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def national_gdp_composition_by_industry(self):
         """
         Chart 9: National GDP Composition by Industry - WITH YEAR DROPDOWN
         Stacked bar chart showing industry breakdown over time
         """
-        yearly_industry_gdp = self.df.groupby(['Industry', 'Start_Year'])['Value'].sum().reset_index()
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
+        yearly_industry_gdp = self.aggregates.rollup(['Industry', 'Start_Year'])
         
         # Get unique years
         years = sorted(yearly_industry_gdp['Start_Year'].unique())
         
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                yearly_industry_gdp, 'Start_Year', 'Industry', 'Value', years,
+                [f"National GDP Composition by Industry ({year})" for year in years]
+            )
+            fig.update_layout(xaxis_title="Industry", yaxis_title="GDP Value (Billions)", height=600)
+            return fig
+        
         # Create figure
         fig = go.Figure()
         
         # Add traces for each year
+        rows_by_year = dict(split_by(yearly_industry_gdp, 'Start_Year'))
         for i, year in enumerate(years):
-            year_data = yearly_industry_gdp[yearly_industry_gdp['Start_Year'] == year]
+            year_data = rows_by_year[year]
             fig.add_trace(
                 go.Bar(
                     x=year_data['Industry'],
@@ -413,12 +652,14 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def gdp_trend_by_industry(self):
         """
         Chart 10: GDP Trend by Industry (Line Chart)
         Shows how each industry's GDP evolved over time
         """
-        yearly_industry_gdp = self.df.groupby(['Industry', 'Start_Year'])['Value'].sum().reset_index()
+        import plotly.express as px
+        yearly_industry_gdp = self.aggregates.rollup(['Industry', 'Start_Year'])
         
         fig = px.line(
             yearly_industry_gdp,
@@ -434,17 +675,18 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('latest_year')
     def gdp_heatmap_regions_vs_industries(self):
         """
         Chart 11: Regions vs Industries GDP Heatmap
         Heatmap showing GDP values across regions and industries
         """
-        latest_year = self.df['Start_Year'].max()
-        heatmap_data = self.df[self.df['Start_Year'] == latest_year].pivot_table(
-            values='Value', 
+        import plotly.express as px
+        latest_year = self.aggregates.years[-1]
+        heatmap_data = self.aggregates.at_year(['Region', 'Industry'], latest_year).pivot(
             index='Region', 
             columns='Industry', 
-            aggfunc='sum'
+            values='Value'
         ).fillna(0)
         
         fig = px.imshow(
@@ -461,17 +703,15 @@ class GDPAnalysisDashboard:
     
     # ==================== GROWTH TAB CHARTS ====================
     
+    @depends_on('all')
     def two_year_growth_comparison(self):
         """
         Chart 12: 2-Year Growth Comparison Table
         Shows growth rates for consecutive years
         """
-        # Calculate year-over-year growth rates
-        yearly_gdp = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        yearly_gdp = yearly_gdp.sort_values(['Region', 'Start_Year'])
-        
-        # Calculate growth rates
-        yearly_gdp['Growth_Rate'] = yearly_gdp.groupby('Region')['Value'].pct_change() * 100
+        import plotly.express as px
+        # Year-over-year growth rates from the shared aggregates
+        yearly_gdp = self.aggregates.growth(['Region', 'Start_Year'])
         
         # Create pivot table for better visualization
         growth_pivot = yearly_gdp.pivot(index='Region', columns='Start_Year', values='Growth_Rate')
@@ -489,14 +729,14 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def growth_rate_over_time_by_region(self):
         """
         Chart 13: Growth Rate Over Time by Region (Line Chart)
         Shows growth rate trends for each region
         """
-        yearly_gdp = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        yearly_gdp = yearly_gdp.sort_values(['Region', 'Start_Year'])
-        yearly_gdp['Growth_Rate'] = yearly_gdp.groupby('Region')['Value'].pct_change() * 100
+        import plotly.express as px
+        yearly_gdp = self.aggregates.growth(['Region', 'Start_Year'])
         
         # Remove first year (no growth rate available)
         growth_data = yearly_gdp.dropna()
@@ -516,17 +756,16 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def fastest_growing_vs_shrinking_regions(self):
         """
         Chart 14: Fastest-Growing vs Shrinking Regions
         Bar chart comparison of regional performance
         """
+        import plotly.graph_objects as go
         # Calculate average growth rate for each region
-        yearly_gdp = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        yearly_gdp = yearly_gdp.sort_values(['Region', 'Start_Year'])
-        yearly_gdp['Growth_Rate'] = yearly_gdp.groupby('Region')['Value'].pct_change() * 100
-        
-        avg_growth = yearly_gdp.groupby('Region')['Growth_Rate'].mean().reset_index()
+        regional = self.aggregates.panel(['Region', 'Start_Year'])
+        avg_growth = regional.entity_frame({'Growth_Rate': regional.mean_yoy()})
         avg_growth = avg_growth.sort_values('Growth_Rate', ascending=True)
         
         # Color code positive vs negative growth
@@ -552,21 +791,20 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def industry_growth_leaders(self):
         """
         Chart 15: Industry Growth Leaders
         Shows which industries grew fastest in each region
         """
-        # Calculate growth rates by industry and region
-        industry_yearly = self.df.groupby(['Region', 'Industry', 'Start_Year'])['Value'].sum().reset_index()
-        industry_yearly = industry_yearly.sort_values(['Region', 'Industry', 'Start_Year'])
-        industry_yearly['Growth_Rate'] = industry_yearly.groupby(['Region', 'Industry'])['Value'].pct_change() * 100
-        
-        # Get average growth rate by region and industry
-        avg_industry_growth = industry_yearly.groupby(['Region', 'Industry'])['Growth_Rate'].mean().reset_index()
+        import plotly.express as px
+        from ranking import top_n
+        # Average growth rate by region and industry
+        industry_yearly = self.aggregates.panel(['Region', 'Industry', 'Start_Year'])
+        avg_industry_growth = industry_yearly.entity_frame({'Growth_Rate': industry_yearly.mean_yoy()})
         
         # Get top growing industry per region
-        top_industries = avg_industry_growth.loc[avg_industry_growth.groupby('Region')['Growth_Rate'].idxmax()]
+        top_industries = top_n(avg_industry_growth, 'Region', 'Growth_Rate', k=1)
         
         fig = px.bar(
             top_industries,
@@ -586,35 +824,50 @@ class GDPAnalysisDashboard:
     
     # ==================== PERCENT SHARE TAB CHARTS ====================
     
+    def province_share_rows(self):
+        """
+        Province-level rows with Regional_Total (all rows of the region in that year)
+        and Share_Percent, read from the geography's subtree totals by parent link
+        """
+        rows = self.slice_index.rows(level='province')
+        province_share = self.df.iloc[rows].reset_index(drop=True)
+        province_share['Regional_Total'] = self.geography.parent_total(rows)
+        province_share['Share_Percent'] = (province_share['Value'] / province_share['Regional_Total']) * 100
+        return province_share
+    
+    @depends_on('all')
     def province_gdp_share_within_region(self):
         """
         Chart 16: Province GDP Share Within Region - WITH REGION DROPDOWN
         Shows how provinces contribute to their regional GDP over time
         """
-        # Filter for province-level data
-        province_data = self.df[self.df['Location_Type'].str.contains('Province|City', case=False, na=False)]
-        
-        # Calculate regional totals
-        regional_totals = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        regional_totals.rename(columns={'Value': 'Regional_Total'}, inplace=True)
-        
-        # Merge with province data
-        province_share = province_data.merge(regional_totals, on=['Region', 'Start_Year'])
-        province_share['Share_Percent'] = (province_share['Value'] / province_share['Regional_Total']) * 100
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
+        # Province-level rows with the total of their region in the same year
+        province_share = self.province_share_rows()
         
         # Get unique regions
         regions = province_share['Region'].unique()
         
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                province_share, 'Region', 'Start_Year', 'Share_Percent', regions,
+                [f"Province GDP Share Within {region} (2018-2023)" for region in regions],
+                series_col='Location_Name'
+            )
+            fig.update_layout(xaxis_title="Year", yaxis_title="Share (%)", barmode='stack', height=600)
+            return fig
+        
         # Create figure
         fig = go.Figure()
         
         # Add traces for each region
-        for i, region in enumerate(regions):
-            region_data = province_share[province_share['Region'] == region]
-            provinces = region_data['Location_Name'].unique()
+        provinces_per_region = []
+        for i, (region, region_data) in enumerate(split_by(province_share, 'Region')):
+            provinces = list(split_by(region_data, 'Location_Name'))
+            provinces_per_region.append(len(provinces))
             
-            for j, province in enumerate(provinces):
-                province_data_filtered = region_data[region_data['Location_Name'] == province]
+            for j, (province, province_data_filtered) in enumerate(provinces):
                 fig.add_trace(
                     go.Bar(
                         x=province_data_filtered['Start_Year'],
@@ -627,10 +880,7 @@ class GDPAnalysisDashboard:
         # Create dropdown buttons
         buttons = []
         trace_count = 0
-        for i, region in enumerate(regions):
-            region_data = province_share[province_share['Region'] == region]
-            provinces_in_region = len(region_data['Location_Name'].unique())
-            
+        for i, (region, provinces_in_region) in enumerate(zip(regions, provinces_per_region)):
             visibility = [False] * len(fig.data)
             for j in range(trace_count, trace_count + provinces_in_region):
                 visibility[j] = True
@@ -667,33 +917,41 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def change_in_percent_share_over_time(self):
         """
         Chart 17: Change in Percent Share Over Time - WITH REGION DROPDOWN
         Shows how provincial shares changed over the years
         """
+        import plotly.graph_objects as go
+        from compact_dropdowns import compact_dropdown_figure
         # Calculate shares as in previous function
-        province_data = self.df[self.df['Location_Type'].str.contains('Province|City', case=False, na=False)]
-        regional_totals = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        regional_totals.rename(columns={'Value': 'Regional_Total'}, inplace=True)
-        
-        province_share = province_data.merge(regional_totals, on=['Region', 'Start_Year'])
-        province_share['Share_Percent'] = (province_share['Value'] / province_share['Regional_Total']) * 100
+        province_share = self.province_share_rows()
         
         # Get unique regions
         regions = province_share['Region'].unique()
         
+        if self.compact_dropdowns:
+            fig = compact_dropdown_figure(
+                province_share, 'Region', 'Start_Year', 'Share_Percent', regions,
+                [f"Change in Province Share Over Time - {region}" for region in regions],
+                series_col='Location_Name',
+                trace=dict(type='scatter', mode='lines+markers')
+            )
+            fig.update_layout(xaxis_title="Year", yaxis_title="Share (%)", height=600)
+            return fig
+        
         # Create figure
         fig = go.Figure()
         
         # Add traces for each region
         trace_count = 0
-        for i, region in enumerate(regions):
-            region_data = province_share[province_share['Region'] == region]
-            provinces = region_data['Location_Name'].unique()
+        provinces_per_region = []
+        for i, (region, region_data) in enumerate(split_by(province_share, 'Region')):
+            provinces = list(split_by(region_data, 'Location_Name'))
+            provinces_per_region.append(len(provinces))
             
-            for j, province in enumerate(provinces):
-                province_data_filtered = region_data[region_data['Location_Name'] == province]
+            for j, (province, province_data_filtered) in enumerate(provinces):
                 fig.add_trace(
                     go.Scatter(
                         x=province_data_filtered['Start_Year'],
@@ -707,10 +965,7 @@ class GDPAnalysisDashboard:
         # Create dropdown buttons
         buttons = []
         trace_count = 0
-        for i, region in enumerate(regions):
-            region_data = province_share[province_share['Region'] == region]
-            provinces_in_region = len(region_data['Location_Name'].unique())
-            
+        for i, (region, provinces_in_region) in enumerate(zip(regions, provinces_per_region)):
             visibility = [False] * len(fig.data)
             for j in range(trace_count, trace_count + provinces_in_region):
                 visibility[j] = True
@@ -746,38 +1001,34 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    @depends_on('all')
     def province_vs_regional_growth_gap(self):
         """
         Chart 18: Province vs Regional Growth Gap
         Compares provincial growth rates with their regional averages
         """
-        # Calculate provincial growth rates
-        province_data = self.df[self.df['Location_Type'].str.contains('Province|City', case=False, na=False)]
-        province_yearly = province_data.groupby(['Region', 'Location_Name', 'Start_Year'])['Value'].sum().reset_index()
-        province_yearly = province_yearly.sort_values(['Region', 'Location_Name', 'Start_Year'])
-        province_yearly['Province_Growth'] = province_yearly.groupby(['Region', 'Location_Name'])['Value'].pct_change() * 100
-        
-        # Calculate regional growth rates
-        regional_yearly = self.df.groupby(['Region', 'Start_Year'])['Value'].sum().reset_index()
-        regional_yearly = regional_yearly.sort_values(['Region', 'Start_Year'])
-        regional_yearly['Regional_Growth'] = regional_yearly.groupby('Region')['Value'].pct_change() * 100
-        
-        # Merge data
-        growth_comparison = province_yearly.merge(
-            regional_yearly[['Region', 'Start_Year', 'Regional_Growth']], 
-            on=['Region', 'Start_Year']
-        )
-        
-        growth_comparison['Growth_Gap'] = growth_comparison['Province_Growth'] - growth_comparison['Regional_Growth']
+        import plotly.express as px
+        # Provincial growth, regional growth and their gap for every province-year at once
+        province_yearly = self.aggregates.panel(['Region', 'Location_Name', 'Start_Year'], level='province')
+        regional_yearly = self.aggregates.panel(['Region', 'Start_Year'])
+        
+        growth_comparison = province_yearly.to_frame({
+            'Province_Growth': province_yearly.yoy(),
+            'Regional_Growth': province_yearly.align_parent(regional_yearly, regional_yearly.yoy()),
+            'Growth_Gap': province_yearly.gap(regional_yearly)
+        })
         growth_comparison = growth_comparison.dropna()
         
+        # Marker size shows how far a province is from its region in either direction
+        growth_comparison['Gap_Size'] = growth_comparison['Growth_Gap'].abs()
+        
         fig = px.scatter(
             growth_comparison,
             x='Regional_Growth',
             y='Province_Growth',
             color='Region',
-            size='Growth_Gap',
-            hover_data=['Location_Name', 'Start_Year'],
+            size='Gap_Size',
+            hover_data=['Location_Name', 'Start_Year', 'Growth_Gap'],
             title='Province vs Regional Growth Comparison',
             labels={'Regional_Growth': 'Regional Growth Rate (%)', 'Province_Growth': 'Provincial Growth Rate (%)'}
         )
@@ -793,60 +1044,397 @@ class GDPAnalysisDashboard:
         
         return fig
     
+    # ==================== MAP TAB CHARTS ====================
+    
+    @depends_on('all', files=_map_files, settings=_map_settings)
+    def regional_gdp_map(self, geometry_url=None):
+        """
+        Chart 19: Regional GDP Map with a Year Slider
+        One choropleth trace holds the region geometry (a simplified copy, see geo_assets);
+        the slider only restyles its z values, so each extra year adds one number per
+        region instead of another copy of the map
+        The geometry is referenced by URL: geometry_url, else the asset generate_all_charts
+        wrote next to the HTML (see write_map_asset). It is only embedded when neither
+        is set, e.g. for a standalone figure, a static image or inline_geometry=True
+        """
+        import plotly.graph_objects as go
+        from geo_assets import GeoAsset, DEFAULT_GEOJSON
+        from name_index import NameIndex
+        panel = self.aggregates.panel(['Region', 'Start_Year'])
+        geometry = geometry_url or self.geometry_url
+        if geometry is None:
+            geometry = GeoAsset(DEFAULT_GEOJSON, default_cache_dir(DEFAULT_GEOJSON)).build().figure_geojson(inline=True)
+        
+        regions = panel.entities['Region'].astype(str).tolist()
+        names = NameIndex.for_geojson(DEFAULT_GEOJSON)
+        feature_ids = names.lookup(panel.entities['Region'], report=False)
+        mapped = feature_ids >= 0
+        if not mapped.any():
+            raise ValueError("No region matched a shape in the map GeoJSON")
+        if names.unmatched:
+            print(f"Regions without a map shape: {names.unmatched}")
+        
+        values = panel.values[mapped]
+        latest = len(panel.years) - 1
+        
+        fig = go.Figure(go.Choroplethmap(
+            geojson=geometry,
+            locations=feature_ids[mapped].tolist(),
+            z=values[:, latest],
+            text=[region for region, found in zip(regions, mapped) if found],
+            zmin=np.nanmin(values),
+            zmax=np.nanmax(values),
+            colorscale='Viridis',
+            marker_opacity=0.7,
+            marker_line_width=0.5,
+            colorbar=dict(title='GDP'),
+            hovertemplate='%{text}<br>GDP: %{z:,.0f}<extra></extra>'
+        ))
+        
+        # One slider step per year, each carrying only that year's value vector
+        steps = [
+            dict(method='restyle', label=str(int(year)), args=[{'z': [values[:, i]]}])
+            for i, year in enumerate(panel.years)
+        ]
+        
+        fig.update_layout(
+            title='Regional GDP by Year',
+            map=dict(style='carto-positron', zoom=4.6, center=dict(lat=12.8797, lon=121.7740)),
+            height=700,
+            margin=dict(r=0, t=50, l=0, b=0),
+            sliders=[dict(active=latest, currentvalue=dict(prefix='Year: '), pad=dict(t=30), steps=steps)]
+        )
+        
+        return fig
+    
+    def write_map_asset(self, out_dir):
+        """
+        Write the compact region GeoJSON (see geo_assets.GeoAsset) into out_dir, unless
+        it is already up to date, and return its URL relative to the HTML there
+        """
+        from geo_assets import GeoAsset, DEFAULT_GEOJSON
+        return GeoAsset(DEFAULT_GEOJSON, out_dir).build().figure_geojson()
+    
+    # ==================== FORECASTS ====================
+    
+    def forecast(self, by='Region', metric='GDP', location_type='Region', horizon=None,
+                 model=None, workers=None, threads_per_worker=1, use_cache=True, cache_dir=None, **params):
+        """
+        Forecast one series per group of the by columns (e.g. 'Region' or 'Industry')
+        Returns a tidy frame with the by columns, Year, ds, y, yhat, yhat_lower,
+        yhat_upper and Type (Historical/Forecast). The default model is a batched damped
+        Holt baseline; model='prophet' fits Prophet per series on a process pool
+        Only rows of location_type are summed. The default 'Region' reproduces the
+        notebook's regional forecasts; region rows already include their provinces, so
+        location_type=None (every row) counts each province twice
+        Prophet fits are cached on disk, so a rerun only refits series whose data
+        (or model settings / horizon) changed. horizon and model default to
+        forecasting.DEFAULT_HORIZON and DEFAULT_MODEL
+        """
+        from forecasting import series_by
+        by = [by] if isinstance(by, str) else list(by)
+        series = series_by(self.df, by, metric, location_type)
+        return self._fit_forecasts(series, by, metric, horizon, model, workers, threads_per_worker, use_cache, cache_dir, params)
+    
+    def _fit_forecasts(self, series, key_names, metric, horizon, model, workers, threads_per_worker, use_cache, cache_dir, params):
+        from forecasting import ForecastEngine, DEFAULT_HORIZON, DEFAULT_MODEL
+        from forecast_cache import ForecastCache, default_forecast_cache_dir
+        from baseline import BASELINE_MODELS
+        horizon = DEFAULT_HORIZON if horizon is None else horizon
+        model = model or DEFAULT_MODEL
+        use_cache = use_cache and model not in BASELINE_MODELS
+        cache = ForecastCache(cache_dir or default_forecast_cache_dir(self.excel_file)) if use_cache else None
+        engine = ForecastEngine(model, horizon, workers, threads_per_worker, cache=cache, **params)
+        forecasts = engine.forecast(series, key_names)
+        self.forecast_errors = engine.errors
+        self.forecast_skipped = engine.skipped
+        fitted = len(series) - len(engine.skipped) - len(engine.errors)
+        print(f"Forecast {fitted} of {len(series)} {metric} series by {', '.join(key_names)} "
+              f"({len(engine.skipped)} skipped with fewer than {engine.min_points} points, {len(engine.errors)} failed)")
+        if cache is not None:
+            print(f"Forecast cache: {cache.hits} reused, {cache.misses} fitted")
+        return forecasts
+    
+    def reconciled_forecast(self, metric='GDP', method=None, horizon=None, model=None,
+                            workers=None, threads_per_worker=1, use_cache=True, cache_dir=None, **params):
+        """
+        Coherent national, regional and province/HUC forecasts
+        Forecasts every node of the geographic hierarchy (the national series sums the
+        regions, a region its region-level rows, a province its own rows) and reconciles
+        them so provinces add up to their region and regions to the national figure.
+        method is 'bottom_up', 'top_down', 'ols', 'wls_struct' or 'mint_diag' (see
+        reconcile.METHODS, default reconcile.DEFAULT_METHOD); all series and years are
+        reconciled in one sparse solve
+        Returns the forecast frame keyed by Level, Region and Location_Name in hierarchy
+        order, with yhat reconciled, the interval bounds shifted with it and the
+        unreconciled forecast kept as yhat_base
+        """
+        from reconcile import ForecastHierarchy, reconcile_forecasts, DEFAULT_METHOD, METHODS
+        method = method or DEFAULT_METHOD
+        if method not in METHODS:
+            raise ValueError(f"Unknown reconciliation method '{method}'. Expected one of {METHODS}")
+        with self.profiler.stage('reconciled_forecast'):
+            hierarchy = ForecastHierarchy.from_geography(self.geography)
+            history = hierarchy.history(self.geography, self.df, metric)
+            series = hierarchy.series(history, self.geography.years)
+            forecasts = self._fit_forecasts(series, hierarchy.KEY_NAMES, metric, horizon, model, workers,
+                                            threads_per_worker, use_cache, cache_dir, params)
+            reconciled = reconcile_forecasts(forecasts, hierarchy, method, history)
+        print(f"Reconciled {reconciled[hierarchy.KEY_NAMES].drop_duplicates().shape[0]} of {len(series)} "
+              f"{metric} series ({method})")
+        return reconciled
+    
     # ==================== MAIN EXECUTION FUNCTION ====================
     
-    def generate_all_charts(self):
+    def chart_fingerprint(self, chart_name, exporter, slice_hashes=None):
+        """
+        Fingerprint of everything a chart's output depends on: the data slices, files
+        and settings its method declares with @depends_on, the source of the method and
+        of the dashboard helpers it calls, the helper modules the charts share and the
+        export settings
+        """
+        import plotly
+        slice_hashes = {} if slice_hashes is None else slice_hashes
+        method = getattr(self, self.CHART_METHODS[chart_name])
+        if 'helpers' not in slice_hashes:
+            slice_hashes['helpers'] = helpers_fingerprint()
+        parts = [method_fingerprint(method), slice_hashes['helpers'], plotly.__version__,
+                 json.dumps(vars(exporter), sort_keys=True), str(self.compact_dropdowns), str(self.geometry_url)]
+        for name in chart_slices(method):
+            if name not in slice_hashes:
+                slice_hashes[name] = slice_fingerprint(self.df, name)
+            parts.append(slice_hashes[name])
+        parts += input_fingerprints(method, slice_hashes.setdefault('files', {}))
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+    
+    @classmethod
+    def select_charts(cls, charts=(), tabs=()):
+        """
+        Chart names for a selection of chart names and dashboard tabs, in dashboard order
+        """
+        unknown = [name for name in charts if name not in cls.CHART_METHODS]
+        unknown += [tab for tab in tabs if tab not in cls.CHART_TABS]
+        if unknown:
+            raise ValueError(f"Unknown charts or tabs: {unknown}. "
+                             f"Expected chart names from {list(cls.CHART_METHODS)} or tabs from {list(cls.CHART_TABS)}")
+        selected = set(charts).union(*(cls.CHART_TABS[tab] for tab in tabs))
+        return [name for name in cls.CHART_METHODS if name in selected]
+    
+    def build_chart(self, chart_name, exporter=None):
+        """
+        Build one chart and, when an exporter is given, save it as <chart_name>.html
+        Returns (chart_name, fig, error); error is a traceback string if the chart failed
+        """
+        try:
+            with self.profiler.stage(f"chart:{chart_name}", 'chart'):
+                fig = getattr(self, self.CHART_METHODS[chart_name])()
+            if exporter is not None:
+                with self.profiler.stage(f"write_html:{chart_name}", 'write') as record:
+                    record['output_bytes'] = output_size(exporter.write(fig, chart_name))
+            return chart_name, fig, None
+        except Exception:
+            return chart_name, None, traceback.format_exc()
+    
+    def _build_charts(self, chart_names, workers=None, executor='process', exporter=None):
+        """
+        Build (and, with an exporter, write) the named charts serially or on a pool
+        Returns {chart_name: (fig, error)}
+        """
+        if not chart_names:
+            results = {}
+        elif workers and workers > 1:
+            # Build the shared aggregates and row index once so every worker starts with them
+            self.warm_up()
+            if executor == 'process':
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_chart_worker, initargs=(self,))
+                submit = lambda name: pool.submit(_build_chart_in_worker, name, exporter)
+            elif executor == 'thread':
+                pool = ThreadPoolExecutor(max_workers=workers)
+                submit = lambda name: pool.submit(self.build_chart, name, exporter)
+            else:
+                raise ValueError(f"Unknown executor '{executor}'. Expected 'process' or 'thread'")
+            
+            results = {}
+            with pool:
+                futures = [submit(name) for name in chart_names]
+                for future in as_completed(futures):
+                    chart_name, fig, error = future.result()
+                    results[chart_name] = (fig, error)
+        else:
+            results = {}
+            for name in chart_names:
+                chart_name, fig, error = self.build_chart(name, exporter)
+                results[chart_name] = (fig, error)
+        
+        return results
+    
+    @profiled('generate_all_charts', 'build')
+    def generate_all_charts(self, workers=None, executor='process', exporter=None, incremental=False, charts=None,
+                            format='html', inline_geometry=False):
         """
         Generate all charts and save them as HTML files
         Creates a comprehensive dashboard with all visualizations
+        With workers > 1 the charts are built and written concurrently on a process
+        (or thread) pool. Output order is always the dashboard order, and a failing
+        chart is reported without aborting the rest of the run
+        Pass an HTMLExporter to share one plotly.js bundle, compact the figure JSON
+        or pre-compress the output; the default matches plain fig.write_html()
+        With incremental=True, charts whose fingerprint (see chart_fingerprint) matches
+        the build manifest in the output directory are skipped, and only the charts
+        that were rebuilt are returned
+        charts limits the build to those chart names (see select_charts); the combined
+        dashboard is then left as it is, since it would be missing the other charts
+        format='png', 'svg' or 'pdf' writes static images instead (see export_images);
+        unchanged images are then skipped by figure content, so incremental is not used
+        The region map references a compact GeoJSON asset written into the output
+        directory (see write_map_asset); browsers only fetch it when the pages are
+        served over HTTP, so inline_geometry=True embeds it for opening files directly
         """
-        charts = {
-            # By Region Tab
-            'region_top_industries': self.top_thriving_industries_by_region(),
-            'region_gdp_contribution': self.gdp_contribution_per_region(),
-            'region_yearly_gdp': self.total_gdp_by_region_yearly(),
-            'region_gdp_trends': self.regional_gdp_trends(),
-            'region_growth_rate': self.growth_rate_calculation(),
-            'province_contribution': self.province_contribution_to_regional_gdp(),
-            
-            # By Industry Tab
-            'industry_top_regions': self.top_regions_by_industry(),
-            'industry_lowest_regions': self.lowest_regions_by_industry(),
-            'national_industry_composition': self.national_gdp_composition_by_industry(),
-            'industry_trends': self.gdp_trend_by_industry(),
-            'regions_industries_heatmap': self.gdp_heatmap_regions_vs_industries(),
-            
-            # Growth Tab
-            'two_year_growth': self.two_year_growth_comparison(),
-            'growth_trends': self.growth_rate_over_time_by_region(),
-            'fastest_growing_regions': self.fastest_growing_vs_shrinking_regions(),
-            'industry_growth_leaders': self.industry_growth_leaders(),
-            
-            # Percent Share Tab
-            'province_share_timeline': self.province_gdp_share_within_region(),
-            'share_change_over_time': self.change_in_percent_share_over_time(),
-            'growth_gap_analysis': self.province_vs_regional_growth_gap()
-        }
-        
-        # Save each chart as HTML
-        for chart_name, fig in charts.items():
-            filename = f"{chart_name}.html"
-            fig.write_html(filename)
-            print(f"Saved: {filename}")
-        
-        # Create a combined dashboard HTML file
-        self.create_combined_dashboard(charts)
-        
-        return charts
+        from export import HTMLExporter
+        
+        if format != 'html':
+            from image_export import ImageExporter
+            out_dir = exporter.out_dir if exporter is not None else '.'
+            with ImageExporter(out_dir, format, renderers=workers) as images:
+                return self.export_images(images, workers, executor, charts)
+        
+        exporter = exporter or HTMLExporter()
+        exporter.prepare()
+        
+        chart_names = list(self.CHART_METHODS) if charts is None else self.select_charts(charts)
+        self.geometry_url = None
+        if not inline_geometry and 'regional_gdp_map' in chart_names:
+            self.geometry_url = self.write_map_asset(exporter.out_dir)
+            print(f"Map geometry referenced from {self.geometry_url}; serve {exporter.out_dir} over HTTP to view the map")
+        if incremental:
+            manifest = BuildManifest(exporter.out_dir)
+            slice_hashes = {}
+            fingerprints = {name: self.chart_fingerprint(name, exporter, slice_hashes) for name in chart_names}
+            skipped = [name for name in chart_names if manifest.is_current(name, fingerprints[name])]
+            chart_names = [name for name in chart_names if name not in skipped]
+            print(f"Incremental build: {len(chart_names)} charts to rebuild, {len(skipped)} unchanged")
+        
+        results = self._build_charts(chart_names, workers, executor, exporter)
+        
+        # Report in dashboard order regardless of completion order
+        built = {}
+        self.chart_errors = {}
+        for chart_name in chart_names:
+            fig, error = results[chart_name]
+            if error is None:
+                built[chart_name] = fig
+                print(f"Saved: {chart_name}.html")
+            else:
+                self.chart_errors[chart_name] = error
+                print(f"Failed: {chart_name}\n{error}")
+        
+        if self.chart_errors:
+            print(f"{len(self.chart_errors)} of {len(chart_names)} charts failed: {', '.join(self.chart_errors)}")
+        
+        if not incremental:
+            # Create a combined dashboard HTML file
+            if charts is None:
+                self.create_combined_dashboard(built, exporter)
+            return built
+        
+        # Record the rebuilt charts, then reassemble the dashboard from stored figure JSON
+        dashboard_figures = {}
+        for chart_name in self.CHART_METHODS:
+            if chart_name in built:
+                dashboard_figures[chart_name] = exporter.figure_json(built[chart_name])
+                manifest.record(chart_name, fingerprints[chart_name], dashboard_figures[chart_name])
+            elif chart_name in skipped:
+                dashboard_figures[chart_name] = manifest.load_figure(chart_name)
+        
+        if charts is not None:
+            manifest.save()
+            return built
+        
+        dashboard_name = 'gdp_dashboard_enhanced'
+        dashboard_fingerprint = hashlib.sha256(
+            '|'.join(manifest.entries.get(name, '') for name in dashboard_figures).encode()
+        ).hexdigest()
+        if manifest.is_current(dashboard_name, dashboard_fingerprint, stored_figure=False):
+            print(f"Unchanged: {dashboard_name}.html")
+        else:
+            self.create_combined_dashboard(dashboard_figures, exporter)
+            manifest.record(dashboard_name, dashboard_fingerprint)
+        manifest.save()
+        
+        return built
+    
+    @profiled('export_images', 'build')
+    def export_images(self, images, workers=None, executor='process', charts=None):
+        """
+        Build charts and write them as static images with an image_export.ImageExporter
+        Figures are built first (on a pool with workers > 1), then drawn as one batch by
+        the exporter's persistent renderers; figures unchanged since the last export are
+        not redrawn. Compact dropdown charts keep their data in the page script, so they
+        are built in their regular form here, and the map embeds its geometry.
+        Returns {chart_name: figure}
+        """
+        chart_names = list(self.CHART_METHODS) if charts is None else self.select_charts(charts)
+        # Images are drawn without a browser fetching files, so the map embeds its geometry
+        compact_dropdowns, geometry_url = self.compact_dropdowns, self.geometry_url
+        self.compact_dropdowns, self.geometry_url = False, None
+        try:
+            results = self._build_charts(chart_names, workers, executor)
+        finally:
+            self.compact_dropdowns, self.geometry_url = compact_dropdowns, geometry_url
+        
+        figures = {name: fig for name, (fig, error) in results.items() if error is None}
+        self.chart_errors = {name: error for name, (fig, error) in results.items() if error is not None}
+        for chart_name, error in self.chart_errors.items():
+            print(f"Failed: {chart_name}\n{error}")
+        
+        with self.profiler.stage(f"write_images:{images.format}", 'write') as record:
+            paths = images.write_all({name: figures[name] for name in chart_names if name in figures})
+            record['output_bytes'] = output_size(list(paths.values()))
+        self.chart_errors.update(images.errors)
+        return {name: figures[name] for name in paths}
     
-    def create_combined_dashboard(self, charts):
+    @profiled('create_combined_dashboard', 'write')
+    def create_combined_dashboard(self, charts, exporter=None, plotlyjs=None):
         """
         Create a single HTML file with all charts organized by tabs
+        Each figure is stored as its own JSON block and drawn the first time its tab
+        is opened, so page load only pays for the visible tab. charts maps chart names
+        to figures or to figure JSON already produced by exporter.figure_json()
+        plotlyjs selects where plotly.js comes from: 'cdn' (pinned version), 'local'
+        (the exporter's shared bundle) or 'inline' (embedded, for air-gapped hosts).
+        Defaults to 'local' when the exporter writes a shared bundle, else 'cdn'
+        A map that references its geometry asset gets the asset written next to the dashboard
         """
+        from plotly.offline import get_plotlyjs, get_plotlyjs_version
+        from compact_dropdowns import COMPACT_DROPDOWN_JS
+        from export import HTMLExporter
+        from geo_assets import GeoAsset, DEFAULT_GEOJSON
+        
+        exporter = exporter or HTMLExporter()
+        charts = {name: fig if isinstance(fig, str) else exporter.figure_json(fig) for name, fig in charts.items()}
+        asset = GeoAsset(DEFAULT_GEOJSON, exporter.out_dir)
+        if f'"geojson":"{asset.filename}"' in charts.get('regional_gdp_map', ''):
+            asset.build()
+        if plotlyjs is None:
+            plotlyjs = 'local' if exporter.shared_plotlyjs else 'cdn'
+        
+        if plotlyjs == 'cdn':
+            plotlyjs_tag = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+        elif plotlyjs == 'local':
+            if not exporter.shared_plotlyjs:
+                # Make sure the referenced bundle exists next to the dashboard
+                HTMLExporter(exporter.out_dir, shared_plotlyjs=True).prepare()
+            plotlyjs_tag = f'<script src="{exporter.plotlyjs_filename}"></script>'
+        elif plotlyjs == 'inline':
+            plotlyjs_tag = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+        else:
+            raise ValueError(f"Unknown plotlyjs source '{plotlyjs}'. Expected 'cdn', 'local' or 'inline'")
+        
         html_content = """
         <!DOCTYPE html>
         <html>
         <head>
+            <meta charset="utf-8" />
             <title>GDP Analysis Dashboard</title>
             <style>
                 body { font-family: Arial, sans-serif; margin: 20px; }
@@ -866,18 +1454,12 @@ class GDPAnalysisDashboard:
                 <button class="tablinks" onclick="openTab(event, 'IndustryTab')">By Industry</button>
                 <button class="tablinks" onclick="openTab(event, 'GrowthTab')">Growth Analysis</button>
                 <button class="tablinks" onclick="openTab(event, 'ShareTab')">Percent Share</button>
+                <button class="tablinks" onclick="openTab(event, 'MapTab')">Map</button>
             </div>
         """
         
-        # Add tab contents with chart placeholders
-        tab_contents = {
-            'RegionTab': ['region_top_industries', 'region_gdp_contribution', 'region_yearly_gdp', 'region_gdp_trends', 'region_growth_rate', 'province_contribution'],
-            'IndustryTab': ['industry_top_regions', 'industry_lowest_regions', 'national_industry_composition', 'industry_trends', 'regions_industries_heatmap'],
-            'GrowthTab': ['two_year_growth', 'growth_trends', 'fastest_growing_regions', 'industry_growth_leaders'],
-            'ShareTab': ['province_share_timeline', 'share_change_over_time', 'growth_gap_analysis']
-        }
-        
-        for tab_id, chart_list in tab_contents.items():
+        # Add tab contents: an empty chart div plus the figure JSON, parsed only when the tab opens
+        for tab_id, chart_list in self.CHART_TABS.items():
             html_content += f'<div id="{tab_id}" class="tabcontent"'
             if tab_id == 'RegionTab':
                 html_content += ' style="display:block"'
@@ -885,15 +1467,33 @@ class GDPAnalysisDashboard:
             
             for chart_name in chart_list:
                 if chart_name in charts:
-                    chart_html = charts[chart_name].to_html(include_plotlyjs=False, div_id=f"div_{chart_name}")
-                    html_content += f'<div class="chart-container">{chart_html}</div>\n'
+                    div_id = f"div_{chart_name}"
+                    html_content += f'<div class="chart-container"><div id="{div_id}"></div>'
+                    html_content += f'<script type="application/json" class="figure-json" data-target="{div_id}">'
+                    html_content += charts[chart_name]
+                    html_content += '</script></div>\n'
             
             html_content += '</div>\n'
         
         # Add JavaScript for tabs and Plotly
+        html_content += plotlyjs_tag
+        html_content += f'<script>{COMPACT_DROPDOWN_JS}</script>'
         html_content += """
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
             <script>
+                var renderedTabs = {};
+                
+                function renderTab(tabName) {
+                    if (renderedTabs[tabName]) {
+                        return;
+                    }
+                    renderedTabs[tabName] = true;
+                    var blocks = document.getElementById(tabName).getElementsByClassName("figure-json");
+                    for (var i = 0; i < blocks.length; i++) {
+                        var fig = JSON.parse(blocks[i].textContent);
+                        Plotly.newPlot(blocks[i].getAttribute("data-target"), fig.data, fig.layout, {responsive: true}).then(edmCompactDropdown);
+                    }
+                }
+                
                 function openTab(evt, tabName) {
                     var i, tabcontent, tablinks;
                     tabcontent = document.getElementsByClassName("tabcontent");
@@ -906,36 +1506,108 @@ class GDPAnalysisDashboard:
                     }
                     document.getElementById(tabName).style.display = "block";
                     evt.currentTarget.className += " active";
+                    // Draw after the tab is visible so Plotly can measure its container
+                    renderTab(tabName);
                 }
+                
+                renderTab('RegionTab');
             </script>
         </body>
         </html>
         """
         
-        with open('gdp_dashboard_enhanced.html', 'w') as f:
-            f.write(html_content)
+        path = exporter.write_text('gdp_dashboard_enhanced.html', html_content)
         
         print("Enhanced dashboard with dropdowns saved as: gdp_dashboard_enhanced.html")
+        return path
+
+def main(argv=None):
+    """
+    Command line entry point: build all charts and the combined dashboard, or only
+    the charts picked with --charts / --tab (the dashboard is then left as it is);
+    --serve instead keeps the dashboard loaded and renders charts on request over HTTP
+    """
+    import argparse
+    from image_export import IMAGE_FORMATS
+    from export import HTMLExporter
+    
+    parser = argparse.ArgumentParser(description="Build the GDP analysis charts and the combined dashboard")
+    parser.add_argument('--input', default='cleaned_data.xlsx', help="cleaned workbook or CSV (default: cleaned_data.xlsx)")
+    parser.add_argument('--out-dir', default='.', help="where the HTML files are written")
+    parser.add_argument('--charts', nargs='+', default=[], metavar='CHART', help="chart names to build (see --list)")
+    parser.add_argument('--tab', nargs='+', default=[], metavar='TAB', help="dashboard tabs whose charts to build (see --list)")
+    parser.add_argument('--list', action='store_true', help="list the chart names by tab and exit")
+    parser.add_argument('--workers', type=int, help="build charts on this many worker processes")
+    parser.add_argument('--incremental', action='store_true', help="skip charts whose inputs are unchanged")
+    parser.add_argument('--shared-plotlyjs', action='store_true', help="write plotly.js once instead of into every file")
+    parser.add_argument('--format', choices=['html'] + list(IMAGE_FORMATS), default='html',
+                        help="html pages (default) or static images rendered with kaleido")
+    parser.add_argument('--inline-map', action='store_true',
+                        help="embed the map geometry in the HTML (for opening files without a web server)")
+    parser.add_argument('--no-cache', action='store_true', help="read the input file even if a cached frame exists")
+    parser.add_argument('--profile', metavar='TRACE', help="write a Chrome trace of the build stages to this file")
+    parser.add_argument('--serve', action='store_true', help="serve the charts over HTTP instead of writing files")
+    parser.add_argument('--host', default='127.0.0.1', help="address to serve on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8050, help="port to serve on (default: 8050)")
+    parser.add_argument('--cache-size', type=int, default=128, help="rendered responses kept in memory when serving")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        for tab, chart_names in GDPAnalysisDashboard.CHART_TABS.items():
+            print(f"{tab}: {' '.join(chart_names)}")
+        return 0
+    
+    selection = None
+    if args.charts or args.tab:
+        try:
+            selection = GDPAnalysisDashboard.select_charts(args.charts, args.tab)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    profiler = None
+    if args.profile:
+        from profiling import Profiler
+        profiler = Profiler()
+    
+    dashboard = GDPAnalysisDashboard(args.input, use_cache=not args.no_cache, profiler=profiler)
+    if args.serve:
+        from serve import serve
+        serve(dashboard, args.host, args.port, args.cache_size, args.workers)
+        return 0
+    exporter = HTMLExporter(args.out_dir, shared_plotlyjs=args.shared_plotlyjs)
+    
+    if selection is not None or args.format != 'html':
+        charts = dashboard.generate_all_charts(args.workers, exporter=exporter, incremental=args.incremental,
+                                               charts=selection, format=args.format, inline_geometry=args.inline_map)
+        print(f"\nBuilt {len(charts)} of {len(selection or GDPAnalysisDashboard.CHART_METHODS)} charts")
+    else:
+        # Generate all charts
+        print("Generating Enhanced GDP Analysis Dashboard with Interactive Dropdowns...")
+        charts = dashboard.generate_all_charts(args.workers, exporter=exporter, incremental=args.incremental,
+                                               inline_geometry=args.inline_map)
+        
+        print("\nDashboard generation complete!")
+        print(f"Generated {len(charts)} charts across 5 main categories:")
+        print("- By Region: 6 charts")
+        print("- By Industry: 5 charts") 
+        print("- Growth Analysis: 4 charts")
+        print("- Percent Share: 3 charts")
+        print("- Map: 1 chart")
+        print("\nEnhanced Features Added:")
+        print("✓ Top 10 highest regions by industry GDP - Industry dropdown")
+        print("✓ Top 10 lowest regions by industry GDP - Industry dropdown") 
+        print("✓ National GDP composition - Year dropdown")
+        print("✓ Provincial GDP contribution - Region dropdown")
+        print("✓ Province GDP share - Region dropdown")
+        print("✓ Share change over time - Region dropdown")
+        print("\nAll charts are HTML-compatible and ready for web deployment.")
+    
+    if profiler is not None:
+        profiler.summary()
+        profiler.to_chrome_trace(args.profile)
+        print(f"Build trace saved as: {args.profile}")
+    
+    return 1 if dashboard.chart_errors else 0
 
 if __name__ == "__main__":
-    # Initialize the dashboard
-    dashboard = GDPAnalysisDashboard('cleaned_data.xlsx')
-    
-    # Generate all charts
-    print("Generating Enhanced GDP Analysis Dashboard with Interactive Dropdowns...")
-    charts = dashboard.generate_all_charts()
-    
-    print(f"\nDashboard generation complete!")
-    print(f"Generated {len(charts)} charts across 4 main categories:")
-    print("- By Region: 6 charts")
-    print("- By Industry: 5 charts") 
-    print("- Growth Analysis: 4 charts")
-    print("- Percent Share: 3 charts")
-    print("\nEnhanced Features Added:")
-    print("✓ Top 10 highest regions by industry GDP - Industry dropdown")
-    print("✓ Top 10 lowest regions by industry GDP - Industry dropdown") 
-    print("✓ National GDP composition - Year dropdown")
-    print("✓ Provincial GDP contribution - Region dropdown")
-    print("✓ Province GDP share - Region dropdown")
-    print("✓ Share change over time - Region dropdown")
-    print("\nAll charts are HTML-compatible and ready for web deployment.")
+    sys.exit(main())
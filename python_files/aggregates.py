@@ -0,0 +1,88 @@
+from growth import GrowthPanel
+from geography import LEVELS, LEVEL_CODES, level_codes
+
+
+class AggregateCube:
+    """
+    Shared aggregate layer for the dashboard charts
+    Sums Value once over Region x Industry x Location x Year; every coarser rollup
+    (and its year-over-year growth) is derived from that cube on first use and memoized,
+    so the charts stop re-running the same groupbys over the raw rows
+    """
+    DIMENSIONS = ['Region', 'Industry', 'Location_Type', 'Location_Name', 'Start_Year']
+    LEVELS = (None,) + LEVELS
+
+    def __init__(self, df, value_col='Value'):
+        self.value_col = value_col
+        # dropna=False keeps rows missing an Industry or Location in every rollup,
+        # as a direct groupby over the rows by the rollup's own keys does
+        self.cube = df.groupby(self.DIMENSIONS, observed=True, dropna=False)[value_col].sum().reset_index()
+        self._levels = level_codes(self.cube['Location_Type'])
+        self._masks = {}
+        self._rollups = {}
+        self._panels = {}
+        self._growth = {}
+
+    @property
+    def years(self):
+        """
+        Sorted array of the years present in the cube
+        """
+        return self.rollup(['Start_Year'])['Start_Year'].to_numpy()
+
+    def level_rows(self, level=None):
+        """
+        Cube rows for a geographic level: None for all rows, 'province' for provinces/cities
+        (see geography.LEVELS)
+        """
+        if level not in self.LEVELS:
+            raise ValueError(f"Unknown level '{level}'. Expected one of {self.LEVELS}")
+        if level is None:
+            return self.cube
+        if level not in self._masks:
+            self._masks[level] = self._levels == LEVEL_CODES[level]
+        return self.cube[self._masks[level]]
+
+    def rollup(self, dims, level=None):
+        """
+        Sum of Value grouped by dims (e.g. ['Region', 'Start_Year']), sorted by dims
+        Rows missing one of dims are left out, as in df.groupby(dims); rows missing
+        any other dimension still count. Returns a copy so callers can add columns without touching the memoized frame
+        """
+        key = (tuple(dims), level)
+        if key not in self._rollups:
+            rows = self.level_rows(level)
+            self._rollups[key] = rows.groupby(list(dims), observed=True)[self.value_col].sum().reset_index()
+        return self._rollups[key].copy()
+
+    def panel(self, dims, level=None):
+        """
+        Dense GrowthPanel (entity x year) for the rollup by dims
+        The last dimension must be Start_Year; the others identify the entities
+        """
+        dims = list(dims)
+        if dims[-1] != 'Start_Year':
+            raise ValueError("The last growth dimension must be 'Start_Year'")
+        key = (tuple(dims), level)
+        if key not in self._panels:
+            self._panels[key] = GrowthPanel(self.rollup(dims, level), dims[:-1], value_col=self.value_col)
+        return self._panels[key]
+
+    def growth(self, dims, level=None):
+        """
+        Rollup by dims with a Growth_Rate column (year-over-year % change)
+        The last dimension must be Start_Year; growth is computed within each group of the others
+        """
+        key = (tuple(dims), level)
+        if key not in self._growth:
+            panel = self.panel(dims, level)
+            self._growth[key] = panel.to_frame({'Growth_Rate': panel.yoy()})
+        return self._growth[key].copy()
+
+    def at_year(self, dims, year, level=None):
+        """
+        Rollup by dims + Start_Year restricted to a single year (Start_Year column dropped)
+        """
+        frame = self.rollup(list(dims) + ['Start_Year'], level)
+        frame = frame[frame['Start_Year'] == year].drop(columns='Start_Year')
+        return frame.reset_index(drop=True)
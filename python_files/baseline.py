@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+# Prophet's default interval_width
+DEFAULT_INTERVAL_WIDTH = 0.8
+
+# Smoothing grid searched per series by the damped Holt model
+HOLT_ALPHAS = np.linspace(0.1, 1.0, 10)
+HOLT_BETAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3, 0.5])
+HOLT_PHIS = np.array([0.8, 0.9, 0.98])
+
+
+def series_matrix(series):
+    """
+    Stack {key: (ds, y) history} into a dense series x year array (NaN where missing)
+    Returns (keys, first year of the grid, array)
+    """
+    keys = list(series)
+    years = [series[key]['ds'].dt.year.to_numpy() for key in keys]
+    first_year = min(int(y.min()) for y in years)
+    last_year = max(int(y.max()) for y in years)
+
+    values = np.full((len(keys), last_year - first_year + 1), np.nan)
+    for row, key in enumerate(keys):
+        values[row, years[row] - first_year] = series[key]['y'].to_numpy(dtype=float)
+    return keys, first_year, values
+
+
+def _first_last(observed):
+    """
+    Column of the first and last observed value in every row
+    """
+    first = np.argmax(observed, axis=1)
+    last = observed.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    return first, last
+
+
+def _z(interval_width):
+    return NormalDist().inv_cdf(0.5 + interval_width / 2)
+
+
+def fit_trend(values, horizon, interval_width=DEFAULT_INTERVAL_WIDTH):
+    """
+    Least-squares linear trend y = a + b*t fitted to every row at once
+    Returns (yhat, lower, upper) over the grid extended by horizon columns; intervals
+    are the usual OLS prediction intervals (normal quantile)
+    """
+    n_rows, n_cols = values.shape
+    observed = ~np.isnan(values)
+    weights = observed.astype(float)
+    filled = np.where(observed, values, 0.0)
+    t = np.arange(n_cols, dtype=float)
+
+    # Closed-form weighted sums per row: a batched 2-parameter least squares
+    n = weights.sum(axis=1)
+    t_mean = (weights * t).sum(axis=1) / n
+    y_mean = filled.sum(axis=1) / n
+    sxx = (weights * (t - t_mean[:, None]) ** 2).sum(axis=1)
+    sxy = (weights * (t - t_mean[:, None]) * (filled - y_mean[:, None])).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+    intercept = y_mean - slope * t_mean
+
+    t_out = np.arange(n_cols + horizon, dtype=float)
+    yhat = intercept[:, None] + slope[:, None] * t_out
+
+    residuals = np.where(observed, values - yhat[:, :n_cols], 0.0)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(n - 2, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leverage = np.where(sxx[:, None] > 0, (t_out - t_mean[:, None]) ** 2 / sxx[:, None], 0.0)
+    spread = _z(interval_width) * sigma[:, None] * np.sqrt(1 + 1 / n[:, None] + leverage)
+    return yhat, yhat - spread, yhat + spread
+
+
+def fit_log_trend(values, horizon, interval_width=DEFAULT_INTERVAL_WIDTH):
+    """
+    Linear trend on log(y), i.e. constant-rate exponential growth; rows must be positive
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log(values)
+    yhat, lower, upper = fit_trend(logs, horizon, interval_width)
+    return np.exp(yhat), np.exp(lower), np.exp(upper)
+
+
+def fit_holt(values, horizon, interval_width=DEFAULT_INTERVAL_WIDTH,
+             alphas=HOLT_ALPHAS, betas=HOLT_BETAS, phis=HOLT_PHIS):
+    """
+    Holt's damped additive trend, with (alpha, beta, phi) picked per row from a grid
+    by one-step-ahead squared error. Every grid point and row is filtered at once,
+    so the only Python loop is over years. Missing years are bridged with the forecast
+    The level starts at the first value and the trend at the least-squares slope
+    """
+    n_rows, n_cols = values.shape
+    observed = ~np.isnan(values)
+    first, _ = _first_last(observed)
+
+    grid = np.array(np.meshgrid(alphas, betas, phis, indexing='ij')).reshape(3, -1)
+    alpha, beta, phi = (param[:, None] for param in grid)
+    n_grid = grid.shape[1]
+
+    trend_yhat, _, _ = fit_trend(values, 0)
+    initial_slope = np.diff(trend_yhat, axis=1)[:, 0] if n_cols > 1 else np.zeros(n_rows)
+    initial_level = values[np.arange(n_rows), first]
+
+    level = np.broadcast_to(initial_level, (n_grid, n_rows)).copy()
+    slope = np.broadcast_to(initial_slope, (n_grid, n_rows)).copy()
+    fitted = np.full((n_grid, n_rows, n_cols + horizon), np.nan)
+    sse = np.zeros((n_grid, n_rows))
+    errors = np.zeros(n_rows)
+
+    for col in range(n_cols + horizon):
+        started = col > first
+        forecast = level + phi * slope
+        fitted[:, :, col] = np.where(started, forecast, initial_level)
+        if col >= n_cols:
+            update = np.zeros(n_rows, dtype=bool)
+            actual = np.zeros(n_rows)
+        else:
+            update = started & observed[:, col]
+            actual = np.where(observed[:, col], values[:, col], 0.0)
+        error = np.where(update, actual - forecast, 0.0)
+        sse += error ** 2
+        errors += update
+        new_level = forecast + alpha * error
+        new_slope = phi * slope + alpha * beta * error
+        level = np.where(started, new_level, level)
+        slope = np.where(started, new_slope, slope)
+
+    best = np.argmin(sse, axis=0)
+    rows = np.arange(n_rows)
+    yhat = fitted[best, rows]
+    alpha, beta, phi = (param[best] for param in grid)
+    sigma = np.sqrt(sse[best, rows] / np.maximum(errors, 1))
+
+    # h-step variance of the damped trend model: sigma^2 * (1 + sum_j (alpha * (1 + beta * phi_j))^2),
+    # phi_j = phi + ... + phi^j. History rows use the one-step interval
+    _, last = _first_last(observed)
+    steps = np.maximum(np.arange(n_cols + horizon) - last[:, None], 1)
+    max_steps = int(steps.max())
+    damped = np.cumsum(phi[:, None] ** np.arange(1, max_steps + 1), axis=1)
+    terms = (alpha[:, None] * (1 + beta[:, None] * damped)) ** 2
+    cumulative = np.concatenate([np.zeros((n_rows, 1)), np.cumsum(terms, axis=1)], axis=1)
+    variance = sigma[:, None] ** 2 * (1 + cumulative[rows[:, None], steps - 1])
+    spread = _z(interval_width) * np.sqrt(variance)
+    return yhat, yhat - spread, yhat + spread
+
+
+def fit_cagr(values, horizon, interval_width=DEFAULT_INTERVAL_WIDTH):
+    """
+    Compound annual growth from the first to the last observed value, projected forward
+    Intervals widen with sqrt(steps ahead) using the spread of year-over-year log growth
+    """
+    n_rows, n_cols = values.shape
+    observed = ~np.isnan(values)
+    first, last = _first_last(observed)
+    rows = np.arange(n_rows)
+    start = values[rows, first]
+    end = values[rows, last]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.log(end / start) / np.maximum(last - first, 1)
+        log_growth = np.diff(np.log(values), axis=1)
+    counts = np.sum(~np.isnan(log_growth), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(log_growth, axis=1) / counts
+        spread_sq = np.nansum((log_growth - mean[:, None]) ** 2, axis=1) / np.maximum(counts - 1, 1)
+    sigma = np.sqrt(np.where(counts > 0, spread_sq, 0.0))
+
+    t_out = np.arange(n_cols + horizon)
+    log_yhat = np.log(start)[:, None] + rate[:, None] * (t_out - first[:, None])
+    steps = np.maximum(t_out - last[:, None], 1)
+    spread = _z(interval_width) * sigma[:, None] * np.sqrt(steps)
+    return np.exp(log_yhat), np.exp(log_yhat - spread), np.exp(log_yhat + spread)
+
+
+# Model name -> (fit function, needs strictly positive values)
+BASELINE_MODELS = {
+    'linear': (fit_trend, False),
+    'log_linear': (fit_log_trend, True),
+    'holt': (fit_holt, False),
+    'cagr': (fit_cagr, True),
+}
+
+
+def baseline_forecasts(series, model, horizon, params=None):
+    """
+    Fit a baseline model to every series at once and yield (key, forecast, error)
+    like the per-series models; forecast holds ds, yhat, yhat_lower and yhat_upper
+    for the series' own years plus horizon years after its last one
+    """
+    fit, positive_only = BASELINE_MODELS[model]
+    keys, first_year, values = series_matrix(series)
+    observed = ~np.isnan(values)
+
+    invalid = np.zeros(len(keys), dtype=bool)
+    if positive_only:
+        invalid = np.any(observed & (values <= 0), axis=1)
+        values = np.where(invalid[:, None], 1.0, values)
+
+    yhat, lower, upper = fit(values, horizon, **(params or {}))
+
+    _, last = _first_last(observed)
+    cols = np.arange(values.shape[1] + horizon)
+    padded = np.pad(observed, ((0, 0), (0, horizon)))
+    keep = padded | ((cols > last[:, None]) & (cols <= last[:, None] + horizon))
+    dates = pd.to_datetime((first_year + cols).astype(str), format='%Y').to_numpy()
+
+    for row, key in enumerate(keys):
+        if invalid[row]:
+            yield key, None, f"The '{model}' model needs positive values"
+            continue
+        mask = keep[row]
+        yield key, {
+            'ds': dates[mask],
+            'yhat': yhat[row, mask],
+            'yhat_lower': lower[row, mask],
+            'yhat_upper': upper[row, mask],
+        }, None
@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.express as px
+from datetime import datetime
+from EDM import GDPAnalysisDashboard
+from export import HTMLExporter
+from ingest import read_source
+
+DEFAULT_SCALES = [10, 100, 1000]
+
+# Shape of cleaned_data.xlsx at scale 1 (about 37k rows, close to the real workbook)
+REGIONS = 17
+LOCATIONS_PER_REGION = 7
+INDUSTRIES = 16
+YEARS = list(range(2018, 2024))
+LOCATION_TYPES = ['Province/City', 'Province/City', 'Province/City', 'City', 'City', 'Province', 'Province/City']
+
+
+def synthetic_frame(scale=1, seed=0):
+    """
+    Raw frame shaped like cleaned_data.xlsx with scale times as many locations
+    Every region has one Region row plus LOCATIONS_PER_REGION * scale provinces/cities,
+    each with GDP and Percent Share for every year and Growth Rate for every year pair,
+    across all industries. Region GDP is the sum of its locations
+    """
+    rng = np.random.default_rng(seed)
+    region_names = np.array([f"Region {r + 1:02d}" for r in range(REGIONS)])
+    industry_names = np.array([f"Industry {i + 1:02d}" for i in range(INDUSTRIES)])
+    locations = LOCATIONS_PER_REGION * scale
+    years = np.array(YEARS)
+
+    # GDP for every (region, location, industry, year): random level x compounding growth
+    level = rng.lognormal(mean=9.0, sigma=1.2, size=(REGIONS, locations, INDUSTRIES, 1))
+    growth = rng.normal(0.05, 0.05, size=(REGIONS, locations, INDUSTRIES, len(years)))
+    growth[..., 0] = 0
+    gdp = level * np.cumprod(1 + growth, axis=-1)
+    region_gdp = gdp.sum(axis=1, keepdims=True)
+    national_gdp = region_gdp.sum(axis=0, keepdims=True)
+
+    # Location axis 0 is the region itself, 1.. are its provinces/cities
+    values = np.concatenate([region_gdp, gdp], axis=1)
+    share = np.concatenate([region_gdp / national_gdp, gdp / region_gdp], axis=1) * 100
+    yoy = (values[..., 1:] / values[..., :-1] - 1) * 100
+
+    location_names = np.array([
+        [name] + [f"{name} Location {l + 1}" for l in range(locations)] for name in region_names
+    ])
+    location_types = np.array(['Region'] + [LOCATION_TYPES[l % len(LOCATION_TYPES)] for l in range(locations)])
+
+    frames = []
+    for metric, metric_values, start_years, end_years in [
+        ('GDP', values, years, years),
+        ('Percent Share', share, years, years),
+        ('Growth Rate', yoy, years[:-1], years[1:]),
+    ]:
+        shape = metric_values.shape
+        region_idx, location_idx, industry_idx, year_idx = (axis.ravel() for axis in np.indices(shape))
+        if metric == 'Growth Rate':
+            year_range = np.char.add(np.char.add(start_years.astype(str), '-'), end_years.astype(str))
+        else:
+            year_range = start_years.astype(str)
+        frames.append(pd.DataFrame({
+            'Industry': pd.Categorical.from_codes(industry_idx, industry_names),
+            'Region': pd.Categorical.from_codes(region_idx, region_names),
+            'Location_Type': location_types[location_idx],
+            'Location_Name': location_names[region_idx, location_idx],
+            'Metric': metric,
+            'Year_Range': year_range[year_idx],
+            'Start_Year': start_years[year_idx],
+            'End_Year': end_years[year_idx],
+            'Value': np.round(metric_values.ravel(), 3),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_source(df, path):
+    """
+    Write a synthetic frame as .csv or .xlsx (Excel caps a sheet at 1,048,576 rows)
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+class BenchmarkRun:
+    """
+    Times a sequence of pipeline stages, recording wall time, peak traced memory
+    and bytes written for each
+    """
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    def measure(self, stage, func, *args, outputs=None, **kwargs):
+        """
+        Run func(*args, **kwargs) as one stage and return its result
+        outputs is a callable returning the paths the stage wrote (given the result)
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        record = {'stage': stage, 'seconds': round(seconds, 6)}
+        if self.trace_memory:
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        if outputs is not None:
+            record['output_bytes'] = sum(os.path.getsize(path) for path in outputs(result))
+        self.stages.append(record)
+        return result
+
+
+def warm_up_plotly():
+    """
+    Build and serialize one tiny figure so template loading and plotly's lazy
+    imports are not billed to the first chart stage
+    """
+    px.bar(pd.DataFrame({'x': [0], 'y': [0]}), x='x', y='y').to_json()
+
+
+def run_scale(scale, out_dir, source_format='csv', exporter_options=None, trace_memory=True, seed=0):
+    """
+    Benchmark the whole pipeline on a synthetic frame of the given scale
+    Stages: load (read the source file), prepare_data, aggregates (shared cube),
+    every chart method, write_html for every chart and create_combined_dashboard
+    """
+    scale_dir = os.path.join(out_dir, f"scale_{scale}")
+    os.makedirs(scale_dir, exist_ok=True)
+    source = write_source(synthetic_frame(scale, seed), os.path.join(scale_dir, f"synthetic_data.{source_format}"))
+    exporter = HTMLExporter(scale_dir, **(exporter_options or {}))
+    exporter.prepare()
+    warm_up_plotly()
+
+    run = BenchmarkRun(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        raw = run.measure('load', read_source, source)
+        dashboard = run.measure('prepare_data', GDPAnalysisDashboard.from_frame, raw)
+        del raw
+        run.measure('aggregates', lambda: dashboard.aggregates)
+
+        charts = {}
+        for chart_name, method_name in GDPAnalysisDashboard.CHART_METHODS.items():
+            try:
+                charts[chart_name] = run.measure(f"chart:{chart_name}", getattr(dashboard, method_name))
+            except Exception as e:
+                run.stages.append({'stage': f"chart:{chart_name}", 'error': f"{type(e).__name__}: {e}"})
+
+        for chart_name, fig in charts.items():
+            run.measure(f"write_html:{chart_name}", exporter.write, fig, chart_name, outputs=lambda path: [path])
+
+        dashboard_path = os.path.join(scale_dir, 'gdp_dashboard_enhanced.html')
+        run.measure('create_combined_dashboard', dashboard.create_combined_dashboard, charts, exporter,
+                    outputs=lambda _: [dashboard_path])
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        'scale': scale,
+        'rows': len(dashboard.df),
+        'source_bytes': os.path.getsize(source),
+        'stages': run.stages,
+        'total_seconds': round(sum(stage.get('seconds', 0) for stage in run.stages), 6),
+    }
+
+
+def compare_results(baseline_path, current_path, threshold=0.2, min_seconds=0.05):
+    """
+    Print stages that got slower by more than threshold (a fraction) between two result files
+    Stages faster than min_seconds in both runs are skipped as timer noise
+    """
+    with open(baseline_path) as f:
+        baseline = {run['scale']: run for run in json.load(f)['runs']}
+    with open(current_path) as f:
+        current = json.load(f)['runs']
+
+    regressions = []
+    for run in current:
+        if run['scale'] not in baseline:
+            continue
+        old_stages = {stage['stage']: stage for stage in baseline[run['scale']]['stages']}
+        for stage in run['stages']:
+            old = old_stages.get(stage['stage'])
+            if not old or 'seconds' not in old or 'seconds' not in stage or old['seconds'] == 0:
+                continue
+            if max(old['seconds'], stage['seconds']) < min_seconds:
+                continue
+            change = stage['seconds'] / old['seconds'] - 1
+            if change > threshold:
+                regressions.append((run['scale'], stage['stage'], old['seconds'], stage['seconds'], change))
+
+    for scale, stage, old, new, change in regressions:
+        print(f"{scale}x {stage}: {old:.3f}s -> {new:.3f}s (+{change:.0%})")
+    if not regressions:
+        print(f"No stage slower than the baseline by more than {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GDP dashboard pipeline on synthetic data")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="data sizes relative to cleaned_data.xlsx (default: 10 100 1000)")
+    parser.add_argument('--out-dir', default='benchmark_output', help="where synthetic data and HTML are written")
+    parser.add_argument('--results', default='benchmark_results.json', help="JSON file for the timings")
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', help="synthetic source file format")
+    parser.add_argument('--shared-plotlyjs', action='store_true', help="benchmark the lean export mode")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc (lower overhead timings)")
+    parser.add_argument('--compare', metavar='BASELINE', help="report regressions against an earlier results file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    runs = []
+    for scale in args.scales:
+        print(f"Benchmarking {scale}x synthetic data...")
+        run = run_scale(scale, args.out_dir, args.format, {'shared_plotlyjs': args.shared_plotlyjs},
+                        trace_memory=not args.no_memory, seed=args.seed)
+        print(f"  {run['rows']} rows in {run['total_seconds']:.2f}s")
+        runs.append(run)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'options': {'format': args.format, 'shared_plotlyjs': args.shared_plotlyjs,
+                    'trace_memory': not args.no_memory, 'seed': args.seed},
+        'runs': runs,
+    }
+    with open(args.results, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved as: {args.results}")
+
+    if args.compare:
+        compare_results(args.compare, args.results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
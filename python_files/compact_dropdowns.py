@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Client-side filter for compact dropdown figures. The figure keeps one data table in
+# layout.meta.compact_dropdown (rows sorted by dropdown group, with group offsets);
+# the active group's traces are built from it on load and rebuilt with Plotly.react
+# whenever another group is picked
+COMPACT_DROPDOWN_JS = """
+function edmCompactDropdown(gd) {
+    var spec = gd.layout.meta && gd.layout.meta.compact_dropdown;
+    if (!spec || gd._edmCompactDropdown) {
+        return gd;
+    }
+    gd._edmCompactDropdown = true;
+    function value(column, i) {
+        return column.labels ? column.labels[column.codes[i]] : column[i];
+    }
+    function show(group) {
+        var traces = [], bySeries = {};
+        for (var i = spec.offsets[group]; i < spec.offsets[group + 1]; i++) {
+            var name = spec.series ? value(spec.series, i) : spec.groups[group];
+            if (!(name in bySeries)) {
+                bySeries[name] = Object.assign({name: String(name), x: [], y: []}, spec.trace);
+                traces.push(bySeries[name]);
+            }
+            bySeries[name].x.push(value(spec.x, i));
+            bySeries[name].y.push(value(spec.y, i));
+        }
+        Plotly.react(gd, traces, Object.assign({}, gd.layout, {title: {text: spec.titles[group]}}));
+    }
+    gd.on('plotly_buttonclicked', function (event) {
+        show(event.active);
+    });
+    show(gd.layout.updatemenus[0].active || 0);
+    return gd;
+}
+"""
+
+
+def compact_dropdown_post_script(fig):
+    """
+    post_script for fig.write_html()/to_html() that wires up the client-side filter,
+    or None when the figure does not use a compact dropdown
+    """
+    meta = fig['layout']['meta'] if isinstance(fig, dict) else fig.layout.meta
+    if not isinstance(meta, dict) or 'compact_dropdown' not in meta:
+        return None
+    return COMPACT_DROPDOWN_JS + "edmCompactDropdown(document.getElementById('{plot_id}'));"
+
+
+def _encode_column(values):
+    """
+    Text and low-cardinality numbers (e.g. years) are dictionary-encoded as
+    {labels, codes}; other numbers stay as a flat list
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(str)
+    if pd.api.types.is_numeric_dtype(values.dtype) and values.nunique() * 4 > len(values):
+        return values.tolist()
+    codes, labels = pd.factorize(values)
+    return {'labels': labels.tolist(), 'codes': codes.tolist()}
+
+
+def compact_dropdown_figure(rows, group_col, x_col, y_col, groups, titles, series_col=None, trace=None):
+    """
+    Build a dropdown figure that carries one data table instead of one trace per option
+    rows holds every (group, series, x, y) row to plot; groups gives the dropdown order
+    and titles the figure title for each group. Without series_col each group is a
+    single trace named after the group, otherwise one trace per series value.
+    The figure itself has no traces: the filter script (compact_dropdown_post_script)
+    draws the selected group from the table, so no row is stored twice
+    """
+    trace = dict(trace or {'type': 'bar'})
+    groups = list(groups)
+
+    # Sort rows by dropdown group (stable, so row order within a group is kept)
+    # Rows of groups outside the dropdown get -1 and are dropped
+    group_codes = pd.Index(groups).get_indexer(rows[group_col])
+    order = np.argsort(group_codes, kind='stable')
+    order = order[group_codes[order] >= 0]
+    rows = rows.iloc[order]
+    offsets = np.searchsorted(group_codes[order], np.arange(len(groups) + 1)).tolist()
+
+    spec = {
+        'groups': [str(group) for group in groups],
+        'titles': list(titles),
+        'offsets': offsets,
+        'trace': trace,
+        'x': _encode_column(rows[x_col]),
+        'y': _encode_column(rows[y_col]),
+        'series': _encode_column(rows[series_col]) if series_col else None,
+    }
+
+    fig = go.Figure()
+    buttons = [dict(label=label, method='skip') for label in spec['groups']]
+    fig.update_layout(
+        title=titles[0] if titles else None,
+        meta={'compact_dropdown': spec},
+        updatemenus=[
+            dict(
+                buttons=buttons,
+                direction="down",
+                showactive=True,
+                x=0.1,
+                xanchor="left",
+                y=1.15,
+                yanchor="top"
+            )
+        ]
+    )
+    return fig
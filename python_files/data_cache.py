@@ -0,0 +1,230 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Bump whenever the on-disk layout or prepare_data() output changes
+CACHE_VERSION = 2
+CACHE_DIR_NAME = '.edm_cache'
+
+# Low-cardinality text columns stored as categoricals (codes + labels)
+CATEGORICAL_COLUMNS = ['Region', 'Industry', 'Location_Name', 'Location_Type', 'Metric', 'Year_Range']
+
+# Python types of object-dtype category labels, stored as one code per label so mixed
+# labels (Year_Range holds 2018 next to '2018-2019') come back with their own types
+LABEL_TYPES = [str, int, float]
+
+
+def default_cache_dir(source_file):
+    """
+    Cache directory that lives next to the source workbook
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(source_file)), CACHE_DIR_NAME)
+
+
+def cache_paths(source_file, cache_dir=None):
+    """
+    Return the (data, metadata) file paths used to cache a given workbook
+    """
+    cache_dir = cache_dir or default_cache_dir(source_file)
+    base = os.path.join(cache_dir, os.path.basename(source_file))
+    return base + '.npz', base + '.json'
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's contents, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def to_categorical(df, columns=CATEGORICAL_COLUMNS):
+    """
+    Convert the known text dimensions of a frame to categorical dtype in place
+    """
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def source_stamp(source_file):
+    """
+    mtime, size and content hash identifying one version of a source file
+    """
+    stat = os.stat(source_file)
+    return {
+        'source': os.path.abspath(source_file),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': file_fingerprint(source_file),
+    }
+
+
+def source_unchanged(meta, source_file):
+    """
+    True when source_file still matches the stamp stored in meta
+    The mtime/size check is free; the content hash is only computed when they differ,
+    so touching the workbook without editing it does not force a rebuild. A matching
+    hash refreshes meta['mtime_ns'] (the caller decides whether to persist it)
+    """
+    stat = os.stat(source_file)
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+        return True
+    if meta['size'] != stat.st_size or meta['sha256'] != file_fingerprint(source_file):
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def encode_labels(categories):
+    """
+    Category labels as a plain array, plus one LABEL_TYPES code per label when the
+    labels are mixed Python objects (None for text or numeric labels); labels of
+    other types are kept as text
+    """
+    labels = categories.to_numpy()
+    if categories.dtype != object:
+        return (labels.astype(str) if labels.dtype == object else labels), None
+    types = np.array([LABEL_TYPES.index(type(label)) if type(label) in LABEL_TYPES else 0 for label in labels],
+                     dtype=np.int8)
+    return labels.astype(str), types
+
+
+def decode_labels(labels, types=None):
+    """
+    Category labels written by encode_labels, restored to their original types
+    """
+    if types is None:
+        return pd.Index(labels)
+    return pd.Index([LABEL_TYPES[kind](label) for label, kind in zip(labels.tolist(), types)], dtype=object)
+
+
+def is_text(dtype):
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+
+def encode_frame(df):
+    """
+    Split a frame into plain NumPy arrays for np.savez
+    Categorical and text columns become integer codes plus labels, and object
+    labels keep their types (see encode_labels); text columns are marked 'text' so
+    they decode to plain values again.
+    Returns (arrays, columns) where columns lists [name, kind] in order
+    """
+    arrays = {'__index__': df.index.to_numpy()}
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) or is_text(series.dtype):
+            kind = 'category' if isinstance(series.dtype, pd.CategoricalDtype) else 'text'
+            series = series.astype('category')
+            labels, types = encode_labels(series.cat.categories)
+            arrays[col + '.codes'] = series.cat.codes.to_numpy()
+            arrays[col + '.categories'] = labels
+            if types is not None:
+                arrays[col + '.types'] = types
+            columns.append([col, kind])
+        else:
+            arrays[col] = series.to_numpy()
+            columns.append([col, str(series.dtype)])
+    return arrays, columns
+
+
+def decode_categories(archive, col):
+    """
+    Category labels of one categorical or text column written by encode_frame
+    """
+    types = archive[col + '.types'] if col + '.types' in archive else None
+    return decode_labels(archive[col + '.categories'], types)
+
+
+def decode_column(codes, categories, kind):
+    """
+    Column values from category codes (-1 for missing): a Categorical for 'category'
+    columns, plain values for 'text' columns
+    """
+    if kind == 'category':
+        return pd.Categorical.from_codes(codes, categories=categories)
+    return categories.take(codes, allow_fill=True, fill_value=np.nan).array
+
+
+def decode_frame(archive, columns):
+    """
+    Rebuild a frame from arrays written by encode_frame
+    """
+    data = {}
+    for col, kind in columns:
+        if kind in ('category', 'text'):
+            data[col] = decode_column(archive[col + '.codes'], decode_categories(archive, col), kind)
+        else:
+            data[col] = archive[col]
+    return pd.DataFrame(data, index=archive['__index__'])
+
+
+def write_npz(path, arrays):
+    """
+    Write arrays to path via a temporary file so a crash never leaves a half-written file
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_meta(meta_path):
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def load_cached_frame(source_file, cache_dir=None):
+    """
+    Load the prepared frame for source_file from the columnar cache
+    Returns None when there is no cache or the workbook has changed since it was written
+    """
+    data_path, meta_path = cache_paths(source_file, cache_dir)
+    meta = read_meta(meta_path)
+    if meta is None or meta.get('version') != CACHE_VERSION or not os.path.exists(data_path):
+        return None
+
+    mtime_ns = meta['mtime_ns']
+    if not source_unchanged(meta, source_file):
+        return None
+    if meta['mtime_ns'] != mtime_ns:
+        # Same contents, new timestamp: remember it so the next start skips hashing
+        write_meta(meta_path, meta)
+
+    with np.load(data_path, allow_pickle=False) as archive:
+        return decode_frame(archive, meta['columns'])
+
+
+def save_cached_frame(df, source_file, cache_dir=None):
+    """
+    Write a prepared frame to the columnar cache, keyed by the workbook's mtime and hash
+    """
+    data_path, meta_path = cache_paths(source_file, cache_dir)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    arrays, columns = encode_frame(df)
+    write_npz(data_path, arrays)
+
+    meta = {'version': CACHE_VERSION}
+    meta.update(source_stamp(source_file))
+    meta['columns'] = columns
+    write_meta(meta_path, meta)
+    return data_path
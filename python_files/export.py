@@ -0,0 +1,170 @@
+import os
+import json
+import gzip
+import math
+import base64
+import numpy as np
+import plotly.io as pio
+from compact_dropdowns import compact_dropdown_post_script
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIONS = ('gzip', 'br')
+# Typed-array dtypes plotly uses for float data
+FLOAT_DTYPES = ('f4', 'f8')
+
+
+def significant(value, digits):
+    """
+    A float rounded to the given number of significant digits, None when it is NaN or
+    infinite and an int when it is whole (JavaScript reads 1200 and 1200.0 as the same number)
+    """
+    if not math.isfinite(value):
+        return None
+    rounded = float(f"{value:.{digits}g}")
+    return int(rounded) if rounded.is_integer() and abs(rounded) < 2 ** 53 else rounded
+
+
+def decode_float_array(obj, digits):
+    """
+    Decode a plotly typed array ({"dtype": "f8", "bdata": ..., "shape": ...}) into nested
+    lists of rounded floats. The base64 bytes take the same space however the values are
+    rounded; short decimal literals are what make the output smaller
+    """
+    values = np.frombuffer(base64.b64decode(obj['bdata']), dtype=obj['dtype'])
+    if 'shape' in obj:
+        values = values.reshape([int(size) for size in obj['shape'].split(',')])
+    rounded = np.vectorize(lambda value: significant(value, digits), otypes=[object])(values)
+    return rounded.tolist()
+
+
+def compact_floats(obj, digits):
+    """
+    Round every float in a JSON-like structure to the given number of significant digits,
+    including the float arrays plotly encodes as base64 typed arrays
+    """
+    if isinstance(obj, float):
+        return significant(obj, digits)
+    if isinstance(obj, list):
+        return [compact_floats(item, digits) for item in obj]
+    if isinstance(obj, dict):
+        if 'bdata' in obj and obj.get('dtype') in FLOAT_DTYPES:
+            return decode_float_array(obj, digits)
+        return {key: compact_floats(value, digits) for key, value in obj.items()}
+    return obj
+
+
+def precompress(path, methods=('gzip',)):
+    """
+    Write pre-compressed copies of a file next to it (path.gz, path.br) for static hosting
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    written = []
+    for method in methods:
+        if method == 'gzip':
+            target = path + '.gz'
+            # mtime=0 keeps the output byte-identical between runs
+            data = gzip.compress(raw, compresslevel=9, mtime=0)
+        elif method == 'br':
+            if brotli is None:
+                raise ImportError("Brotli compression requires the 'brotli' package (pip install brotli)")
+            target = path + '.br'
+            data = brotli.compress(raw, quality=11)
+        else:
+            raise ValueError(f"Unknown compression '{method}'. Expected one of {COMPRESSIONS}")
+        with open(target, 'wb') as f:
+            f.write(data)
+        written.append(target)
+    return written
+
+
+class HTMLExporter:
+    """
+    Writes chart figures as standalone HTML files
+    The defaults match fig.write_html() (plotly.js inlined in every file). With
+    shared_plotlyjs=True plotly.js is written once to out_dir and every chart file
+    references it; float_digits rounds the figure data to that many significant digits;
+    compress lists the pre-compressed copies ('gzip', 'br') to write next to each file
+    """
+    def __init__(self, out_dir='.', shared_plotlyjs=False, float_digits=None, compress=()):
+        for method in compress:
+            if method not in COMPRESSIONS:
+                raise ValueError(f"Unknown compression '{method}'. Expected one of {COMPRESSIONS}")
+        if 'br' in compress and brotli is None:
+            raise ImportError("Brotli compression requires the 'brotli' package (pip install brotli)")
+        self.out_dir = out_dir
+        self.shared_plotlyjs = shared_plotlyjs
+        self.float_digits = float_digits
+        self.compress = tuple(compress)
+
+    @property
+    def plotlyjs_filename(self):
+        # Imported on use: plotly.offline is slow to import (it loads IPython when installed)
+        from plotly.offline import get_plotlyjs_version
+        # Versioned name so browsers can cache it forever and upgrades never mix bundles
+        return f"plotly-{get_plotlyjs_version()}.min.js"
+
+    def prepare(self):
+        """
+        Create out_dir and, in shared mode, write the plotly.js bundle once
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        if not self.shared_plotlyjs:
+            return
+        bundle_path = os.path.join(self.out_dir, self.plotlyjs_filename)
+        if not os.path.exists(bundle_path):
+            from plotly.offline import get_plotlyjs
+            with open(bundle_path, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+        if self.compress:
+            precompress(bundle_path, self.compress)
+
+    def to_html(self, fig, include_plotlyjs=None, **kwargs):
+        """
+        Render a figure to an HTML string using this exporter's options
+        """
+        if include_plotlyjs is None:
+            include_plotlyjs = self.plotlyjs_filename if self.shared_plotlyjs else True
+        kwargs.setdefault('post_script', compact_dropdown_post_script(fig))
+        if self.float_digits is None:
+            return fig.to_html(include_plotlyjs=include_plotlyjs, **kwargs)
+        fig_dict = compact_floats(json.loads(fig.to_json()), self.float_digits)
+        return pio.to_html(fig_dict, include_plotlyjs=include_plotlyjs, validate=False, **kwargs)
+
+    def figure_json(self, fig):
+        """
+        Compact JSON for a figure ({"data": ..., "layout": ...}) that is safe to embed in a <script> tag
+        """
+        if self.float_digits is None:
+            fig_json = fig.to_json()
+        else:
+            fig_dict = compact_floats(json.loads(fig.to_json()), self.float_digits)
+            fig_json = json.dumps(fig_dict, separators=(',', ':'))
+        return fig_json.replace('</', '<\\/')
+
+    def write_text(self, filename, html):
+        """
+        Write an HTML string to out_dir (plus any pre-compressed copies), returning its path
+        """
+        path = os.path.join(self.out_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        if self.compress:
+            precompress(path, self.compress)
+        return path
+
+    def write(self, fig, chart_name):
+        """
+        Write one chart as <chart_name>.html, returning its path
+        """
+        if not self.shared_plotlyjs and self.float_digits is None and not self.compress:
+            # Plain mode: identical to the original fig.write_html() output
+            path = os.path.join(self.out_dir, f"{chart_name}.html")
+            fig.write_html(path, post_script=compact_dropdown_post_script(fig))
+            return path
+        # A fixed div id keeps the output byte-identical when the figure is unchanged
+        return self.write_text(f"{chart_name}.html", self.to_html(fig, div_id=f"div_{chart_name}"))
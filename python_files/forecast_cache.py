@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from data_cache import CACHE_DIR_NAME, default_cache_dir, write_npz
+
+# Bump whenever the stored columns or the key recipe change
+FORECAST_CACHE_VERSION = 2
+FORECAST_CACHE_DIR_NAME = 'forecasts'
+
+# Columns kept from a model's forecast frame (all the tidy forecast needs)
+CACHED_COLUMNS = ['yhat', 'yhat_lower', 'yhat_upper']
+
+DEFAULT_MAX_BYTES = 256 << 20
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def default_forecast_cache_dir(source_file=None):
+    """
+    Forecast cache directory: inside the data cache next to the source workbook,
+    or under the current directory when the data did not come from a file
+    """
+    cache_dir = default_cache_dir(source_file) if source_file else os.path.abspath(CACHE_DIR_NAME)
+    return os.path.join(cache_dir, FORECAST_CACHE_DIR_NAME)
+
+
+def nanoseconds(ds):
+    """
+    Dates as int64 nanoseconds since the epoch, whatever unit the datetime column uses
+    """
+    return pd.DatetimeIndex(ds).as_unit('ns').asi8
+
+
+def forecast_key(model, params, horizon, key, history):
+    """
+    Hash identifying one fit: the series key, its years and values, the model,
+    its hyperparameters and the horizon
+    """
+    digest = hashlib.sha256()
+    header = [FORECAST_CACHE_VERSION, model, params, horizon, [str(part) for part in key]]
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    digest.update(nanoseconds(history['ds']).tobytes())
+    digest.update(history['y'].to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """
+    Persistent cache of forecast frames, one .npz per fitted series
+    Entries are keyed by forecast_key(), so a series is only refitted when its data,
+    the model settings or the horizon change. A file's mtime doubles as its last-use
+    time: reads touch it, and evict() drops the least recently used entries once the
+    cache grows past max_bytes or max_entries
+    """
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir or default_forecast_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.npz')
+
+    def get(self, key):
+        """
+        Cached forecast frame (ds plus CACHED_COLUMNS) for key, or None
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                frame = pd.DataFrame({'ds': pd.to_datetime(archive['ds'], unit='ns')})
+                for col in CACHED_COLUMNS:
+                    frame[col] = archive[col]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return frame
+
+    def put(self, key, forecast):
+        """
+        Store the ds and CACHED_COLUMNS of a model's forecast frame under key
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Dates are stored as int64 nanoseconds since the epoch
+        arrays = {'ds': nanoseconds(forecast['ds'])}
+        for col in CACHED_COLUMNS:
+            arrays[col] = forecast[col].to_numpy(dtype=float)
+        write_npz(path, arrays)
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits max_bytes and max_entries
+        Returns the number of entries removed
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.npz'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            os.remove(path)
+            total -= size
+            count -= 1
+            removed += 1
+        return removed
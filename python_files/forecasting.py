@@ -0,0 +1,225 @@
+import os
+import logging
+import importlib.util
+import traceback
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from forecast_cache import forecast_key
+from baseline import BASELINE_MODELS, baseline_forecasts
+
+DEFAULT_HORIZON = 3
+
+# Batched NumPy baseline used unless Prophet is asked for (see baseline.py)
+DEFAULT_MODEL = 'holt'
+
+# Same settings as the industry forecasts in GDP.ipynb
+DEFAULT_PROPHET_PARAMS = {'yearly_seasonality': True, 'weekly_seasonality': False, 'daily_seasonality': False}
+
+# Environment variables read by the BLAS/OpenMP runtimes numpy, scipy and Stan link against
+THREAD_LIMIT_VARIABLES = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                          'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS', 'STAN_NUM_THREADS']
+
+# Columns of the tidy forecast frame, after the series key columns
+FORECAST_COLUMNS = ['Year', 'ds', 'y', 'yhat', 'yhat_lower', 'yhat_upper', 'Type']
+
+
+def fit_prophet(history, horizon, params):
+    """
+    Fit one Prophet model on a (ds, y) history and predict horizon more years
+    Returns Prophet's forecast frame (ds, yhat, yhat_lower, yhat_upper, ...) covering
+    the history and the future years
+    """
+    from prophet import Prophet
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+    model = Prophet(**params)
+    model.fit(history)
+    # Year-start steps keep future dates on the same Jan 1 grid as the history
+    future = model.make_future_dataframe(periods=horizon, freq='YS')
+    return model.predict(future)
+
+
+# Model name -> fit function(history, horizon, params) returning a Prophet-style frame.
+# The BASELINE_MODELS are fitted to all series at once instead
+MODELS = {
+    'prophet': fit_prophet,
+}
+
+
+def _limit_worker_threads(threads):
+    """
+    Process pool initializer: cap the threads each worker's numeric libraries may use,
+    so N workers on N cores do not each start N BLAS/OpenMP threads
+    """
+    for name in THREAD_LIMIT_VARIABLES:
+        os.environ[name] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def _fit_series(model, key, history, horizon, params):
+    """
+    Fit one series; returns (key, forecast frame, error traceback)
+    """
+    try:
+        return key, MODELS[model](history, horizon, params), None
+    except Exception:
+        return key, None, traceback.format_exc()
+
+
+def series_by(df, by, metric='GDP', location_type=None, value_col='Value'):
+    """
+    Split a prepared frame into one yearly (ds, y) history per group of the by columns
+    Values of the chosen metric are summed per group and Start_Year; location_type
+    (e.g. 'Region') keeps only rows of that Location_Type, as the regional forecasts do
+    Returns {key tuple: history frame}, in sorted key order
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    rows = df[df['Metric'] == metric]
+    if location_type is not None:
+        rows = rows[rows['Location_Type'] == location_type]
+    totals = rows.groupby(by + ['Start_Year'], observed=True)[value_col].sum().reset_index()
+    totals['ds'] = pd.to_datetime(totals['Start_Year'].astype(int).astype(str), format='%Y')
+    totals = totals.rename(columns={value_col: 'y'}).dropna(subset=['y'])
+
+    series = {}
+    for key, group in totals.groupby(by, observed=True, sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        series[key] = group[['ds', 'y']].sort_values('ds').reset_index(drop=True)
+    return series
+
+
+class ForecastEngine:
+    """
+    Fits one independent forecasting model per series on a process pool
+    Replaces the notebook's region-by-region / industry-by-industry Prophet loops:
+    fits fan out over workers (each capped at threads_per_worker BLAS/OpenMP threads),
+    results are streamed back as they finish and collected into one tidy frame
+    With a ForecastCache, series whose data and settings are unchanged are read back
+    instead of refitted. Baseline models ('linear', 'log_linear', 'holt', 'cagr') skip
+    the pool and the cache: they fit every series in one batched NumPy pass
+    """
+    def __init__(self, model=DEFAULT_MODEL, horizon=DEFAULT_HORIZON, workers=None, threads_per_worker=1,
+                 min_points=2, cache=None, **params):
+        if model not in MODELS and model not in BASELINE_MODELS:
+            raise ValueError(
+                f"Unknown forecasting model '{model}'. Expected one of {list(MODELS) + list(BASELINE_MODELS)}"
+            )
+        # Fail once up front instead of once per series inside the workers
+        if model == 'prophet' and importlib.util.find_spec('prophet') is None:
+            raise ImportError("The 'prophet' model needs the prophet package (pip install prophet)")
+        self.model = model
+        self.horizon = horizon
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        # Prophet needs at least two points to fit
+        self.min_points = min_points
+        self.params = params or (dict(DEFAULT_PROPHET_PARAMS) if model == 'prophet' else {})
+        self.cache = cache
+        self.errors = {}
+        self.skipped = []
+
+    def iter_forecasts(self, series):
+        """
+        Fit every series in {key: (ds, y) history} and yield (key, forecast, error)
+        in completion order; forecast is None and error a traceback when a fit fails.
+        Series shorter than min_points are skipped (listed in self.skipped); cached
+        series are yielded first
+        """
+        tasks = {key: history for key, history in series.items() if len(history) >= self.min_points}
+        self.skipped = [key for key in series if key not in tasks]
+        if self.model in BASELINE_MODELS:
+            if tasks:
+                yield from baseline_forecasts(tasks, self.model, self.horizon, self.params)
+            return
+
+        cache_keys = {}
+        if self.cache is not None:
+            for key, history in list(tasks.items()):
+                cache_keys[key] = forecast_key(self.model, self.params, self.horizon, key, history)
+                cached = self.cache.get(cache_keys[key])
+                if cached is not None:
+                    del tasks[key]
+                    yield key, cached, None
+
+        for key, forecast, error in self._fit_all(tasks):
+            if error is None and self.cache is not None:
+                self.cache.put(cache_keys[key], forecast)
+            yield key, forecast, error
+
+        if self.cache is not None:
+            self.cache.evict()
+
+    def _fit_all(self, tasks):
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(tasks) <= 1:
+            for key, history in tasks.items():
+                yield _fit_series(self.model, key, history, self.horizon, self.params)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_limit_worker_threads,
+            initargs=(self.threads_per_worker,)
+        ) as pool:
+            futures = [
+                pool.submit(_fit_series, self.model, key, history, self.horizon, self.params)
+                for key, history in tasks.items()
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def forecast(self, series, key_names):
+        """
+        Fit every series and return one tidy frame: key_names columns, then Year, ds,
+        y (actual, NaN for future years), yhat, yhat_lower, yhat_upper and Type
+        ('Historical' or 'Forecast'), sorted by key and year
+        Failed fits are left out and recorded in self.errors, series too short to fit
+        in self.skipped
+        """
+        self.errors = {}
+        parts = []
+        for key, forecast, error in self.iter_forecasts(series):
+            if error is not None:
+                self.errors[key] = error
+                print(f"Forecast for {key} failed:\n{error}")
+                continue
+            parts.append(self._tidy(key, series[key], forecast))
+
+        key_names = list(key_names)
+        if not parts:
+            return pd.DataFrame(columns=key_names + FORECAST_COLUMNS)
+
+        # Concatenate plain arrays once rather than one small DataFrame per series
+        lengths = [len(part['ds']) for part in parts]
+        data = {}
+        for i, name in enumerate(key_names):
+            data[name] = np.repeat(np.array([part['key'][i] for part in parts], dtype=object), lengths)
+        for col in ['ds', 'y', 'yhat', 'yhat_lower', 'yhat_upper', 'Type']:
+            data[col] = np.concatenate([part[col] for part in parts])
+        result = pd.DataFrame(data)
+        result.insert(len(key_names), 'Year', result['ds'].dt.year)
+        return result.sort_values(key_names + ['Year']).reset_index(drop=True)
+
+    @staticmethod
+    def _tidy(key, history, forecast):
+        """
+        One series' forecast as arrays, with the actual y aligned on ds
+        """
+        ds = pd.DatetimeIndex(forecast['ds'])
+        history_ds = pd.DatetimeIndex(history['ds'])
+        positions = history_ds.get_indexer(ds)
+        actual = history['y'].to_numpy(dtype=float)
+        return {
+            'key': key,
+            'ds': ds.to_numpy(),
+            'y': np.where(positions >= 0, actual[positions], np.nan),
+            'yhat': np.asarray(forecast['yhat'], dtype=float),
+            'yhat_lower': np.asarray(forecast['yhat_lower'], dtype=float),
+            'yhat_upper': np.asarray(forecast['yhat_upper'], dtype=float),
+            'Type': np.where(ds <= history_ds.max(), 'Historical', 'Forecast'),
+        }
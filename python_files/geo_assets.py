@@ -0,0 +1,243 @@
+import os
+import json
+import numpy as np
+from data_cache import source_stamp, source_unchanged, read_meta, write_meta
+
+# Region boundaries shipped next to the dashboard code
+DEFAULT_GEOJSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'philippines_regions.json')
+
+# Douglas-Peucker tolerance in degrees (0.01 deg is about 1.1 km) and decimals kept
+DEFAULT_TOLERANCE = 0.01
+DEFAULT_DIGITS = 3
+
+GEO_ASSET_VERSION = 1
+
+def load_geojson(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def simplify_line(points, tolerance):
+    """
+    Douglas-Peucker simplification of an (n, 2) array of points
+    Iterative, so long rings do not hit the recursion limit; endpoints are always kept
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            # Closed ring: measure from the shared start/end point
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def compact_ring(ring, tolerance, digits):
+    """
+    Simplify and quantize one linear ring; None when it collapses below a triangle
+    """
+    points = simplify_line(np.asarray(ring, dtype=float), tolerance)
+    points = np.round(points, digits)
+    # Rounding can make neighbours identical; drop the repeats
+    distinct = np.r_[True, np.any(np.diff(points, axis=0) != 0, axis=1)]
+    points = points[distinct]
+    if np.any(points[0] != points[-1]):
+        points = np.vstack([points, points[:1]])
+    if len(points) < 4:
+        return None
+    return points.tolist()
+
+
+def compact_geometry(geometry, tolerance, digits):
+    """
+    Polygon/MultiPolygon with every ring simplified and quantized
+    Islands that collapse are dropped, but a feature always keeps its largest polygon
+    """
+    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+    kept = []
+    for polygon in polygons:
+        exterior = compact_ring(polygon[0], tolerance, digits)
+        if exterior is None:
+            continue
+        holes = [ring for ring in (compact_ring(hole, tolerance, digits) for hole in polygon[1:]) if ring]
+        kept.append([exterior] + holes)
+
+    if not kept:
+        largest = max(polygons, key=lambda polygon: len(polygon[0]))
+        kept = [[compact_ring(largest[0], 0, digits) or largest[0]]]
+    if len(kept) == 1:
+        return {'type': 'Polygon', 'coordinates': kept[0]}
+    return {'type': 'MultiPolygon', 'coordinates': kept}
+
+
+def _bbox(geometry):
+    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+    points = np.array([point for polygon in polygons for point in polygon[0]])
+    return np.round(np.r_[points.min(axis=0), points.max(axis=0)], DEFAULT_DIGITS).tolist()
+
+
+def compact_geojson(geojson, tolerance=DEFAULT_TOLERANCE, digits=DEFAULT_DIGITS):
+    """
+    Copy of a FeatureCollection with simplified, quantized geometry and only the
+    properties the maps use (name and code)
+    """
+    features = []
+    for feature in geojson['features']:
+        properties = feature.get('properties', {})
+        features.append({
+            'type': 'Feature',
+            'id': feature['id'],
+            'properties': {'name': properties.get('name'), 'code': properties.get('id')},
+            'geometry': compact_geometry(feature['geometry'], tolerance, digits),
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def geojson_index(geojson):
+    """
+    Name -> feature id lookup plus per-feature code and bounding box
+    """
+    return {
+        'name_to_id': {feature['properties']['name']: feature['id'] for feature in geojson['features']},
+        'features': [
+            {
+                'id': feature['id'],
+                'name': feature['properties'].get('name'),
+                'code': feature['properties'].get('code', feature['properties'].get('id')),
+                'bbox': _bbox(feature['geometry']),
+            }
+            for feature in geojson['features']
+        ],
+    }
+
+
+def count_points(geojson):
+    total = 0
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+        total += sum(len(ring) for polygon in polygons for ring in polygon)
+    return total
+
+
+class GeoAsset:
+    """
+    A compact GeoJSON file written next to the HTML output plus its name -> id index
+    Maps reference it by URL (plotly loads a string geojson with fetch), so the
+    geometry is downloaded once and cached by the browser instead of being inlined in
+    every map. Browsers block fetch() from file:// pages, so open such maps through a
+    web server, or pass inline=True to figure_geojson()
+    """
+    def __init__(self, source, out_dir='.', tolerance=DEFAULT_TOLERANCE, digits=DEFAULT_DIGITS):
+        self.source = source
+        self.out_dir = out_dir
+        self.tolerance = tolerance
+        self.digits = digits
+        stem = os.path.splitext(os.path.basename(source))[0]
+        self.filename = f"{stem}.t{tolerance:g}.q{digits}.json"
+        self.path = os.path.join(out_dir, self.filename)
+        self.index_path = os.path.join(out_dir, f"{stem}.index.json")
+        self.meta_path = self.path + '.meta'
+        self._index = None
+        self._geojson = None
+
+    def is_current(self):
+        meta = read_meta(self.meta_path)
+        if meta is None or meta.get('version') != GEO_ASSET_VERSION:
+            return False
+        if not (os.path.exists(self.path) and os.path.exists(self.index_path)):
+            return False
+        return source_unchanged(meta, self.source)
+
+    def build(self, force=False):
+        """
+        Write the compact asset and index unless they are already up to date
+        Returns self so callers can chain .build().index
+        """
+        if not force and self.is_current():
+            return self
+        os.makedirs(self.out_dir, exist_ok=True)
+        original = load_geojson(self.source)
+        compact = compact_geojson(original, self.tolerance, self.digits)
+        index = geojson_index(compact)
+
+        for path, data in ((self.path, compact), (self.index_path, index)):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+
+        meta = {'version': GEO_ASSET_VERSION, 'tolerance': self.tolerance, 'digits': self.digits}
+        meta.update(source_stamp(self.source))
+        meta['points'] = [count_points(original), count_points(compact)]
+        meta['bytes'] = [os.path.getsize(self.source), os.path.getsize(self.path)]
+        write_meta(self.meta_path, meta)
+        print(f"Map asset {self.filename}: {meta['points'][0]} -> {meta['points'][1]} points, "
+              f"{meta['bytes'][0]} -> {meta['bytes'][1]} bytes")
+        self._index = index
+        self._geojson = compact
+        return self
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        return self._index
+
+    def ids_for(self, names):
+        """
+        Feature ids for a sequence of GeoJSON names (None where a name is unknown)
+        """
+        name_to_id = self.index['name_to_id']
+        return [name_to_id.get(name) for name in names]
+
+    def figure_geojson(self, inline=False):
+        """
+        Value for a choroplethmap trace's geojson: the asset's relative URL, or the
+        compact GeoJSON itself when inline=True
+        """
+        if not inline:
+            return self.filename
+        if self._geojson is None:
+            self._geojson = load_geojson(self.path)
+        return self._geojson
+
+
+def build_geo_assets(source=DEFAULT_GEOJSON, out_dir='.', tolerances=(DEFAULT_TOLERANCE,), digits=DEFAULT_DIGITS):
+    """
+    Build one compact asset per simplification tolerance (e.g. a coarse one for
+    overview maps and a finer one for zoomed-in views)
+    """
+    return [GeoAsset(source, out_dir, tolerance, digits).build() for tolerance in tolerances]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build compact map assets from a GeoJSON file")
+    parser.add_argument('source', nargs='?', default=DEFAULT_GEOJSON)
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--tolerance', type=float, nargs='+', default=[DEFAULT_TOLERANCE],
+                        help="simplification tolerance(s) in degrees")
+    parser.add_argument('--digits', type=int, default=DEFAULT_DIGITS, help="decimals kept per coordinate")
+    args = parser.parse_args()
+    for asset in build_geo_assets(args.source, args.out_dir, args.tolerance, args.digits):
+        print(f"Map asset ready: {asset.path}")
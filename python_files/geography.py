@@ -0,0 +1,135 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Geographic levels from the top down; a level's code is its position
+LEVELS = ('national', 'region', 'province', 'municipality', 'other')
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+# Location_Type -> level. Highly urbanized cities (HUCs) sit beside provinces
+LOCATION_TYPE_LEVELS = {
+    'Region': 'region',
+    'Province': 'province',
+    'City': 'province',
+    'Province/City': 'province',
+    'Municipality': 'municipality',
+}
+
+# Location_Type values missing from the table that still count as province-level rows
+PROVINCE_PATTERN = 'Province|City'
+
+NATIONAL_NAME = 'Philippines'
+
+
+def type_level(location_type):
+    """
+    Level name for one Location_Type value
+    """
+    if location_type in LOCATION_TYPE_LEVELS:
+        return LOCATION_TYPE_LEVELS[location_type]
+    if isinstance(location_type, str) and re.search(PROVINCE_PATTERN, location_type, re.IGNORECASE):
+        return 'province'
+    return 'other'
+
+
+def level_codes(location_types):
+    """
+    Level code (position in LEVELS) for every row of a Location_Type column
+    Each distinct type is classified once and spread over the rows by category code,
+    so the cost per row is one array lookup; missing types count as 'other'
+    """
+    types = pd.Series(location_types).astype('category')
+    type_codes = [LEVEL_CODES[type_level(name)] for name in types.cat.categories]
+    # Code -1 (missing) picks the trailing 'other'
+    table = np.array(type_codes + [LEVEL_CODES['other']], dtype=np.int8)
+    return table[types.cat.codes.to_numpy()]
+
+
+class GeoHierarchy:
+    """
+    National -> region -> province/HUC tree over the rows of the prepared frame
+    Built once per frame: every row gets a level code and a node, every node a parent
+    (locations below region level hang off their region, the regions off the national
+    root). Level masks are cached, and the Value total of every node's subtree per
+    year is summed once, so level filters and child-of-parent shares are array
+    lookups. New levels (e.g. municipalities) only need a LOCATION_TYPE_LEVELS entry
+    """
+    def __init__(self, df, value_col='Value', year_col='Start_Year'):
+        self.row_levels = level_codes(df['Location_Type'])
+        region_codes, regions = pd.factorize(df['Region'])
+        name_codes, names = pd.factorize(df['Location_Name'])
+
+        # One node per distinct (Region, Location_Name) below region level
+        below = (self.row_levels > LEVEL_CODES['region']) & (region_codes >= 0) & (name_codes >= 0)
+        pair_codes, pairs = pd.factorize(region_codes[below].astype(np.int64) * len(names) + name_codes[below])
+        first_location = 1 + len(regions)
+
+        self.names = np.concatenate([[NATIONAL_NAME], np.asarray(regions, dtype=object),
+                                     np.asarray(names, dtype=object)[pairs % max(len(names), 1)]])
+        self.parents = np.concatenate([[-1], np.zeros(len(regions), dtype=np.int64), 1 + pairs // max(len(names), 1)])
+        self.node_levels = np.full(len(self.names), LEVEL_CODES['province'], dtype=np.int8)
+        self.node_levels[0] = LEVEL_CODES['national']
+        self.node_levels[1:first_location] = LEVEL_CODES['region']
+        self.node_levels[first_location + pair_codes] = self.row_levels[below]
+
+        # Rows: locations to their node, region rows (and unnamed rows) to their region, the rest to the root
+        self.row_nodes = np.where(region_codes >= 0, 1 + region_codes, 0)
+        self.row_nodes[below] = first_location + pair_codes
+        self.row_nodes[self.row_levels == LEVEL_CODES['national']] = 0
+
+        self.years = np.unique(df[year_col].to_numpy(dtype=float))
+        self.row_years = np.searchsorted(self.years, df[year_col].to_numpy(dtype=float))
+        self.values = df[value_col].to_numpy(dtype=float)
+        self._masks = {}
+        self._totals = None
+
+    @property
+    def nodes(self):
+        """
+        One row per node: Name, Level and Parent (node number, -1 for the root)
+        """
+        return pd.DataFrame({
+            'Name': self.names,
+            'Level': np.array(LEVELS, dtype=object)[self.node_levels],
+            'Parent': self.parents,
+        })
+
+    def mask(self, level):
+        """
+        Boolean mask of the rows at a level (cached)
+        """
+        if level not in LEVEL_CODES:
+            raise ValueError(f"Unknown level '{level}'. Expected one of {LEVELS}")
+        if level not in self._masks:
+            self._masks[level] = self.row_levels == LEVEL_CODES[level]
+        return self._masks[level]
+
+    def children(self, node):
+        return np.flatnonzero(self.parents == node)
+
+    def subtree_totals(self):
+        """
+        Node x year array: the Value sum of the rows at each node and all nodes below it
+        (a region's total covers its own rows and every province row under it)
+        """
+        if self._totals is None:
+            n_years = len(self.years)
+            cells = self.row_nodes * n_years + self.row_years
+            valid = ~np.isnan(self.values)
+            totals = np.bincount(cells[valid], weights=self.values[valid], minlength=len(self.names) * n_years)
+            totals = totals.reshape(len(self.names), n_years)
+            # Fold children into parents from the deepest level up
+            for code in sorted(set(self.node_levels.tolist()), reverse=True):
+                nodes = np.flatnonzero((self.node_levels == code) & (self.parents >= 0))
+                np.add.at(totals, self.parents[nodes], totals[nodes])
+            self._totals = totals
+        return self._totals
+
+    def parent_total(self, rows):
+        """
+        For each row position, the subtree total of its node's parent in the row's year
+        (e.g. the regional total a province row's share is taken of)
+        """
+        parents = self.parents[self.row_nodes[rows]]
+        totals = self.subtree_totals()[np.maximum(parents, 0), self.row_years[rows]]
+        return np.where(parents >= 0, totals, np.nan)
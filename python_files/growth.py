@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+class GrowthPanel:
+    """
+    Dense entity x year array of Value with vectorized growth measures
+    Built from a rollup with one row per entity-year (e.g. Region x Start_Year);
+    year-over-year growth, multi-year change/CAGR and child-minus-parent gaps are
+    computed for every entity at once instead of per-chart sort + pct_change + merge
+    """
+    def __init__(self, frame, entity_cols, year_col='Start_Year', value_col='Value'):
+        self.frame = frame.sort_values(list(entity_cols) + [year_col]).reset_index(drop=True)
+        self.entity_cols = list(entity_cols)
+        self.year_col = year_col
+        self.value_col = value_col
+        self.years = np.sort(self.frame[year_col].unique())
+
+        # Row -> (entity, year) cell; rows are sorted so entity numbers follow that order
+        if self.entity_cols:
+            self.row_entity = self.frame.groupby(self.entity_cols, observed=True, sort=False).ngroup().to_numpy()
+            first_rows = np.flatnonzero(np.r_[True, np.diff(self.row_entity) != 0])
+            self.entities = self.frame.loc[first_rows, self.entity_cols].reset_index(drop=True)
+        else:
+            self.row_entity = np.zeros(len(self.frame), dtype=int)
+            self.entities = pd.DataFrame(index=range(1))
+        self.row_year = np.searchsorted(self.years, self.frame[year_col].to_numpy())
+
+        self.values = np.full((len(self.entities), len(self.years)), np.nan)
+        self.values[self.row_entity, self.row_year] = self.frame[value_col].to_numpy(dtype=float)
+
+    def _year_index(self, year):
+        idx = np.searchsorted(self.years, year)
+        if idx >= len(self.years) or self.years[idx] != year:
+            return None
+        return idx
+
+    def value_at(self, year):
+        """
+        Value of every entity in a given year (NaN where missing)
+        """
+        idx = self._year_index(year)
+        if idx is None:
+            return np.full(len(self.entities), np.nan)
+        return self.values[:, idx]
+
+    def yoy(self):
+        """
+        Year-over-year growth (%) for every entity and year; NaN for the first year
+        and wherever the previous calendar year is missing
+        """
+        growth = np.full(self.values.shape, np.nan)
+        consecutive = np.diff(self.years) == 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = (self.values[:, 1:] / self.values[:, :-1] - 1) * 100
+        growth[:, 1:] = np.where(consecutive, step, np.nan)
+        return growth
+
+    def mean_yoy(self):
+        """
+        Average year-over-year growth (%) per entity, ignoring missing years
+        """
+        growth = self.yoy()
+        counts = np.sum(~np.isnan(growth), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, np.nansum(growth, axis=1) / counts, np.nan)
+
+    def change(self, base_year, target_year):
+        """
+        Total growth (%) between two arbitrary years for every entity
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.value_at(target_year) / self.value_at(base_year) - 1) * 100
+
+    def cagr(self, base_year, target_year):
+        """
+        Compound annual growth rate (%) between two arbitrary years for every entity
+        """
+        periods = target_year - base_year
+        if periods <= 0:
+            raise ValueError("target_year must be after base_year")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = self.value_at(target_year) / self.value_at(base_year)
+            return (np.power(ratio, 1.0 / periods) - 1) * 100
+
+    def parent_index(self, parent):
+        """
+        Row of parent.entities that each entity belongs to (-1 if none)
+        The parent's entity columns must be a subset of this panel's (e.g. Region for Region x Province)
+        """
+        parent_keys = pd.MultiIndex.from_frame(parent.entities[parent.entity_cols].astype(object))
+        child_keys = pd.MultiIndex.from_frame(self.entities[parent.entity_cols].astype(object))
+        return parent_keys.get_indexer(child_keys)
+
+    def align_parent(self, parent, parent_values):
+        """
+        Broadcast a parent entity x year array onto this panel's entities and years
+        """
+        rows = self.parent_index(parent)
+        cols = np.searchsorted(parent.years, self.years)
+        cols = np.minimum(cols, len(parent.years) - 1)
+        valid_cols = parent.years[cols] == self.years
+        aligned = parent_values[np.maximum(rows, 0)][:, cols]
+        aligned[rows < 0] = np.nan
+        aligned[:, ~valid_cols] = np.nan
+        return aligned
+
+    def gap(self, parent):
+        """
+        Year-over-year growth minus the parent's growth (e.g. province minus region), in points
+        """
+        return self.yoy() - self.align_parent(parent, parent.yoy())
+
+    def to_frame(self, columns):
+        """
+        The source rollup with extra per entity-year columns from {name: entity x year array}
+        """
+        frame = self.frame.copy()
+        for name, values in columns.items():
+            frame[name] = values[self.row_entity, self.row_year]
+        return frame
+
+    def entity_frame(self, columns):
+        """
+        One row per entity with extra columns from {name: per-entity array}
+        """
+        frame = self.entities.copy()
+        for name, values in columns.items():
+            frame[name] = values
+        return frame
@@ -0,0 +1,187 @@
+import os
+import asyncio
+import threading
+import traceback
+import hashlib
+import importlib.metadata
+from incremental import BuildManifest
+
+IMAGE_FORMATS = ('png', 'svg', 'pdf', 'jpeg', 'webp')
+
+# Charts only set their height; wide enough for the rotated region labels
+DEFAULT_WIDTH = 1200
+DEFAULT_SCALE = 1
+
+# kaleido 1.x drives an installed Chrome; plotly 6+ no longer works with kaleido 0.2
+KALEIDO_REQUIREMENT = "kaleido>=1 (pip install 'kaleido>=1', then run kaleido_get_chrome if Chrome is not installed)"
+
+
+def check_kaleido():
+    """
+    Raise ImportError unless kaleido 1.x or later is installed
+    """
+    try:
+        version = importlib.metadata.version('kaleido')
+    except importlib.metadata.PackageNotFoundError:
+        raise ImportError(f"Static image export needs {KALEIDO_REQUIREMENT}") from None
+    if int(version.split('.')[0]) < 1:
+        raise ImportError(f"Static image export needs {KALEIDO_REQUIREMENT}; found kaleido {version}")
+
+
+class ImageExporter:
+    """
+    Writes chart figures as static images (<chart_name>.<format>) through one
+    persistent kaleido renderer
+    The renderer is a kaleido.Kaleido, i.e. one headless Chrome with `renderers` tabs,
+    started on first use and reused for every later figure, so a batch pays one
+    browser start-up instead of one per figure (as fig.write_image does). It runs on
+    its own event loop thread; a batch is submitted at once and drawn in parallel
+    across the tabs. plotly.js comes from the installed plotly package and MathJax is
+    disabled, so nothing is fetched from the network. Figures whose JSON and image
+    options are unchanged since the last export (see BuildManifest) are not redrawn
+    """
+    def __init__(self, out_dir='.', format='png', width=DEFAULT_WIDTH, height=None, scale=DEFAULT_SCALE,
+                 renderers=1):
+        if format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{format}'. Expected one of {IMAGE_FORMATS}")
+        # Fail once up front instead of once per figure
+        check_kaleido()
+        self.out_dir = out_dir
+        self.format = format
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.renderers = max(1, renderers or 1)
+        self._kaleido = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.errors = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def prepare(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+
+    def _run(self, coroutine):
+        """
+        Run a coroutine on the renderer's event loop and wait for its result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _open(self):
+        from kaleido import Kaleido
+        kaleido = Kaleido(n=self.renderers, mathjax=False)
+        await kaleido.open()
+        return kaleido
+
+    def start(self):
+        """
+        Start the renderer (Chrome and its tabs) unless it is already running
+        Raises choreographer's ChromeNotFoundError when no Chrome is installed
+        """
+        with self._lock:
+            if self._kaleido is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name='kaleido', daemon=True)
+            self._thread.start()
+            try:
+                self._kaleido = self._run(self._open())
+            except BaseException:
+                self._stop_loop()
+                raise
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    def close(self):
+        """
+        Stop the renderer's Chrome process and event loop thread
+        """
+        with self._lock:
+            if self._kaleido is None:
+                return
+            try:
+                self._run(self._kaleido.close())
+            finally:
+                self._kaleido = None
+                self._stop_loop()
+
+    def options(self):
+        return {'format': self.format, 'width': self.width, 'height': self.height, 'scale': self.scale}
+
+    def fingerprint(self, fig):
+        options = repr(sorted(self.options().items()))
+        return hashlib.sha256(options.encode() + fig.to_json().encode()).hexdigest()
+
+    def render(self, fig):
+        """
+        Image bytes for one figure
+        """
+        self.start()
+        return self._run(self._kaleido.calc_fig(fig, opts=self.options()))
+
+    def write(self, fig, chart_name):
+        """
+        Write one figure as <chart_name>.<format>, returning its path
+        """
+        path = os.path.join(self.out_dir, f"{chart_name}.{self.format}")
+        image = self.render(fig)
+        with open(path, 'wb') as f:
+            f.write(image)
+        return path
+
+    async def _write_one(self, chart_name, fig):
+        path = os.path.join(self.out_dir, f"{chart_name}.{self.format}")
+        try:
+            image = await self._kaleido.calc_fig(fig, opts=self.options())
+            with open(path, 'wb') as f:
+                f.write(image)
+            return chart_name, path, None
+        except Exception as e:
+            return chart_name, None, ''.join(traceback.format_exception(e))
+
+    async def _write_batch(self, figures):
+        return await asyncio.gather(*(self._write_one(name, fig) for name, fig in figures.items()))
+
+    def write_all(self, figures, skip_unchanged=True):
+        """
+        Write {chart_name: figure} as images, in parallel across the renderer's tabs
+        Returns {chart_name: path} for every figure written now or left unchanged;
+        figures that failed to render are reported and kept in self.errors
+        """
+        self.prepare()
+        manifest = BuildManifest(self.out_dir)
+        fingerprints = {name: self.fingerprint(fig) for name, fig in figures.items()}
+        filenames = {name: f"{name}.{self.format}" for name in figures}
+        pending = [
+            name for name in figures
+            if not (skip_unchanged and manifest.is_current(filenames[name], fingerprints[name],
+                                                           stored_figure=False, filename=filenames[name]))
+        ]
+        print(f"Image export: {len(pending)} {self.format} files to draw, {len(figures) - len(pending)} unchanged")
+
+        results = []
+        if pending:
+            self.start()
+            results = self._run(self._write_batch({name: figures[name] for name in pending}))
+
+        self.errors = {}
+        for name, path, error in results:
+            if error is None:
+                manifest.record(filenames[name], fingerprints[name])
+                print(f"Saved: {filenames[name]}")
+            else:
+                self.errors[name] = error
+                print(f"Failed: {filenames[name]}\n{error}")
+        manifest.save()
+        return {name: os.path.join(self.out_dir, filenames[name]) for name in figures if name not in self.errors}
@@ -0,0 +1,231 @@
+import os
+import json
+import hashlib
+import ast
+import inspect
+import textwrap
+import pandas as pd
+from geography import level_codes, LEVEL_CODES
+
+MANIFEST_DIR_NAME = '.edm_build'
+
+# Columns the chart methods read from the prepared frame
+CHART_COLUMNS = ['Region', 'Industry', 'Location_Type', 'Location_Name', 'Start_Year', 'Value']
+
+# Modules next to this one whose code shapes the chart output; editing any of them
+# rebuilds every chart
+HELPER_MODULES = ['aggregates', 'growth', 'ranking', 'geography', 'slice_index', 'compact_dropdowns',
+                  'geo_assets', 'name_index', 'export']
+
+
+def _province_rows(df):
+    return df[level_codes(df['Location_Type']) == LEVEL_CODES['province']]
+
+
+def _latest_rows(df):
+    return df[df['Start_Year'] == df['Start_Year'].max()]
+
+
+# Named data slices a chart method can declare with @depends_on
+SLICES = {
+    'all': lambda df: df,
+    'latest_year': _latest_rows,
+    'province': _province_rows,
+    'province_latest': lambda df: _latest_rows(_province_rows(df)),
+}
+
+
+def select_slice(df, name):
+    """
+    Rows of df that make up a named slice ('all', 'latest_year', 'province',
+    'province_latest' or 'year:<YYYY>')
+    """
+    if name.startswith('year:'):
+        return df[df['Start_Year'] == int(name.split(':', 1)[1])]
+    if name not in SLICES:
+        raise ValueError(f"Unknown data slice '{name}'. Expected one of {list(SLICES)} or 'year:<YYYY>'")
+    return SLICES[name](df)
+
+
+def depends_on(*slices, files=(), settings=None):
+    """
+    Decorator declaring which data slices a chart method reads
+    The incremental build only rebuilds a chart when one of these slices changes
+    A slice name can refer to the method's parameters, e.g. 'year:{base_year}', and is
+    filled in from the arguments the chart is built with (see chart_slices)
+    files lists other files the chart reads (hashed by content) and settings a dict of
+    values its output depends on; either can be a function returning them, so modules
+    that hold them are only imported when fingerprinting
+    """
+    def decorate(method):
+        method.chart_inputs = slices
+        method.chart_files = files
+        method.chart_settings = settings
+        return method
+    return decorate
+
+
+def chart_slices(method, *args, **kwargs):
+    """
+    Data slice names a chart method declares with @depends_on, with any {parameter}
+    placeholders filled in from args/kwargs and the method's defaults
+    """
+    slices = getattr(method, 'chart_inputs', ('all',))
+    if not any('{' in name for name in slices):
+        return list(slices)
+    bound = inspect.signature(method).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return [name.format(**bound.arguments) for name in slices]
+
+
+def slice_fingerprint(df, name):
+    """
+    Content hash of one data slice (values and row order of the chart columns)
+    """
+    rows = select_slice(df, name)[CHART_COLUMNS]
+    hashed = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return hashlib.sha256(name.encode() + hashed.tobytes()).hexdigest()
+
+
+def file_fingerprint(path):
+    """
+    Content hash of a file the chart reads besides the data
+    """
+    digest = hashlib.sha256(os.path.basename(path).encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def helpers_fingerprint():
+    """
+    Hash of the source of the helper modules the charts are built with (HELPER_MODULES)
+    Read from disk, so the modules need not be imported
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    return settings_fingerprint([file_fingerprint(os.path.join(here, f"{name}.py")) for name in HELPER_MODULES])
+
+
+def input_fingerprints(method, cache=None):
+    """
+    Hashes of the files and settings a chart method declares with @depends_on
+    cache (path -> hash) lets charts that read the same file hash it once
+    """
+    cache = {} if cache is None else cache
+    files = getattr(method, 'chart_files', ())
+    settings = getattr(method, 'chart_settings', None)
+    files = files() if callable(files) else files
+    settings = settings() if callable(settings) else settings
+
+    parts = []
+    for path in files:
+        if path not in cache:
+            cache[path] = file_fingerprint(path)
+        parts.append(cache[path])
+    if settings is not None:
+        parts.append(settings_fingerprint(settings))
+    return parts
+
+
+def _source(function):
+    try:
+        return textwrap.dedent(inspect.getsource(function))
+    except (OSError, TypeError):
+        return function.__qualname__
+
+
+def _member_function(cls, name):
+    """
+    Function behind a method or property of cls, or None for other attributes
+    """
+    attribute = inspect.getattr_static(cls, name, None)
+    if isinstance(attribute, property):
+        return attribute.fget
+    return attribute if inspect.isfunction(attribute) else None
+
+
+def called_helpers(cls, name):
+    """
+    Names of the methods and properties of cls that method name reaches through
+    self.<attribute> references, directly or through other helpers, itself included
+    """
+    found = set()
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        function = _member_function(cls, current)
+        if current in found or function is None:
+            continue
+        found.add(current)
+        for node in ast.walk(ast.parse(_source(function))):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'self':
+                pending.append(node.attr)
+    return sorted(found)
+
+
+def method_fingerprint(method):
+    """
+    Hash of a chart method's source and of the dashboard helpers it calls (see
+    called_helpers), so editing a chart or a helper it uses also rebuilds it
+    """
+    owner = getattr(method, '__self__', None)
+    if owner is None:
+        sources = [_source(method)]
+    else:
+        cls = type(owner)
+        sources = [_source(_member_function(cls, name)) for name in called_helpers(cls, method.__name__)]
+    return hashlib.sha256('\n'.join(sources).encode()).hexdigest()
+
+
+class BuildManifest:
+    """
+    Fingerprints of the last successful build of each output file
+    Stored as <out_dir>/.edm_build/manifest.json, with the figure JSON of each chart
+    alongside it so the combined dashboard can be reassembled without rebuilding charts
+    """
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.build_dir = os.path.join(out_dir, MANIFEST_DIR_NAME)
+        self.path = os.path.join(self.build_dir, 'manifest.json')
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def figure_path(self, chart_name):
+        return os.path.join(self.build_dir, f"{chart_name}.json")
+
+    def is_current(self, output_name, fingerprint, stored_figure=True, filename=None):
+        """
+        True when output_name was built from the same fingerprint and its files still exist
+        (filename defaults to <output_name>.html)
+        """
+        if self.entries.get(output_name) != fingerprint:
+            return False
+        if not os.path.exists(os.path.join(self.out_dir, filename or f"{output_name}.html")):
+            return False
+        return not stored_figure or os.path.exists(self.figure_path(output_name))
+
+    def record(self, output_name, fingerprint, figure_json=None):
+        os.makedirs(self.build_dir, exist_ok=True)
+        if figure_json is not None:
+            with open(self.figure_path(output_name), 'w', encoding='utf-8') as f:
+                f.write(figure_json)
+        self.entries[output_name] = fingerprint
+
+    def load_figure(self, chart_name):
+        with open(self.figure_path(chart_name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def save(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
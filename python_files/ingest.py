@@ -0,0 +1,235 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from data_cache import (
+    CATEGORICAL_COLUMNS, default_cache_dir, to_categorical, source_stamp, source_unchanged,
+    encode_frame, decode_categories, decode_column, write_npz, read_meta, write_meta
+)
+
+STORE_VERSION = 2
+DEFAULT_CHUNK_SIZE = 50000
+
+# Columns coerced to numbers; rows missing either of the first two are dropped
+NUMERIC_COLUMNS = ['Start_Year', 'End_Year', 'Value']
+REQUIRED_COLUMNS = ['Value', 'Start_Year']
+
+# CSV text dimensions are read as text, so a chunk that happens to hold only year
+# numbers in Year_Range reads them the same way as the whole file does
+CSV_TEXT_DTYPES = {col: str for col in CATEGORICAL_COLUMNS}
+
+
+def prepare_frame(df, metrics=None):
+    """
+    Clean one frame (or one chunk of rows) for analysis
+    Keeps only the requested metrics when given, coerces the year and value columns
+    to numbers, drops rows missing Value or Start_Year and stores text dimensions
+    as categoricals
+    """
+    if metrics is not None:
+        df = df[df['Metric'].isin(list(metrics))]
+
+    df = df.copy()
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    return to_categorical(df)
+
+
+def read_source(path):
+    """
+    Read a whole workbook or CSV file (picked by extension) into a raw frame
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return pd.read_csv(path, low_memory=False, dtype=CSV_TEXT_DTYPES)
+    return pd.read_excel(path)
+
+
+def iter_excel_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, sheet_name=None):
+    """
+    Yield the rows of a worksheet as DataFrames of at most chunk_size rows
+    The workbook is opened in openpyxl's read-only mode, which streams rows instead
+    of building the whole sheet in memory. The first row is the header; chunk
+    indexes continue across chunks so they match pd.read_excel's row numbers
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(col) for col in next(rows, ())]
+        start = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header, index=pd.RangeIndex(start, start + len(batch)))
+                start += len(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, index=pd.RangeIndex(start, start + len(batch)))
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the rows of a CSV file as DataFrames of at most chunk_size rows
+    """
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=CSV_TEXT_DTYPES)
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Row chunks from a workbook or a CSV file, picked by extension
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return iter_csv_chunks(path, chunk_size)
+    return iter_excel_chunks(path, chunk_size)
+
+
+def _part_labels(archive, col, kind):
+    """
+    (labels, codes) of one part's column; a part where a text column was entirely
+    empty stored it as float, and any values such a part holds join as text labels
+    """
+    if kind in ('category', 'text'):
+        return decode_categories(archive, col), archive[col + '.codes']
+    values = archive[col].astype(object)
+    missing = pd.isna(values)
+    labels, codes = np.unique(values[~missing].astype(str), return_inverse=True)
+    part_codes = np.full(len(values), -1, dtype=np.int64)
+    part_codes[~missing] = codes
+    return pd.Index(labels), part_codes
+
+
+def join_labels(parts):
+    """
+    One column from the (labels, codes) of every part, recoded onto the union of the
+    labels sorted the way astype('category') sorts a whole column. Returns (codes, categories)
+    """
+    labels = [label for part_labels, _ in parts for label in part_labels.tolist()]
+    categories = pd.Categorical(np.array(list(dict.fromkeys(labels)), dtype=object)).categories
+    codes = []
+    for part_labels, part_codes in parts:
+        # Trailing -1 keeps missing values (code -1) missing
+        mapping = np.append(categories.get_indexer(part_labels), -1)
+        codes.append(mapping[part_codes])
+    return np.concatenate(codes) if codes else np.array([], dtype=np.int64), categories
+
+
+class ChunkedStore:
+    """
+    Columnar store built one chunk at a time
+    Each prepared chunk is written as its own part file (same codes + labels layout
+    as the data cache), so ingestion only ever holds one chunk of raw rows in memory.
+    Lives in <cache_dir>/<source name>.parts/ with a manifest.json that records the
+    source stamp and metric filter it was built from
+    """
+    def __init__(self, source_file, cache_dir=None):
+        self.source_file = source_file
+        cache_dir = cache_dir or default_cache_dir(source_file)
+        self.path = os.path.join(cache_dir, os.path.basename(source_file) + '.parts')
+        self.manifest_path = os.path.join(self.path, 'manifest.json')
+
+    def _part_path(self, number):
+        return os.path.join(self.path, f"part-{number:05d}.npz")
+
+    def is_current(self, metrics=None):
+        """
+        True when the store was built from the current source with the same metric filter
+        """
+        meta = read_meta(self.manifest_path)
+        if meta is None or meta.get('version') != STORE_VERSION:
+            return False
+        if meta['metrics'] != (sorted(metrics) if metrics is not None else None):
+            return False
+        mtime_ns = meta['mtime_ns']
+        if not source_unchanged(meta, self.source_file):
+            return False
+        if meta['mtime_ns'] != mtime_ns:
+            write_meta(self.manifest_path, meta)
+        return True
+
+    def build(self, metrics=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream the source into part files, preparing each chunk as it arrives
+        Returns the number of rows kept
+        """
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+
+        parts = []
+        header = []
+        rows_read = 0
+        rows_kept = 0
+        for chunk in iter_chunks(self.source_file, chunk_size):
+            header = list(chunk.columns)
+            rows_read += len(chunk)
+            prepared = prepare_frame(chunk, metrics)
+            if prepared.empty:
+                continue
+            arrays, columns = encode_frame(prepared)
+            write_npz(self._part_path(len(parts)), arrays)
+            parts.append({'rows': len(prepared), 'columns': columns})
+            rows_kept += len(prepared)
+
+        meta = {'version': STORE_VERSION}
+        meta.update(source_stamp(self.source_file))
+        meta['metrics'] = sorted(metrics) if metrics is not None else None
+        meta['chunk_size'] = chunk_size
+        meta['header'] = header
+        meta['rows_read'] = rows_read
+        meta['rows'] = rows_kept
+        meta['parts'] = parts
+        write_meta(self.manifest_path, meta)
+        return rows_kept
+
+    def load(self):
+        """
+        Concatenate the part files into one prepared frame
+        Categorical labels are unioned and sorted, so the result matches what
+        prepare_frame gives for the whole file at once
+        """
+        meta = read_meta(self.manifest_path)
+        if not meta['parts']:
+            return prepare_frame(pd.DataFrame(columns=meta['header']))
+
+        columns = [col for col, _ in meta['parts'][0]['columns']]
+        kinds = []
+        for number, part in enumerate(meta['parts']):
+            if [col for col, _ in part['columns']] != columns:
+                raise ValueError(f"Part {number} of {self.path} has columns {[col for col, _ in part['columns']]}, "
+                                 f"expected {columns}")
+            kinds.append(dict(part['columns']))
+        archives = []
+        for number in range(len(meta['parts'])):
+            with np.load(self._part_path(number), allow_pickle=False) as archive:
+                archives.append({name: archive[name] for name in archive.files})
+
+        # A column holds labels when any part stored it so (categorical beats text)
+        data = {}
+        for col in columns:
+            col_kinds = {part_kinds[col] for part_kinds in kinds}
+            if col_kinds & {'category', 'text'}:
+                kind = 'category' if 'category' in col_kinds else 'text'
+                codes, categories = join_labels([_part_labels(archive, col, part_kinds[col])
+                                                 for archive, part_kinds in zip(archives, kinds)])
+                data[col] = decode_column(codes, categories, kind)
+            else:
+                data[col] = np.concatenate([archive[col] for archive in archives])
+        index = np.concatenate([archive['__index__'] for archive in archives])
+        return pd.DataFrame(data, index=index)
+
+
+def load_streamed_frame(source_file, metrics=None, chunk_size=DEFAULT_CHUNK_SIZE, cache_dir=None):
+    """
+    Prepared frame for source_file via the chunked store, rebuilding the store
+    first when the source or metric filter has changed
+    """
+    store = ChunkedStore(source_file, cache_dir)
+    if not store.is_current(metrics):
+        store.build(metrics, chunk_size)
+    return store.load()
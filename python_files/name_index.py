@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import difflib
+import hashlib
+import unicodedata
+import numpy as np
+import pandas as pd
+from data_cache import default_cache_dir, source_stamp, source_unchanged, read_meta, write_meta
+
+NAME_INDEX_VERSION = 1
+
+# Minimum difflib similarity for the fuzzy fallback
+FUZZY_CUTOFF = 0.85
+
+# Alias (any spelling, normalized with canonical_name) -> GeoJSON feature name.
+# Carries over the replacement table from Map.ipynb; names whose parenthesised
+# part is already a feature name or alias (e.g. 'Region IV-A (CALABARZON)') need no entry
+REGION_ALIASES = {
+    'REGION I': 'Ilocos',
+    'REGION II': 'Cagayan Valley',
+    'REGION III': 'Central Luzon',
+    'REGION IV-A': 'Calabarzon',
+    'REGION IV-B': 'Mimaropa',
+    'REGION V': 'Bicol',
+    'REGION VI': 'Western Visayas',
+    'REGION VII': 'Central Visayas',
+    'REGION VIII': 'Eastern Visayas',
+    'REGION IX': 'Zamboanga Peninsula',
+    'REGION X': 'Northern Mindanao',
+    'REGION XI': 'Davao',
+    'REGION XII': 'Soccsksargen',
+    'REGION XIII': 'Caraga',
+    'BANGSAMORO AUTONOMOUS REGION IN MUSLIM MINDANAO': 'Autonomous Region in Muslim Mindanao',
+    'NCR': 'National Capital Region',
+    'CAR': 'Cordillera Administrative Region',
+    'ARMM': 'Autonomous Region in Muslim Mindanao',
+    'BARMM': 'Autonomous Region in Muslim Mindanao',
+    'REGION 4A': 'Calabarzon',
+    'REGION 4B': 'Mimaropa',
+    'REGION 12': 'Soccsksargen',
+}
+
+
+def canonical_name(name):
+    """
+    Canonical key for a place name: accents stripped, parenthesised text removed,
+    upper case, '&' spelled out, punctuation other than hyphens collapsed to spaces
+    e.g. 'Region XI (Davao Region)' -> 'REGION XI'
+    """
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    text = re.sub(r'\(.*?\)', ' ', text).upper().replace('&', ' AND ')
+    text = re.sub(r'[^A-Z0-9-]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def candidate_keys(name):
+    """
+    Keys to try for a name, best first: the name itself, then each parenthesised part
+    ('National Capital Region (NCR)' -> ['NATIONAL CAPITAL REGION', 'NCR'])
+    """
+    keys = [canonical_name(name)]
+    keys += [canonical_name(part) for part in re.findall(r'\((.*?)\)', str(name))]
+    return [key for key in keys if key]
+
+
+def _numerals(key):
+    """
+    Numbered tokens of a key ('REGION IV-A' -> {'IV-A'}); fuzzy matches must agree on
+    them, or 'REGION XV' would pass as 'REGION XI'
+    """
+    return {token for token in key.split() if re.fullmatch(r'[IVXL]+(-[A-Z])?|\d+[A-Z]?', token)}
+
+
+def _aliases_hash(aliases):
+    return hashlib.sha256(json.dumps(aliases, sort_keys=True).encode()).hexdigest()
+
+
+class NameIndex:
+    """
+    Name -> GeoJSON feature id lookup built once per geometry file
+    Holds canonical keys for every feature name, code and alias, and remembers every
+    raw name it has resolved (including fuzzy matches and misses), so mapping a whole
+    column costs one lookup per distinct name. Persisted as JSON in the data cache
+    and rebuilt when the GeoJSON or the alias table changes
+    """
+    def __init__(self, keys, names, resolved=None, path=None, meta=None):
+        self.keys = keys
+        self.names = names
+        self.resolved = resolved or {}
+        self.path = path
+        self.meta = meta or {}
+        self.unmatched = []
+        self._dirty = False
+
+    @classmethod
+    def build(cls, geojson, aliases=REGION_ALIASES):
+        """
+        Index the features of a FeatureCollection (properties.name, properties.id codes)
+        plus the alias table
+        """
+        keys = {}
+        names = {}
+        by_name = {}
+        for feature in geojson['features']:
+            properties = feature.get('properties', {})
+            feature_id = feature['id']
+            names[str(feature_id)] = properties.get('name')
+            by_name[canonical_name(properties.get('name'))] = feature_id
+            for value in (properties.get('name'), properties.get('id'), properties.get('code')):
+                if value:
+                    keys[canonical_name(value)] = feature_id
+
+        for alias, target in aliases.items():
+            feature_id = by_name.get(canonical_name(target))
+            if feature_id is None:
+                raise ValueError(f"Alias '{alias}' points at '{target}', which is not a feature name")
+            keys[canonical_name(alias)] = feature_id
+        return cls(keys, names)
+
+    @classmethod
+    def for_geojson(cls, source, cache_dir=None, aliases=REGION_ALIASES):
+        """
+        Load the persisted index for a GeoJSON file, rebuilding it when stale
+        """
+        cache_dir = cache_dir or default_cache_dir(source)
+        path = os.path.join(cache_dir, os.path.splitext(os.path.basename(source))[0] + '.names.json')
+        stored = read_meta(path)
+        if (stored is not None and stored.get('version') == NAME_INDEX_VERSION
+                and stored.get('aliases') == _aliases_hash(aliases) and source_unchanged(stored, source)):
+            return cls(stored['keys'], stored['names'], stored['resolved'], path, stored)
+
+        with open(source, 'r', encoding='utf-8') as f:
+            index = cls.build(json.load(f), aliases)
+        index.path = path
+        index.meta = {'version': NAME_INDEX_VERSION, 'aliases': _aliases_hash(aliases)}
+        index.meta.update(source_stamp(source))
+        index._dirty = True
+        index.save()
+        return index
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = dict(self.meta)
+        data.update({'keys': self.keys, 'names': self.names, 'resolved': self.resolved})
+        write_meta(self.path, data)
+        self._dirty = False
+
+    def resolve(self, name):
+        """
+        Feature id for one raw name, or None
+        Tries the canonical key and any parenthesised part, then the closest key
+        by difflib similarity (at least FUZZY_CUTOFF)
+        """
+        name = str(name)
+        if name in self.resolved:
+            return self.resolved[name]
+
+        feature_id = None
+        candidates = candidate_keys(name)
+        for key in candidates:
+            if key in self.keys:
+                feature_id = self.keys[key]
+                break
+        else:
+            for key in candidates:
+                close = [match for match in difflib.get_close_matches(key, list(self.keys), n=3, cutoff=FUZZY_CUTOFF)
+                         if _numerals(match) == _numerals(key)]
+                if close:
+                    feature_id = self.keys[close[0]]
+                    break
+
+        self.resolved[name] = feature_id
+        self._dirty = True
+        return feature_id
+
+    def lookup(self, values, report=True):
+        """
+        Feature ids for a whole column (-1 where a name has no feature)
+        Each distinct name is resolved once (categorical columns reuse their categories)
+        and the result is spread back over the rows by code; unmatched names are kept
+        in self.unmatched and printed when report is True
+        """
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            uniques = values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+
+        ids = np.array([self.resolve(name) for name in uniques], dtype=object)
+        found = np.array([feature_id is not None for feature_id in ids], dtype=bool)
+        table = np.where(found, ids, -1).astype(int)
+        result = np.where(codes >= 0, table[codes] if len(table) else -1, -1)
+
+        used = np.zeros(len(uniques), dtype=bool)
+        used[codes[codes >= 0]] = True
+        self.unmatched = sorted(str(name) for name in uniques[used & ~found])
+        if report and self.unmatched:
+            print(f"{len(self.unmatched)} name(s) without a map feature: {self.unmatched}")
+        self.save()
+        return result
+
+    def feature_name(self, feature_id):
+        return self.names.get(str(feature_id))
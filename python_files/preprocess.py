@@ -0,0 +1,288 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Columns of cleaned_data.xlsx, in order (what GDPAnalysisDashboard reads)
+CLEANED_COLUMNS = ['Industry', 'Region', 'Location_Type', 'Location_Name',
+                   'Metric', 'Year_Range', 'Start_Year', 'End_Year', 'Value']
+
+# Columns identifying one cleaned row
+KEY_COLUMNS = ['Industry', 'Region', 'Location_Name', 'Metric', 'Year_Range']
+
+# The raw sheet: industry headings in the first column, locations in the second,
+# one value column per metric and period from the third on
+INDUSTRY_COL = 0
+LOCATION_COL = 1
+FIRST_VALUE_COL = 2
+
+INDUSTRY_NAMES = {
+    "Agriculture, Forestry, and Fishing",
+    "Mining and Quarrying",
+    "Manufacturing",
+    "Electricity, Steam, Water and Waste Management",
+    "Construction",
+    "Wholesale and Retail Trade; Repair of Motor Vehicles and Motorcycles",
+    "Transportation and Storage",
+    "Accommodation and Food Service Activities",
+    "Information and Communication",
+    "Financial and Insurance Activities",
+    "Real Estate and Ownership of Dwellings",
+    "Professional and Business Services",
+    "Public Administration and Defense; Compulsory Social Activities",
+    "Education",
+    "Human Health and Social Work Activities",
+    "Other Services",
+}
+
+REGION_NAMES = {
+    "National Capital Region (NCR)",
+    "Cordillera Administrative Region (CAR)",
+    "Region I (Ilocos Region)",
+    "Region II (Cagayan Valley)",
+    "Region III (Central Luzon)",
+    "Region IV-A (CALABARZON)",
+    "Region IV-B (MIMAROPA)",
+    "Region V (Bicol Region)",
+    "Region VI (Western Visayas)",
+    "Region VII (Central Visayas)",
+    "Region VIII (Eastern Visayas)",
+    "Region IX (Zamboanga Peninsula)",
+    "Region X (Northern Mindanao)",
+    "Region XI (Davao Region)",
+    "Region XII (SOCCSKSARGEN)",
+    "Region XIII (Caraga)",
+    "Bangsamoro Autonomous Region in Muslim Mindanao (BARMM)",
+}
+
+# Spellings in PSA releases -> the dashboard's region names
+REGION_RENAMES = {
+    'MIMAROPA Region': 'Region IV-B (MIMAROPA)',
+}
+
+# CAR provinces are listed without 'Province of'
+CAR_PROVINCES = ["Abra", "Apayao", "Benguet", "Ifugao", "Kalinga", "Mountain Province"]
+
+# Marker PSA uses for suppressed cells; read as missing
+SUPPRESSED = '/s'
+
+# 'YYYY' or 'YYYY-YYYY'
+YEAR_RANGE_PATTERN = r'^\s*(?P<start>\d{4})\s*(?:[-–]\s*(?P<end>\d{4}))?\s*$'
+
+
+def _label(value):
+    """
+    Header cell as text; Excel hands back years as numbers (2018 or 2018.0)
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def parse_year_ranges(year_range):
+    """
+    Start_Year and End_Year for a column of period labels ('2018' or '2018-2019')
+    The pattern is matched once per distinct label and spread back over the rows by
+    code, so a million rows with a few dozen periods cost a few dozen matches.
+    Labels that do not parse give <NA>
+    """
+    codes, uniques = pd.factorize(pd.Series(year_range, dtype=object))
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(YEAR_RANGE_PATTERN)
+    start = pd.to_numeric(parts['start']).to_numpy(dtype=float)
+    end = pd.to_numeric(parts['end']).fillna(parts['start'].astype(float)).to_numpy(dtype=float)
+
+    start = np.append(start, np.nan)[codes]
+    end = np.append(end, np.nan)[codes]
+    return pd.DataFrame({
+        'Start_Year': pd.array(start, dtype='Float64').astype('Int64'),
+        'End_Year': pd.array(end, dtype='Float64').astype('Int64'),
+    })
+
+
+def find_header(raw):
+    """
+    Split a raw sheet (read with header=None) into its header and data rows
+    Data starts at the first row naming a location; among the header rows above it,
+    the first one labelling value columns holds the metrics (spread right over
+    merged cells) and the last one the periods
+    Returns (first data row, metric per value column, period per value column)
+    """
+    locations = raw.iloc[:, LOCATION_COL].notna().to_numpy()
+    if not locations.any():
+        raise ValueError("No location names found in the second column")
+    first_data_row = int(np.argmax(locations))
+
+    header = raw.iloc[:first_data_row, FIRST_VALUE_COL:]
+    labelled = header[header.notna().any(axis=1)]
+    if len(labelled) < 2:
+        raise ValueError("Expected a metric header row and a period header row above the data")
+    metrics = labelled.iloc[0].ffill()
+    periods = labelled.iloc[-1]
+    return first_data_row, metrics, periods
+
+
+def split_hierarchy(industry_raw, location_raw):
+    """
+    Industry, Region, Location_Type and Location_Name for every data row
+    Industry and region headings apply to the rows below them until the next one
+    (forward fill). Returns the four columns plus a mask of note rows: rows whose
+    first column holds text that is not an industry (the '/s - suppressed' legend)
+    """
+    industry_text = industry_raw.astype('string').str.strip()
+    is_industry = industry_text.isin(INDUSTRY_NAMES).to_numpy()
+    notes = industry_text.notna().to_numpy() & ~is_industry
+    industry = industry_text.where(is_industry).ffill()
+
+    # Sub-locations are indented with leading dots ('..City of Makati')
+    location = location_raw.astype('string').str.strip().str.lstrip('.').str.strip()
+    location = location.replace(REGION_RENAMES)
+    is_region = location.isin(REGION_NAMES).to_numpy()
+    region = location.where(is_region).ffill()
+
+    car_pattern = '|'.join(CAR_PROVINCES)
+    location_type = np.select(
+        [
+            is_region,
+            location.str.contains('City of', regex=False).to_numpy(dtype=bool, na_value=False),
+            location.str.contains('Province of', regex=False).to_numpy(dtype=bool, na_value=False)
+            | location.str.contains(car_pattern).to_numpy(dtype=bool, na_value=False),
+        ],
+        ['Region', 'City', 'Province'],
+        'Province/City'
+    )
+    return industry, region, location_type, location, notes
+
+
+def clean_raw_frame(raw):
+    """
+    Turn the raw PSA sheet into the long cleaned_data schema (CLEANED_COLUMNS)
+    Vectorized replacement for the GDP.ipynb preprocessing: hierarchy columns come
+    from forward fills instead of a row loop, the value block is unpivoted with
+    NumPy (same order as DataFrame.melt: column by column) and periods are parsed
+    once per distinct label. Returns (cleaned frame, validation report)
+    """
+    first_data_row, metrics, periods = find_header(raw)
+    data = raw.iloc[first_data_row:]
+    data = data[data.iloc[:, LOCATION_COL].notna()]
+
+    industry, region, location_type, location, notes = split_hierarchy(
+        data.iloc[:, INDUSTRY_COL], data.iloc[:, LOCATION_COL]
+    )
+    keep = ~notes
+    note_rows = location[notes].tolist()
+
+    # Value columns without any header label are spacers
+    labelled = (metrics.notna() | periods.notna()).to_numpy()
+    metric_labels = [_label(value) for value in metrics[labelled]]
+    period_labels = [_label(value) for value in periods[labelled]]
+    block = data.iloc[:, FIRST_VALUE_COL:].to_numpy(dtype=object)[keep][:, labelled]
+
+    n_rows, n_cols = block.shape
+    cells = pd.Series(block.ravel(order='F'), dtype=object)
+    values = pd.to_numeric(cells, errors='coerce')
+    # Only the cells that did not parse need a look as text
+    unparsed = (values.isna() & cells.notna()).to_numpy()
+    text = cells[unparsed].astype(str).str.strip()
+    suppressed = (text == SUPPRESSED).to_numpy()
+
+    years = parse_year_ranges(period_labels)
+    columns = np.arange(n_cols).repeat(n_rows)
+    cleaned = pd.DataFrame({
+        'Industry': np.tile(industry[keep].to_numpy(dtype=object), n_cols),
+        'Region': np.tile(region[keep].to_numpy(dtype=object), n_cols),
+        'Location_Type': np.tile(location_type[keep].astype(object), n_cols),
+        'Location_Name': np.tile(location[keep].to_numpy(dtype=object), n_cols),
+        'Metric': np.array(metric_labels, dtype=object)[columns],
+        'Year_Range': np.array(period_labels, dtype=object)[columns],
+        'Start_Year': years['Start_Year'].take(columns).to_numpy(),
+        'End_Year': years['End_Year'].take(columns).to_numpy(),
+        'Value': values.to_numpy(dtype=float),
+    })
+    for col in ['Industry', 'Region', 'Location_Name']:
+        cleaned[col] = cleaned[col].where(cleaned[col].notna(), None)
+    for col in ['Start_Year', 'End_Year']:
+        cleaned[col] = cleaned[col].astype('Int64')
+
+    non_numeric = ~suppressed
+    report = {
+        'rows': len(cleaned),
+        'locations': n_rows,
+        'value_columns': n_cols,
+        'metrics': list(dict.fromkeys(metric_labels)),
+        'year_ranges': list(dict.fromkeys(period_labels)),
+        'unparsed_year_ranges': [label for label, start in zip(period_labels, years['Start_Year']) if pd.isna(start)],
+        'reversed_year_ranges': [label for label, start, end in zip(period_labels, years['Start_Year'], years['End_Year'])
+                                 if pd.notna(start) and start > end],
+        'note_rows': note_rows,
+        'rows_without_industry': int(cleaned['Industry'].isna().sum()),
+        'rows_without_region': int(cleaned['Region'].isna().sum()),
+        'suppressed_values': int(suppressed.sum()),
+        'missing_values': int(cleaned['Value'].isna().sum()),
+        'non_numeric_values': int(non_numeric.sum()),
+        'non_numeric_samples': text[non_numeric].unique()[:10].tolist(),
+        'duplicate_rows': int(cleaned.duplicated(KEY_COLUMNS).sum()),
+    }
+    report['ok'] = not (report['unparsed_year_ranges'] or report['reversed_year_ranges']
+                        or report['rows_without_industry'] or report['rows_without_region']
+                        or report['non_numeric_values'] or report['duplicate_rows'])
+    return cleaned[CLEANED_COLUMNS], report
+
+
+def print_report(report):
+    print(f"Cleaned {report['rows']} rows: {report['locations']} locations x {report['value_columns']} value columns")
+    print(f"Metrics: {report['metrics']}")
+    print(f"Year ranges: {report['year_ranges']}")
+    print(f"Values: {report['missing_values']} missing ({report['suppressed_values']} suppressed '{SUPPRESSED}')")
+    if report['note_rows']:
+        print(f"Dropped {len(report['note_rows'])} note row(s): {report['note_rows']}")
+    if report['unparsed_year_ranges']:
+        print(f"WARNING: unparsed year ranges: {report['unparsed_year_ranges']}")
+    if report['reversed_year_ranges']:
+        print(f"WARNING: year ranges ending before they start: {report['reversed_year_ranges']}")
+    if report['rows_without_industry']:
+        print(f"WARNING: {report['rows_without_industry']} rows before the first industry heading")
+    if report['rows_without_region']:
+        print(f"WARNING: {report['rows_without_region']} rows before the first region heading")
+    if report['non_numeric_values']:
+        print(f"WARNING: {report['non_numeric_values']} non-numeric values, e.g. {report['non_numeric_samples']}")
+    if report['duplicate_rows']:
+        print(f"WARNING: {report['duplicate_rows']} duplicate rows for the same {KEY_COLUMNS}")
+    print("Validation passed" if report['ok'] else "Validation found problems")
+
+
+def read_raw(path, sheet_name=0):
+    """
+    Read a raw PSA extract (workbook or CSV, picked by extension) without a header
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return pd.read_csv(path, header=None, dtype=object)
+    return pd.read_excel(path, sheet_name=sheet_name, header=None)
+
+
+def clean_workbook(source, out_file=None, sheet_name=0):
+    """
+    Clean a raw extract, print the validation report and optionally write the result
+    (.xlsx or .csv by extension) for GDPAnalysisDashboard
+    Returns (cleaned frame, report)
+    """
+    cleaned, report = clean_raw_frame(read_raw(source, sheet_name))
+    report['source'] = source
+    print_report(report)
+    if out_file:
+        if os.path.splitext(out_file)[1].lower() == '.csv':
+            cleaned.to_csv(out_file, index=False)
+        else:
+            cleaned.to_excel(out_file, index=False)
+        print(f"Cleaned data saved to '{out_file}'")
+    return cleaned, report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean a raw PSA GDP extract into the dashboard's long format")
+    parser.add_argument('source', help="raw workbook or CSV (e.g. gdp_data.xlsx)")
+    parser.add_argument('--out', default='cleaned_data.xlsx', help="output .xlsx or .csv")
+    parser.add_argument('--sheet', default=0, help="worksheet name or index")
+    args = parser.parse_args()
+    sheet = int(args.sheet) if str(args.sheet).isdigit() else args.sheet
+    clean_workbook(args.source, args.out, sheet)
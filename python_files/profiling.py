@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then left out
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    High-water mark of this process's resident memory, or None where unsupported
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def output_size(value):
+    """
+    Size in bytes of a stage's output: a str/bytes payload, a file path, or a list of paths
+    """
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return os.path.getsize(value) if os.path.isfile(value) else len(value.encode('utf-8'))
+    if isinstance(value, (list, tuple)):
+        return sum(output_size(item) for item in value)
+    return None
+
+
+def _record_output(record, result):
+    size = output_size(result)
+    if size is not None:
+        record['output_bytes'] = size
+    return result
+
+
+class Profiler:
+    """
+    Opt-in per-stage timing and memory instrumentation
+    Each stage records wall time, CPU time (this process), growth of the peak RSS and,
+    with trace_memory=True, the tracemalloc peak above the memory in use when the stage
+    started. Stages nest; a stage's record is a dict the caller may add to (e.g.
+    output_bytes). Use stage() as a context manager or profile() as a decorator, then
+    export with to_json() or to_chrome_trace() (chrome://tracing, Perfetto)
+    Stages run in worker processes are not recorded: a pickled profiler arrives there
+    as a NullProfiler
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __reduce__(self):
+        # Copies sent to worker processes (e.g. with a pickled dashboard) record nothing
+        return NullProfiler, ()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name, category='stage', **args):
+        """
+        Measure the enclosed block as one stage; yields the stage's record
+        """
+        record = {'stage': name, 'category': category}
+        record.update(args)
+        stack = self._stack()
+        frame = {'peak': 0}
+
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Bank the peak seen so far for the enclosing stages before resetting it
+            for outer in stack:
+                outer['peak'] = max(outer['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_memory'] = current
+        stack.append(frame)
+
+        rss_before = peak_rss_bytes()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            record['start_seconds'] = round(start - self._origin, 6)
+            record['seconds'] = round(end - start, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+            rss_after = peak_rss_bytes()
+            if rss_after is not None:
+                record['peak_rss_bytes'] = rss_after
+                record['rss_growth_bytes'] = rss_after - rss_before
+            stack.pop()
+            if self.trace_memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['traced_peak_bytes'] = peak - frame['start_memory']
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            record['depth'] = len(stack)
+            record['thread'] = threading.get_ident()
+            with self._lock:
+                self.stages.append(record)
+
+    def profile(self, name=None, category='stage'):
+        """
+        Decorator measuring every call of a function as a stage (named after the
+        function by default); output_bytes is taken from a str/bytes/path return value
+        """
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name, category) as record:
+                    return _record_output(record, func(*args, **kwargs))
+            return wrapper
+        return decorate
+
+    def summary(self, top=10):
+        """
+        Print the slowest stages (wall time, CPU time, memory, output size)
+        """
+        print(f"{'stage':<45} {'wall s':>8} {'cpu s':>8} {'traced MB':>10} {'out KB':>8}")
+        for record in sorted(self.stages, key=lambda r: r['seconds'], reverse=True)[:top]:
+            traced = record.get('traced_peak_bytes')
+            output = record.get('output_bytes')
+            print(f"{'  ' * record['depth'] + record['stage']:<45} {record['seconds']:>8.3f} {record['cpu_seconds']:>8.3f} "
+                  f"{'' if traced is None else f'{traced / 1e6:.1f}':>10} "
+                  f"{'' if output is None else f'{output / 1e3:.0f}':>8}")
+
+    def to_json(self, path=None):
+        """
+        All stage records (in completion order) as a dict, also written to path if given
+        """
+        data = {'created': self.created, 'pid': os.getpid(), 'trace_memory': self.trace_memory, 'stages': self.stages}
+        if path:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+        return data
+
+    def to_chrome_trace(self, path=None):
+        """
+        Stages as Chrome trace complete events ('X'), also written to path if given
+        """
+        pid = os.getpid()
+        events = []
+        for record in self.stages:
+            events.append({
+                'name': record['stage'],
+                'cat': record['category'],
+                'ph': 'X',
+                'ts': round(record['start_seconds'] * 1e6),
+                'dur': round(record['seconds'] * 1e6),
+                'pid': pid,
+                'tid': record['thread'],
+                'args': {key: value for key, value in record.items()
+                         if key not in ('stage', 'category', 'start_seconds', 'seconds', 'thread')},
+            })
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if path:
+            with open(path, 'w') as f:
+                json.dump(trace, f)
+        return trace
+
+
+class NullProfiler:
+    """
+    Stand-in used when profiling is off: stages cost one generator and record nothing
+    """
+    trace_memory = False
+    stages = []
+
+    @contextmanager
+    def stage(self, name, category='stage', **args):
+        yield {}
+
+    def profile(self, name=None, category='stage'):
+        return lambda func: func
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def profiled(name=None, category='stage'):
+    """
+    Method decorator measuring calls with the instance's profiler (self.profiler);
+    output_bytes is taken from a str/bytes/path return value
+    """
+    def decorate(method):
+        stage_name = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None) or NULL_PROFILER
+            with profiler.stage(stage_name, category) as record:
+                return _record_output(record, method(self, *args, **kwargs))
+        return wrapper
+    return decorate
@@ -0,0 +1,82 @@
+import numpy as np
+
+# How rows tied on value are ordered and cut at rank k: 'first' prefers earlier rows
+# and 'last' later ones (as in DataFrame.nlargest); 'all' keeps every row tied with the k-th
+TIES = ('first', 'last', 'all')
+
+
+def group_codes(frame, by, sort_groups=True):
+    """
+    Group number per row for the by columns (-1 where a key is missing)
+    Numbered in sorted key order, as groupby does, or by first appearance with sort_groups=False
+    """
+    if not by:
+        return np.zeros(len(frame), dtype=np.int64)
+    # ngroup gives NaN (as floats) for rows whose key is missing
+    codes = frame.groupby(by, sort=sort_groups, observed=True).ngroup()
+    return codes.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def rank_within(frame, by=(), value_col='Value', k=10, largest=True, ties='first', sort_groups=True, rank_col=None):
+    """
+    The k highest (or lowest) rows by value_col within every group of the by columns
+    All groups are ranked in one vectorized pass: rows are ordered by (group, value,
+    row position) and ranked by their offset within their group, so the cost does not
+    grow with the number of groups (thousands of municipalities cost the same as 17
+    regions). Rows with a missing value or group key are left out (as idxmax skips them).
+    Returns the selected rows of frame (original index kept) ordered by group, then
+    by rank; rank_col adds the 1-based rank as a column
+    """
+    if ties not in TIES:
+        raise ValueError(f"Unknown ties '{ties}'. Expected one of {TIES}")
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    by = [by] if isinstance(by, str) else list(by)
+
+    values = frame[value_col].to_numpy(dtype=float)
+    groups = group_codes(frame, by, sort_groups)
+    positions = np.flatnonzero((groups >= 0) & ~np.isnan(values))
+    if not len(positions):
+        return frame.iloc[:0]
+
+    # Order by group, then value, then position for ties: two stable sorts, by value
+    # and then by group code, which NumPy radix-sorts when it fits in 16 bits
+    if ties == 'last':
+        positions = positions[::-1]
+    value_key = -values[positions] if largest else values[positions]
+    order = positions[np.argsort(value_key, kind='stable')]
+    code_type = np.int16 if groups.max() < np.iinfo(np.int16).max else np.int64
+    order = order[np.argsort(groups[order].astype(code_type), kind='stable')]
+
+    sorted_groups = groups[order]
+    steps = np.arange(len(order))
+    group_start = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+    rank = steps - np.maximum.accumulate(np.where(group_start, steps, 0))
+    keep = rank < k
+
+    if ties == 'all':
+        # Also keep rows tied with the k-th row of their group
+        sorted_values = values[order]
+        kth = rank == k - 1
+        cutoff = np.full(sorted_groups.max() + 1, np.nan)
+        cutoff[sorted_groups[kth]] = sorted_values[kth]
+        keep |= sorted_values == cutoff[sorted_groups]
+
+    ranked = frame.iloc[order[keep]]
+    if rank_col:
+        ranked = ranked.assign(**{rank_col: rank[keep] + 1})
+    return ranked
+
+
+def top_n(frame, by=(), value_col='Value', k=10, ties='first', sort_groups=True, rank_col=None):
+    """
+    The k highest rows by value_col within every group of the by columns (see rank_within)
+    """
+    return rank_within(frame, by, value_col, k, True, ties, sort_groups, rank_col)
+
+
+def bottom_n(frame, by=(), value_col='Value', k=10, ties='first', sort_groups=True, rank_col=None):
+    """
+    The k lowest rows by value_col within every group of the by columns (see rank_within)
+    """
+    return rank_within(frame, by, value_col, k, False, ties, sort_groups, rank_col)
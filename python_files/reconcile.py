@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+from geography import LEVELS, LEVEL_CODES
+from forecasting import FORECAST_COLUMNS
+
+try:
+    import scipy.sparse as sparse
+    from scipy.sparse.linalg import splu
+except ImportError:
+    sparse = None
+
+# 'bottom_up' sums the leaf forecasts; 'top_down' splits the root forecast by the
+# leaves' average historical shares; the others project all forecasts onto the coherent
+# subspace, weighting each node's adjustment by 1 ('ols'), by its number of leaves
+# ('wls_struct') or by its in-sample error variance ('mint_diag', MinT with a diagonal covariance)
+METHODS = ('bottom_up', 'top_down', 'ols', 'wls_struct', 'mint_diag')
+DEFAULT_METHOD = 'mint_diag'
+
+
+def _require_scipy():
+    if sparse is None:
+        raise ImportError("Forecast reconciliation requires the 'scipy' package (pip install scipy)")
+
+
+def summing_matrix(parents):
+    """
+    Sparse summing matrix S (nodes x leaves): S[i, j] = 1 when leaf j is node i or lies below it
+    parents holds the parent node of every node (-1 for the root); leaves are the nodes
+    without children. Returns (S, leaf node numbers)
+    """
+    _require_scipy()
+    parents = np.asarray(parents)
+    has_children = np.zeros(len(parents), dtype=bool)
+    has_children[parents[parents >= 0]] = True
+    leaves = np.flatnonzero(~has_children)
+
+    # Climb from every leaf to the root at once, one level per step
+    rows, cols = [], []
+    nodes, leaf_cols = leaves, np.arange(len(leaves))
+    while len(nodes):
+        rows.append(nodes)
+        cols.append(leaf_cols)
+        up = parents[nodes]
+        nodes, leaf_cols = up[up >= 0], leaf_cols[up >= 0]
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    S = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(parents), len(leaves)))
+    return S, leaves
+
+
+def reconcile(base, parents, method=DEFAULT_METHOD, history=None, variances=None):
+    """
+    Make node x period forecasts coherent with the hierarchy given by parents
+    base is a dense node x period array (every forecast horizon, and fitted years, at
+    once); columns with a missing node are returned unchanged. history (node x year
+    actuals) is needed for 'top_down' and variances (one per node) for 'mint_diag'.
+    The projection methods solve only an aggregates x aggregates sparse system
+    (C W C' with C = [I, -S_aggregates]), so thousands of leaves stay cheap
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown reconciliation method '{method}'. Expected one of {METHODS}")
+    S, leaves = summing_matrix(parents)
+    base = np.asarray(base, dtype=float)
+    complete = ~np.isnan(base).any(axis=0)
+    forecasts = base[:, complete]
+    reconciled = base.copy()
+
+    if method == 'bottom_up':
+        coherent = S @ forecasts[leaves]
+    elif method == 'top_down':
+        if history is None:
+            raise ValueError("The 'top_down' method needs the history of every node")
+        roots = np.flatnonzero(np.asarray(parents) < 0)
+        if len(roots) != 1:
+            raise ValueError(f"The 'top_down' method needs a single root, found {len(roots)}")
+        # Average over years of each leaf's share of the root (Gross-Sohl method A)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.nanmean(history[leaves] / history[roots[0]], axis=1)
+        coherent = S @ (np.nan_to_num(shares)[:, None] * forecasts[roots[0]][None, :])
+    else:
+        if method == 'ols':
+            weights = np.ones(S.shape[0])
+        elif method == 'wls_struct':
+            weights = np.asarray(S.sum(axis=1)).ravel()
+        else:
+            if variances is None:
+                raise ValueError("The 'mint_diag' method needs the in-sample error variance of every node")
+            weights = np.nan_to_num(np.asarray(variances, dtype=float), nan=np.nanmax(variances))
+            # A perfect in-sample fit must not pin a node completely
+            weights = np.maximum(weights, max(weights.max(), 1.0) * 1e-9)
+
+        aggregates = np.setdiff1d(np.arange(S.shape[0]), leaves)
+        n_aggregates = len(aggregates)
+        # C @ y = 0 exactly when y is coherent: each aggregate minus the sum of its leaves
+        identity = sparse.csr_matrix((np.ones(n_aggregates), (np.arange(n_aggregates), aggregates)),
+                                     shape=(n_aggregates, S.shape[0]))
+        leaf_part = S[aggregates].tocoo()
+        C = identity - sparse.csr_matrix((leaf_part.data, (leaf_part.row, leaves[leaf_part.col])),
+                                         shape=(n_aggregates, S.shape[0]))
+        W = sparse.diags(weights)
+        solver = splu((C @ W @ C.T).tocsc())
+        coherent = forecasts - W @ (C.T @ solver.solve(C @ forecasts))
+
+    reconciled[:, complete] = coherent
+    return reconciled
+
+
+class ForecastHierarchy:
+    """
+    Forecast series for every node of a GeoHierarchy (national -> region -> province/HUC)
+    Each node's history is the sum of its own rows (a region's region-level rows, a
+    province's rows); nodes without rows of their own (the national root) sum their
+    children. Keys are (Level, Region, Location_Name) tuples in node order
+    """
+    KEY_NAMES = ['Level', 'Region', 'Location_Name']
+
+    def __init__(self, keys, parents):
+        self.keys = list(keys)
+        self.parents = np.asarray(parents)
+        self.positions = {key: node for node, key in enumerate(self.keys)}
+
+    @classmethod
+    def from_geography(cls, geography):
+        levels = np.array(LEVELS, dtype=object)[geography.node_levels]
+        keys = []
+        for node, (name, level) in enumerate(zip(geography.names, levels)):
+            region = name if level in ('national', 'region') else geography.names[geography.parents[node]]
+            keys.append((level, region, name))
+        return cls(keys, geography.parents)
+
+    def history(self, geography, df, metric='GDP', value_col='Value'):
+        """
+        Node x year array of the metric (NaN where a node has no value that year)
+        """
+        rows = np.flatnonzero((df['Metric'] == metric).to_numpy() & ~np.isnan(df[value_col].to_numpy(dtype=float)))
+        n_years = len(geography.years)
+        cells = geography.row_nodes[rows] * n_years + geography.row_years[rows]
+        size = len(self.keys) * n_years
+        totals = np.bincount(cells, weights=df[value_col].to_numpy(dtype=float)[rows], minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        totals = np.where(counts > 0, totals, np.nan).reshape(len(self.keys), n_years)
+
+        # Fill nodes without rows of their own from their children, deepest level first
+        node_levels = np.array([LEVEL_CODES[key[0]] for key in self.keys])
+        for code in sorted(set(node_levels.tolist()), reverse=True):
+            empty = np.flatnonzero((node_levels == code) & np.isnan(totals).all(axis=1))
+            for node in empty:
+                children = np.flatnonzero(self.parents == node)
+                if len(children):
+                    totals[node] = np.where(np.isnan(totals[children]).all(axis=0), np.nan,
+                                            np.nansum(totals[children], axis=0))
+        return totals
+
+    def series(self, history, years):
+        """
+        {key: (ds, y) history} for every node with at least one value
+        """
+        ds = pd.to_datetime(np.asarray(years).astype(int).astype(str), format='%Y')
+        series = {}
+        for node, key in enumerate(self.keys):
+            observed = ~np.isnan(history[node])
+            if observed.any():
+                series[key] = pd.DataFrame({'ds': ds[observed], 'y': history[node, observed]})
+        return series
+
+    def restrict(self, keys):
+        """
+        The hierarchy over the given keys only: children of a dropped node move up to
+        its nearest kept ancestor, dropped leaves leave the sums
+        """
+        keep = np.zeros(len(self.keys), dtype=bool)
+        keep[[self.positions[key] for key in keys]] = True
+        parents = self.parents.copy()
+        # Climb past dropped ancestors
+        while True:
+            dropped = (parents >= 0) & ~keep[np.maximum(parents, 0)]
+            if not dropped.any():
+                break
+            parents[dropped] = self.parents[parents[dropped]]
+        new_numbers = np.cumsum(keep) - 1
+        kept = np.flatnonzero(keep)
+        kept_parents = np.where(parents[kept] >= 0, new_numbers[np.maximum(parents[kept], 0)], -1)
+        return ForecastHierarchy([self.keys[node] for node in kept], kept_parents)
+
+
+def reconcile_forecasts(forecasts, hierarchy, method=DEFAULT_METHOD, history=None):
+    """
+    Reconcile a tidy ForecastEngine frame keyed by hierarchy.KEY_NAMES
+    Nodes without a forecast are dropped from the hierarchy (see restrict). Every
+    year is reconciled at once; yhat becomes the coherent forecast, the interval
+    bounds shift with it and the original forecast is kept as yhat_base.
+    history (node x year, in the full hierarchy's node order) feeds 'top_down'
+    """
+    key_names = hierarchy.KEY_NAMES
+    keys = list(forecasts[key_names].drop_duplicates().itertuples(index=False, name=None))
+    present = set(keys)
+    restricted = hierarchy.restrict([key for key in hierarchy.keys if key in present])
+    node_of_key = restricted.positions
+
+    years = np.sort(forecasts['Year'].unique())
+    nodes = np.array([node_of_key[key] for key in forecasts[key_names].itertuples(index=False, name=None)])
+    cols = np.searchsorted(years, forecasts['Year'].to_numpy())
+
+    def grid(col):
+        values = np.full((len(restricted.keys), len(years)), np.nan)
+        values[nodes, cols] = forecasts[col].to_numpy(dtype=float)
+        return values
+
+    base = grid('yhat')
+    actual = grid('y')
+    # In-sample squared error of every node over its historical years
+    with np.errstate(invalid='ignore'):
+        variances = np.nanmean((actual - base) ** 2, axis=1) if method == 'mint_diag' else None
+    if history is not None:
+        history = history[[hierarchy.positions[key] for key in restricted.keys]]
+
+    reconciled = reconcile(base, restricted.parents, method, history, variances)
+    adjustment = (reconciled - base)[nodes, cols]
+
+    result = forecasts.copy()
+    result['yhat_base'] = result['yhat']
+    for col in ['yhat', 'yhat_lower', 'yhat_upper']:
+        result[col] = result[col] + adjustment
+    # Hierarchy order: national, regions, then the locations
+    result['_node'] = nodes
+    result = result.sort_values(['_node', 'Year'], kind='stable').drop(columns='_node')
+    return result[key_names + FORECAST_COLUMNS + ['yhat_base']].reset_index(drop=True)
@@ -0,0 +1,417 @@
+import json
+import signal
+import gzip
+import time
+import asyncio
+import hashlib
+import inspect
+import traceback
+import functools
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+from email.utils import formatdate, parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from export import HTMLExporter
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+DEFAULT_CACHE_SIZE = 128
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_SECONDS = 15
+# Longest request head (request line + headers) accepted
+MAX_HEAD_BYTES = 64 * 1024
+# Smaller responses are not worth compressing
+MIN_GZIP_BYTES = 1024
+
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+}
+
+# Dashboard and exporter inside a render worker process (see ChartServer)
+_worker_args = None
+
+def _init_render_worker(dashboard, exporter):
+    global _worker_args
+    # Ctrl+C is handled by the server, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_args = (dashboard, exporter)
+
+def _render_in_worker(kind, chart_name, params):
+    return render_chart(*_worker_args, kind, chart_name, params)
+
+
+def render_chart(dashboard, exporter, kind, chart_name, params):
+    """
+    One chart as figure JSON (kind='json') or a standalone HTML page (kind='html')
+    that loads plotly.js from the server
+    """
+    method = getattr(dashboard, dashboard.CHART_METHODS[chart_name])
+    fig = method(**params)
+    if kind == 'json':
+        return exporter.figure_json(fig)
+    return exporter.to_html(fig, include_plotlyjs='/' + exporter.plotlyjs_filename, div_id=f"div_{chart_name}")
+
+
+def chart_parameters(dashboard, chart_name):
+    """
+    {name: default} for the keyword parameters a chart method takes
+    (e.g. growth_rate_calculation's base_year and target_year)
+    """
+    method = getattr(dashboard, dashboard.CHART_METHODS[chart_name])
+    return {name: parameter.default for name, parameter in inspect.signature(method).parameters.items()
+            if parameter.default is not inspect.Parameter.empty}
+
+
+def parse_params(query, defaults):
+    """
+    Chart parameters from a query string, converted to the type of each default
+    Raises ValueError for unknown names or values that do not convert
+    """
+    params = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name not in defaults:
+            raise ValueError(f"Unknown parameter '{name}'. Expected one of {sorted(defaults)}")
+        default = defaults[name]
+        if isinstance(default, bool):
+            params[name] = value.lower() in ('1', 'true', 'yes')
+        elif isinstance(default, (int, float)):
+            try:
+                params[name] = type(default)(value)
+            except ValueError:
+                raise ValueError(f"Parameter '{name}' expects a {type(default).__name__}, got '{value}'") from None
+        else:
+            params[name] = value
+    return params
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header allows gzip (and does not give it q=0)
+    """
+    for token in accept_encoding.split(','):
+        coding, _, quality = token.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return quality.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+class CachedResponse:
+    """
+    A response body ready to serve: content type, strong ETag and, for larger
+    bodies, a gzip copy compressed once when the entry is made
+    """
+    def __init__(self, body, content_type, cache_control='no-cache'):
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # mtime=0 keeps the compressed bytes identical for identical bodies
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= MIN_GZIP_BYTES else None
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry past maxsize
+    """
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class ChartServer:
+    """
+    Serves one loaded GDPAnalysisDashboard over HTTP with asyncio
+    Routes:
+      /                       index page linking every chart by tab
+      /charts                 chart names, tabs, chart parameters and cache counters (JSON)
+      /charts/<name>.json     the chart's figure JSON
+      /charts/<name>          the chart as an HTML page
+    Query parameters are passed to chart methods that take them, e.g.
+    /charts/region_growth_rate.json?base_year=2019&target_year=2022
+    Rendered responses are memoized in a bounded LRU cache keyed by chart, format and
+    parameters; concurrent requests for a chart that is still rendering share one render.
+    Responses carry an ETag and Last-Modified (answering conditional requests with 304)
+    and are sent gzipped to clients that accept it. Rendering runs on a worker pool so
+    the event loop keeps answering cached requests meanwhile: a process pool with
+    workers > 1 (each process gets a copy of the dashboard), else one thread
+    """
+    def __init__(self, dashboard, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE,
+                 workers=None, executor='process', exporter=None):
+        if executor not in ('process', 'thread'):
+            raise ValueError(f"Unknown executor '{executor}'. Expected 'process' or 'thread'")
+        self.dashboard = dashboard
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.executor = executor
+        self.exporter = exporter or HTMLExporter(shared_plotlyjs=True)
+        self.cache = LRUCache(cache_size)
+        self.parameters = {name: chart_parameters(dashboard, name) for name in dashboard.CHART_METHODS}
+        # The dashboard never changes while it is served, so every response dates from startup
+        self.loaded_at = int(time.time())
+        self.last_modified = formatdate(self.loaded_at, usegmt=True)
+        self.renders = 0
+        self.pool = None
+        self.server = None
+        self._pending = {}
+        self._static = {}
+
+    # ==================== RENDERING ====================
+
+    def _make_pool(self):
+        if self.workers and self.workers > 1:
+            # Build the shared aggregates and row index once so every worker starts with them
+            self.dashboard.warm_up()
+            if self.executor == 'process':
+                return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_render_worker,
+                                           initargs=(self.dashboard, self.exporter))
+            return ThreadPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=1)
+
+    def _render_call(self, kind, chart_name, params):
+        if isinstance(self.pool, ProcessPoolExecutor):
+            return functools.partial(_render_in_worker, kind, chart_name, params)
+        return functools.partial(render_chart, self.dashboard, self.exporter, kind, chart_name, params)
+
+    async def chart_response(self, kind, chart_name, params):
+        """
+        The cached response for a chart, rendering it on the pool on a cache miss
+        """
+        key = (kind, chart_name, tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(key, kind, chart_name, params))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A client that disconnects must not cancel a render other requests wait on
+        return await asyncio.shield(pending)
+
+    async def _render(self, key, kind, chart_name, params):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        text = await loop.run_in_executor(self.pool, self._render_call(kind, chart_name, params))
+        content_type = 'application/json' if kind == 'json' else 'text/html; charset=utf-8'
+        entry = await loop.run_in_executor(None, CachedResponse, text.encode('utf-8'), content_type)
+        self.cache.put(key, entry)
+        self.renders += 1
+        print(f"Rendered {chart_name} ({kind}{', ' + str(params) if params else ''}) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return entry
+
+    def _build_static(self):
+        """
+        Responses that never change while serving: the index pages and plotly.js
+        """
+        # Imported on use: plotly.offline is slow to import (it loads IPython when installed)
+        from plotly.offline import get_plotlyjs
+        tabs = self.dashboard.CHART_TABS
+        links = []
+        for tab, chart_names in tabs.items():
+            items = ''.join(f'<li><a href="/charts/{name}">{name}</a> (<a href="/charts/{name}.json">json</a>)</li>'
+                            for name in chart_names)
+            links.append(f"<h2>{tab}</h2><ul>{items}</ul>")
+        index = ("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>GDP Analysis Dashboard</title></head>"
+                 f"<body><h1>GDP Analysis Dashboard</h1>{''.join(links)}</body></html>")
+        self._static['/'] = CachedResponse(index.encode('utf-8'), 'text/html; charset=utf-8')
+        # Versioned file name, so browsers may keep it for good
+        self._static['/' + self.exporter.plotlyjs_filename] = CachedResponse(
+            get_plotlyjs().encode('utf-8'), 'application/javascript', 'public, max-age=31536000, immutable'
+        )
+
+    def listing(self):
+        return {
+            'charts': list(self.dashboard.CHART_METHODS),
+            'tabs': self.dashboard.CHART_TABS,
+            'parameters': {name: params for name, params in self.parameters.items() if params},
+            'cache': {'size': len(self.cache), 'maxsize': self.cache.maxsize,
+                      'hits': self.cache.hits, 'misses': self.cache.misses, 'renders': self.renders},
+        }
+
+    # ==================== HTTP ====================
+
+    async def respond(self, method, target, headers):
+        """
+        (status, headers, body) for one request
+        """
+        if method not in ('GET', 'HEAD'):
+            return self._error(405, f"{method} is not supported", {'Allow': 'GET, HEAD'})
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+
+        if path in self._static:
+            return self._cached(self._static[path], headers)
+        if path == '/charts':
+            body = json.dumps(self.listing()).encode('utf-8')
+            return 200, {'Content-Type': 'application/json', 'Cache-Control': 'no-store'}, body
+        if not path.startswith('/charts/'):
+            return self._error(404, f"No page at {path}")
+
+        chart_name = path[len('/charts/'):]
+        kind = 'html'
+        if chart_name.endswith('.json'):
+            chart_name, kind = chart_name[:-len('.json')], 'json'
+        if chart_name not in self.parameters:
+            return self._error(404, f"Unknown chart '{chart_name}'")
+        try:
+            params = parse_params(url.query, self.parameters[chart_name])
+        except ValueError as e:
+            return self._error(400, str(e))
+        try:
+            entry = await self.chart_response(kind, chart_name, params)
+        except Exception:
+            error = traceback.format_exc()
+            print(f"Failed: {chart_name}\n{error}")
+            return self._error(500, f"Chart '{chart_name}' failed to render\n{error}")
+        return self._cached(entry, headers)
+
+    def _cached(self, entry, request_headers):
+        headers = {
+            'Content-Type': entry.content_type,
+            'ETag': entry.etag,
+            'Last-Modified': self.last_modified,
+            'Cache-Control': entry.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if self._not_modified(entry, request_headers):
+            return 304, headers, b''
+        if entry.gzipped is not None and accepts_gzip(request_headers.get('accept-encoding', '')):
+            headers['Content-Encoding'] = 'gzip'
+            return 200, headers, entry.gzipped
+        return 200, headers, entry.body
+
+    def _not_modified(self, entry, request_headers):
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None:
+            # Weak comparison: a proxy may have marked our tag weak (W/"...")
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return entry.etag in tags or '*' in tags
+        if_modified_since = request_headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.loaded_at
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _error(self, status, message, headers=None):
+        headers = dict(headers or {})
+        headers.update({'Content-Type': 'text/plain; charset=utf-8', 'Cache-Control': 'no-store'})
+        return status, headers, (message + '\n').encode('utf-8')
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one connection (HTTP/1.1 keep-alive)
+        """
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_SECONDS)
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 'GET', *self._error(431, "Request head too large"), keep_alive=False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+                parts = request_line.split()
+                if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+                    await self._send(writer, 'GET', *self._error(400, "Malformed request line"), keep_alive=False)
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                if headers.get('content-length', '0') != '0' or 'transfer-encoding' in headers:
+                    # Only GET and HEAD are served; a request body would desync the connection
+                    keep_alive = False
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                await self._send(writer, method, status, response_headers, body, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, method, status, headers, body, keep_alive):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", f"Date: {formatdate(usegmt=True)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if status != 304:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD' and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        """
+        Start the render pool and listen; returns once the socket is bound
+        """
+        self._build_static()
+        self.pool = self._make_pool()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEAD_BYTES)
+        # Port 0 picks a free port; report the one actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Serving {len(self.parameters)} charts on http://{self.host}:{self.port}/")
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+
+def serve(dashboard, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, workers=None,
+          executor='process'):
+    """
+    Serve a dashboard until interrupted (Ctrl+C)
+    """
+    server = ChartServer(dashboard, host, port, cache_size, workers, executor)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Server stopped")
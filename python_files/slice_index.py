@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from geography import LEVELS, LEVEL_CODES, level_codes
+
+
+def _codes(values):
+    """
+    Integer codes for a column plus {value: code}; code 0 is kept for missing values
+    Categorical columns reuse their category codes, so no strings are compared
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values, sort=True)
+    return codes.astype(np.int64) + 1, {label: code + 1 for code, label in enumerate(labels)}
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, int, float, np.integer, np.floating)):
+        return [value]
+    return list(value)
+
+
+def split_by(frame, col):
+    """
+    (value, rows of frame with that value) for each distinct non-missing value of col,
+    in order of first appearance (the order of frame[col].unique())
+    One factorize and stable sort replaces a boolean scan of the frame per value;
+    rows keep their original order within each group
+    """
+    codes, uniques = pd.factorize(frame[col])
+    order = np.argsort(codes, kind='stable')
+    # Missing values (code -1) sort first and are skipped
+    bounds = np.count_nonzero(codes < 0) + np.r_[0, np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)))]
+    for k, value in enumerate(uniques):
+        yield value, frame.iloc[order[bounds[k]:bounds[k + 1]]]
+
+
+class SliceIndex:
+    """
+    Row index over (level, Region, Industry, Start_Year) for slicing the prepared frame
+    Rows are ordered once by the codes of those keys (stable, so rows keep their
+    original order within a key combination) and the start offset of every key
+    combination is stored. A query looks up the offsets of the combinations it
+    selects and gathers only their rows: O(groups selected + k) for k matching rows,
+    instead of one boolean scan of the whole frame per filter. Results come back in
+    the frame's original row order, exactly as a boolean mask would select them
+    levels gives the geographic level code of every row (e.g. GeoHierarchy.row_levels);
+    it is derived from Location_Type when not given
+    """
+    LEVELS = (None,) + LEVELS
+
+    def __init__(self, df, levels=None):
+        self.df = df
+        levels = level_codes(df['Location_Type']) if levels is None else levels
+
+        regions, self.region_codes = _codes(df['Region'])
+        industries, self.industry_codes = _codes(df['Industry'])
+        year_values = df['Start_Year'].to_numpy(dtype=float)
+        self.years = np.unique(year_values)
+        years = np.searchsorted(self.years, year_values)
+
+        # One dense group number per (level, region, industry, year) combination
+        self.shape = (len(LEVELS), len(self.region_codes) + 1, len(self.industry_codes) + 1, len(self.years))
+        groups = np.ravel_multi_index((levels, regions, industries, years), self.shape)
+        self.order = np.argsort(groups, kind='stable')
+        counts = np.bincount(groups, minlength=int(np.prod(self.shape)))
+        self.offsets = np.r_[0, np.cumsum(counts)]
+
+    def _level_codes(self, level):
+        if level not in self.LEVELS:
+            raise ValueError(f"Unknown level '{level}'. Expected one of {self.LEVELS}")
+        if level is None:
+            return np.arange(self.shape[0])
+        return np.array([LEVEL_CODES[level]])
+
+    @staticmethod
+    def _key_codes(values, codes, size):
+        if values is None:
+            return np.arange(size)
+        return np.unique(np.array([codes[value] for value in values if value in codes], dtype=np.int64))
+
+    def _year_codes(self, years):
+        if years is None:
+            return np.arange(len(self.years))
+        years = np.asarray(years, dtype=float)
+        idx = np.clip(np.searchsorted(self.years, years), 0, max(len(self.years) - 1, 0))
+        return np.unique(idx[self.years[idx] == years]) if len(self.years) else np.array([], dtype=np.int64)
+
+    def rows(self, region=None, industry=None, years=None, level=None, location=None):
+        """
+        Positions (sorted) of the rows matching every given filter
+        Each filter takes one value or a list; None leaves that key unfiltered.
+        location filters Location_Name among the selected rows only
+        """
+        groups = np.ix_(
+            self._level_codes(level),
+            self._key_codes(_as_list(region), self.region_codes, self.shape[1]),
+            self._key_codes(_as_list(industry), self.industry_codes, self.shape[2]),
+            self._year_codes(_as_list(years)),
+        )
+        groups = np.ravel_multi_index(groups, self.shape).ravel()
+        starts = self.offsets[groups]
+        lengths = self.offsets[groups + 1] - starts
+
+        # Concatenated ranges starts[g]:starts[g] + lengths[g], without a Python loop
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+        rows = np.sort(self.order[positions])
+
+        locations = _as_list(location)
+        if locations is not None:
+            rows = rows[self.df['Location_Name'].iloc[rows].isin(locations).to_numpy()]
+        return rows
+
+    def query(self, region=None, industry=None, years=None, level=None, location=None):
+        """
+        The rows matching every given filter (see rows()), copying only those rows
+        """
+        return self.df.iloc[self.rows(region, industry, years, level, location)]
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The modules live side by side in python_files and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def dashboard():
+    """
+    Dashboard over benchmark.py's synthetic data (17 regions, 7 locations each)
+    """
+    from EDM import GDPAnalysisDashboard
+    from benchmark import synthetic_frame
+    return GDPAnalysisDashboard.from_frame(synthetic_frame())
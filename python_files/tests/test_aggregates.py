@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aggregates import AggregateCube
+from geography import LEVEL_CODES, level_codes
+
+
+def toy_frame(seed=0, rows=400):
+    """
+    Rows over 3 regions, 3 industries and 4 consecutive years, some missing an
+    Industry or a Location_Name, with repeated keys so the sums add several rows
+    """
+    rng = np.random.default_rng(seed)
+    industries = rng.choice(['Mining', 'Construction', 'Fishing', None], size=rows, p=[0.3, 0.3, 0.3, 0.1])
+    locations = rng.choice(['North', 'South', 'Capital', None], size=rows, p=[0.3, 0.3, 0.3, 0.1])
+    return pd.DataFrame({
+        'Region': pd.Categorical(rng.choice(['Region I', 'Region II', 'Region III'], size=rows)),
+        'Industry': pd.Categorical(industries),
+        'Location_Type': pd.Categorical(rng.choice(['Region', 'Province', 'City'], size=rows)),
+        'Location_Name': pd.Categorical(locations),
+        'Start_Year': rng.choice([2020, 2021, 2022, 2023], size=rows),
+        'Value': rng.uniform(1, 100, size=rows).round(2),
+    })
+
+
+def direct_rollup(df, dims):
+    return df.groupby(dims, observed=True)['Value'].sum().reset_index()
+
+
+@pytest.mark.parametrize('dims', [
+    ['Start_Year'],
+    ['Region', 'Start_Year'],
+    ['Industry', 'Start_Year'],
+    ['Region', 'Industry', 'Start_Year'],
+    ['Region', 'Location_Name', 'Start_Year'],
+    ['Region', 'Industry'],
+])
+@pytest.mark.parametrize('level', [None, 'province'])
+def test_rollup_matches_groupby(dims, level):
+    df = toy_frame()
+    rows = df if level is None else df[level_codes(df['Location_Type']) == LEVEL_CODES[level]]
+    pd.testing.assert_frame_equal(AggregateCube(df).rollup(dims, level), direct_rollup(rows, dims),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_rollup_keeps_rows_missing_other_dimensions():
+    df = toy_frame()
+    assert df['Industry'].isna().any() and df['Location_Name'].isna().any()
+    totals = AggregateCube(df).rollup(['Start_Year'])
+    np.testing.assert_allclose(totals['Value'], df.groupby('Start_Year')['Value'].sum())
+
+
+@pytest.mark.parametrize('dims', [['Region', 'Start_Year'], ['Region', 'Industry', 'Start_Year']])
+def test_growth_matches_pct_change(dims):
+    df = toy_frame()
+    expected = direct_rollup(df, dims)
+    expected['Growth_Rate'] = expected.groupby(dims[:-1], observed=True)['Value'].pct_change() * 100
+
+    growth = AggregateCube(df).growth(dims)
+    pd.testing.assert_frame_equal(growth, expected, check_dtype=False, check_categorical=False)
+
+
+def test_rollups_are_memoized_copies():
+    cube = AggregateCube(toy_frame())
+    first = cube.rollup(['Region', 'Start_Year'])
+    first['Extra'] = 1
+    assert 'Extra' not in cube.rollup(['Region', 'Start_Year'])
+    assert cube.panel(['Region', 'Start_Year']) is cube.panel(['Region', 'Start_Year'])
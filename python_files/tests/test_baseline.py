@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from baseline import BASELINE_MODELS, baseline_forecasts
+
+
+def toy_series():
+    """
+    Growing series over different year spans, one with a gap
+    """
+    rng = np.random.default_rng(1)
+    spans = {'A': range(2010, 2024), 'B': range(2014, 2024), 'C': range(2010, 2019), 'D': [2012, 2013, 2015, 2016, 2017]}
+    series = {}
+    for key, years in spans.items():
+        years = np.asarray(years)
+        y = 100 * np.cumprod(1 + rng.normal(0.05, 0.03, size=len(years)))
+        series[key] = pd.DataFrame({'ds': pd.to_datetime(years.astype(str), format='%Y'), 'y': y})
+    return series
+
+
+@pytest.mark.parametrize('model', list(BASELINE_MODELS))
+def test_batched_baseline_matches_per_series_fits(model):
+    series = toy_series()
+    batched = {key: (forecast, error) for key, forecast, error in baseline_forecasts(series, model, 3)}
+    for key, history in series.items():
+        [(_, forecast, error)] = baseline_forecasts({key: history}, model, 3)
+        assert error is None and batched[key][1] is None
+        np.testing.assert_array_equal(batched[key][0]['ds'], forecast['ds'])
+        for col in ['yhat', 'yhat_lower', 'yhat_upper']:
+            np.testing.assert_allclose(batched[key][0][col], forecast[col], rtol=1e-9)
+
+
+@pytest.mark.parametrize('by', ['Region', 'Industry'])
+def test_default_forecast_history_counts_each_location_once(dashboard, by):
+    forecasts = dashboard.forecast(by=by)
+    history = forecasts[forecasts['Type'] == 'Historical']
+    # Region rows already hold the sum of their provinces/cities
+    gdp = dashboard.df[dashboard.df['Metric'] == 'GDP']
+    locations = gdp[gdp['Location_Type'] != 'Region'].groupby([by, 'Start_Year'], observed=True)['Value'].sum()
+    np.testing.assert_allclose(history['y'], locations.loc[list(zip(history[by], history['Year']))])
@@ -0,0 +1,66 @@
+import io
+import json
+import os
+import pytest
+from contextlib import redirect_stdout
+from benchmark import compare_results, main, synthetic_frame
+from EDM import GDPAnalysisDashboard
+
+
+@pytest.fixture(scope='module')
+def benchmark_run(tmp_path_factory):
+    """
+    One benchmark at the smallest scale, compared against a baseline in which
+    create_combined_dashboard took 10 ms and load 1000 s
+    """
+    tmp = tmp_path_factory.mktemp('benchmark')
+    baseline = str(tmp / 'baseline.json')
+    with open(baseline, 'w') as f:
+        json.dump({'runs': [{'scale': 1, 'stages': [{'stage': 'create_combined_dashboard', 'seconds': 0.01},
+                                                    {'stage': 'load', 'seconds': 1000.0}]}]}, f)
+    results = str(tmp / 'results.json')
+    out_dir = str(tmp / 'out')
+    output = io.StringIO()
+    with redirect_stdout(output):
+        main(['--scales', '1', '--out-dir', out_dir, '--results', results, '--shared-plotlyjs', '--compare', baseline])
+    with open(results) as f:
+        return json.load(f), results, out_dir, output.getvalue()
+
+
+def test_results_have_every_stage(benchmark_run):
+    results, _, out_dir, _ = benchmark_run
+    assert results['options']['shared_plotlyjs'] and results['options']['trace_memory']
+    [run] = results['runs']
+    charts = list(GDPAnalysisDashboard.CHART_METHODS)
+    expected = (['load', 'prepare_data', 'aggregates'] + [f"chart:{chart}" for chart in charts]
+                + [f"write_html:{chart}" for chart in charts] + ['create_combined_dashboard'])
+    assert [stage['stage'] for stage in run['stages']] == expected
+    for stage in run['stages']:
+        assert 'error' not in stage, stage
+        assert stage['seconds'] >= 0 and stage['peak_bytes'] > 0
+        if stage['stage'].startswith('write_html:') or stage['stage'] == 'create_combined_dashboard':
+            assert stage['output_bytes'] > 0
+    assert run['total_seconds'] == pytest.approx(sum(stage['seconds'] for stage in run['stages']), abs=1e-5)
+
+    scale_dir = os.path.join(out_dir, 'scale_1')
+    assert run['source_bytes'] == os.path.getsize(os.path.join(scale_dir, 'synthetic_data.csv'))
+    for chart in charts:
+        assert os.path.isfile(os.path.join(scale_dir, f"{chart}.html"))
+
+
+def test_prepared_rows_match_the_synthetic_source(benchmark_run):
+    results, _, _, _ = benchmark_run
+    # Every synthetic row has a value, so prepare_data keeps them all
+    assert results['runs'][0]['rows'] == len(synthetic_frame(1))
+
+
+def test_compare_flags_the_injected_slowdown(benchmark_run):
+    _, results, _, output = benchmark_run
+    flagged = [line for line in output.splitlines() if line.startswith('1x ')]
+    assert len(flagged) == 1 and flagged[0].startswith('1x create_combined_dashboard: 0.010s ->')
+
+    baseline = os.path.join(os.path.dirname(results), 'baseline.json')
+    regressions = compare_results(baseline, results)
+    assert [(scale, stage) for scale, stage, *_ in regressions] == [(1, 'create_combined_dashboard')]
+    # A run compared with itself has no regressions
+    assert compare_results(results, results) == []
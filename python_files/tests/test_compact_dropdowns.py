@@ -0,0 +1,94 @@
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from compact_dropdowns import compact_dropdown_figure, compact_dropdown_post_script
+
+DROPDOWN_CHARTS = [
+    'province_contribution_to_regional_gdp',
+    'top_regions_by_industry',
+    'lowest_regions_by_industry',
+    'national_gdp_composition_by_industry',
+    'province_gdp_share_within_region',
+    'change_in_percent_share_over_time',
+]
+
+
+@pytest.fixture(scope='module')
+def compact_dashboard():
+    from EDM import GDPAnalysisDashboard
+    from benchmark import synthetic_frame
+    return GDPAnalysisDashboard.from_frame(synthetic_frame(), compact_dropdowns=True)
+
+
+def column_values(column, start, stop):
+    if isinstance(column, dict):
+        return [column['labels'][code] for code in column['codes'][start:stop]]
+    return column[start:stop]
+
+
+def decode_traces(spec, group):
+    """
+    The traces the filter script draws for one dropdown group, as (name, x, y) in draw order
+    """
+    start, stop = spec['offsets'][group], spec['offsets'][group + 1]
+    xs, ys = column_values(spec['x'], start, stop), column_values(spec['y'], start, stop)
+    names = column_values(spec['series'], start, stop) if spec['series'] else [spec['groups'][group]] * len(xs)
+    traces = {}
+    for name, x, y in zip(names, xs, ys):
+        trace = traces.setdefault(str(name), ([], []))
+        trace[0].append(x)
+        trace[1].append(y)
+    return [(name, x, y) for name, (x, y) in traces.items()]
+
+
+def assert_same_values(actual, expected):
+    if all(isinstance(value, str) for value in expected):
+        assert list(actual) == list(expected)
+    else:
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float))
+
+
+@pytest.mark.parametrize('chart', DROPDOWN_CHARTS)
+def test_compact_figure_decodes_to_the_full_traces(chart, dashboard, compact_dashboard):
+    full = getattr(dashboard, chart)()
+    compact = getattr(compact_dashboard, chart)()
+    assert len(compact.data) == 0
+    # Decode the serialised figure, as the browser does
+    spec = json.loads(compact.to_json())['layout']['meta']['compact_dropdown']
+
+    full_buttons = full.layout.updatemenus[0].buttons
+    compact_buttons = compact.layout.updatemenus[0].buttons
+    assert [button.label for button in compact_buttons] == [button.label for button in full_buttons] == spec['groups']
+    assert all(button.method == 'skip' and not button.args for button in compact_buttons)
+    assert spec['titles'] == [button.args[1]['title'] for button in full_buttons]
+    assert spec['offsets'][0] == 0 and spec['offsets'] == sorted(spec['offsets'])
+
+    for group, button in enumerate(full_buttons):
+        visible = [trace for trace, shown in zip(full.data, button.args[0]['visible']) if shown]
+        decoded = decode_traces(spec, group)
+        assert [name for name, _, _ in decoded] == [trace.name for trace in visible]
+        for (_, x, y), trace in zip(decoded, visible):
+            assert_same_values(x, trace.x)
+            assert_same_values(y, trace.y)
+
+
+def test_text_and_years_are_dictionary_encoded(compact_dashboard):
+    spec = compact_dashboard.province_gdp_share_within_region().layout.meta['compact_dropdown']
+    # Province names and years repeat across rows, shares do not
+    assert isinstance(spec['series'], dict) and isinstance(spec['x'], dict)
+    assert sorted(spec['x']['labels']) == sorted(set(spec['x']['labels']))
+    assert isinstance(spec['y'], list) and len(spec['y']) == spec['offsets'][-1]
+    assert len(spec['series']['codes']) == len(spec['x']['codes']) == len(spec['y'])
+
+
+def test_rows_outside_the_dropdown_groups_are_dropped():
+    rows = pd.DataFrame({'Group': ['b', 'a', 'c', 'b', 'a'], 'X': list('vwxyz'), 'Y': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    fig = compact_dropdown_figure(rows, 'Group', 'X', 'Y', ['a', 'b'], ['A', 'B'])
+    spec = fig.layout.meta['compact_dropdown']
+    assert spec['offsets'] == [0, 2, 4]
+    assert decode_traces(spec, 0) == [('a', ['w', 'z'], [2.0, 5.0])]
+    assert decode_traces(spec, 1) == [('b', ['v', 'y'], [1.0, 4.0])]
+    assert 'edmCompactDropdown' in compact_dropdown_post_script(fig)
+    assert compact_dropdown_post_script(go.Figure()) is None
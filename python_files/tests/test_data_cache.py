@@ -0,0 +1,32 @@
+import pandas as pd
+from data_cache import load_cached_frame, save_cached_frame
+from ingest import prepare_frame, read_source
+
+
+def toy_workbook(path):
+    """
+    Small workbook whose Year_Range mixes year numbers (GDP) and 'YYYY-YYYY' text (Growth Rate)
+    """
+    pd.DataFrame({
+        'Industry': ['Construction', 'Construction', 'Mining', 'Mining', 'Mining'],
+        'Region': ['Region I', 'Region I', 'Region II', 'Region II', 'Region II'],
+        'Location_Type': ['Region', 'Region', 'Province', 'Province', 'Province'],
+        'Location_Name': ['Region I', 'Region I', 'Batanes', 'Batanes', 'Batanes'],
+        'Metric': ['GDP', 'GDP', 'GDP', 'Growth Rate', 'GDP'],
+        'Year_Range': [2018, 2019, 2018, '2018-2019', 2019],
+        'Start_Year': [2018, 2019, 2018, 2018, 2019],
+        'End_Year': [2018, 2019, 2018, 2019, 2019],
+        'Value': [100.5, 110.25, 20.0, 5.0, None],
+    }).to_excel(path, index=False)
+
+
+def test_cached_frame_matches_a_fresh_prepare(tmp_path):
+    path = str(tmp_path / 'toy.xlsx')
+    toy_workbook(path)
+    fresh = prepare_frame(read_source(path))
+    assert load_cached_frame(path) is None
+
+    save_cached_frame(fresh, path)
+    cached = load_cached_frame(path)
+    pd.testing.assert_frame_equal(cached, fresh)
+    assert [type(label) for label in cached['Year_Range'].cat.categories] == [int, int, str]
@@ -0,0 +1,76 @@
+import gzip
+import json
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from export import HTMLExporter, compact_floats
+
+
+def float_heavy_figure(seed=0, points=2000):
+    rng = np.random.default_rng(seed)
+    return go.Figure([go.Scatter(x=np.arange(points), y=rng.uniform(0, 1e6, size=points)),
+                      go.Heatmap(z=rng.normal(size=(20, 30)))])
+
+
+def test_float_digits_rounds_typed_arrays_and_shrinks_output(tmp_path):
+    fig = float_heavy_figure()
+    full = json.loads(HTMLExporter(tmp_path).figure_json(fig))['data']
+    data = json.loads(HTMLExporter(tmp_path, float_digits=4).figure_json(fig))['data']
+    # Short decimal literals against 8 bytes of base64 per value
+    assert len(json.dumps(data)) < 0.8 * len(json.dumps(full))
+
+    np.testing.assert_allclose(data[0]['y'], fig.data[0].y, rtol=5e-4)
+    assert data[0]['y'] == [float(f"{value:.4g}") for value in fig.data[0].y]
+    assert data[1]['z'] == [[float(f"{value:.4g}") for value in row] for row in fig.data[1].z]
+    # Integer arrays are left encoded
+    assert data[0]['x']['dtype'] != 'f8'
+
+
+def test_compact_floats_maps_missing_values_to_null():
+    fig = go.Figure(go.Scatter(y=np.array([1.23456, np.nan, np.inf])))
+    assert compact_floats(json.loads(fig.to_json()), 3)['data'][0]['y'] == [1.23, None, None]
+
+
+def test_to_html_with_float_digits_embeds_rounded_values(tmp_path):
+    fig = go.Figure(go.Bar(y=np.array([1234.5678, 0.000123456])))
+    html = HTMLExporter(tmp_path, float_digits=3).to_html(fig, div_id='div_bar')
+    assert '[1230,0.000123]' in html
+    assert '1234.5678' not in html
+
+
+def test_shared_bundle_is_written_once_and_referenced(tmp_path):
+    exporter = HTMLExporter(tmp_path, shared_plotlyjs=True)
+    exporter.prepare()
+    bundle = tmp_path / exporter.plotlyjs_filename
+    assert bundle.stat().st_size > 1_000_000
+
+    paths = [exporter.write(float_heavy_figure(seed, points=10), f"chart_{seed}") for seed in range(2)]
+    inlined = HTMLExporter(tmp_path / 'inline').to_html(float_heavy_figure(points=10))
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        assert f'src="{exporter.plotlyjs_filename}"' in html
+        assert len(html) < len(inlined) / 10
+
+
+def test_compress_writes_gzip_copies(tmp_path):
+    exporter = HTMLExporter(tmp_path, shared_plotlyjs=True, compress=('gzip',))
+    exporter.prepare()
+    path = exporter.write(float_heavy_figure(points=10), 'chart')
+    for written in (path, str(tmp_path / exporter.plotlyjs_filename)):
+        with open(written, 'rb') as raw, gzip.open(written + '.gz') as unpacked:
+            assert unpacked.read() == raw.read()
+
+
+def test_compress_writes_brotli_copies(tmp_path):
+    brotli = pytest.importorskip('brotli')
+    exporter = HTMLExporter(tmp_path, compress=('gzip', 'br'))
+    exporter.prepare()
+    path = exporter.write(float_heavy_figure(points=10), 'chart')
+    with open(path, 'rb') as raw, open(path + '.br', 'rb') as packed:
+        assert brotli.decompress(packed.read()) == raw.read()
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='Unknown compression'):
+        HTMLExporter(tmp_path, compress=('zip',))
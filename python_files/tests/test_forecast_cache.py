@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from forecast_cache import ForecastCache, forecast_key
+
+
+def yearly(years, unit):
+    return pd.to_datetime(pd.Series(years).astype(str), format='%Y').astype(f'datetime64[{unit}]')
+
+
+@pytest.mark.parametrize('unit', ['s', 'us', 'ns'])
+def test_put_get_round_trip_keeps_dates(tmp_path, unit):
+    forecast = pd.DataFrame({'ds': yearly(range(2018, 2027), unit)})
+    for col, offset in [('yhat', 0), ('yhat_lower', -5), ('yhat_upper', 5)]:
+        forecast[col] = np.linspace(100, 180, len(forecast)) + offset
+
+    cache = ForecastCache(str(tmp_path))
+    cache.put('ab12', forecast)
+    cached = cache.get('ab12')
+    assert cache.hits == 1
+    assert (cached['ds'].dt.year == np.arange(2018, 2027)).all()
+    pd.testing.assert_series_equal(cached['ds'], forecast['ds'], check_dtype=False)
+    np.testing.assert_array_equal(cached['yhat_upper'], forecast['yhat_upper'])
+
+
+def test_key_does_not_depend_on_the_date_unit():
+    keys = {
+        forecast_key('prophet', {}, 3, ('Region I',), pd.DataFrame({'ds': yearly(range(2018, 2024), unit), 'y': 1.0}))
+        for unit in ['s', 'us', 'ns']
+    }
+    assert len(keys) == 1
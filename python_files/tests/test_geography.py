@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from geography import LEVEL_CODES, NATIONAL_NAME, PROVINCE_PATTERN, GeoHierarchy
+
+# Location_Type of every location: each spelling (including ones only PROVINCE_PATTERN
+# knows and a missing one); 'Capital' is a name in two regions, so it must give two nodes
+LOCATIONS = {
+    'Region I': {'North': 'Province', 'Capital': 'Highly Urbanized City', 'Town': 'Municipality'},
+    'Region II': {'South': 'Province/City', 'Capital': 'City', 'Village': 'Barangay', 'Unlisted': None},
+    'Region III': {'East': 'Province'},
+}
+
+
+def toy_frame(seed=0, rows=300):
+    """
+    Region and location rows over 3 regions and 4 years, with some missing values
+    """
+    rng = np.random.default_rng(seed)
+    regions = rng.choice(list(LOCATIONS), size=rows)
+    names = [rng.choice([region] + list(LOCATIONS[region])) for region in regions]
+    types = [LOCATIONS[region].get(name, 'Region') for region, name in zip(regions, names)]
+    values = rng.uniform(1, 100, size=rows)
+    values[rng.choice(rows, size=15, replace=False)] = np.nan
+    return pd.DataFrame({
+        'Region': pd.Categorical(regions),
+        'Location_Type': pd.Categorical(types),
+        'Location_Name': pd.Categorical(names),
+        'Start_Year': rng.choice([2020, 2021, 2022, 2023], size=rows),
+        'Value': values,
+    })
+
+
+@pytest.mark.parametrize('level, old_mask', [
+    ('region', lambda df: (df['Location_Type'] == 'Region').to_numpy()),
+    ('province', lambda df: df['Location_Type'].astype(object).str.contains(PROVINCE_PATTERN, na=False).to_numpy(dtype=bool)),
+    ('municipality', lambda df: (df['Location_Type'] == 'Municipality').to_numpy()),
+])
+def test_level_masks_match_the_old_filters(level, old_mask):
+    df = toy_frame()
+    geography = GeoHierarchy(df)
+    np.testing.assert_array_equal(geography.mask(level), old_mask(df))
+    assert geography.mask(level) is geography.mask(level)
+
+
+def test_unknown_and_missing_types_are_other():
+    df = toy_frame()
+    other = GeoHierarchy(df).mask('other')
+    np.testing.assert_array_equal(other, df['Location_Type'].isin(['Barangay']).to_numpy() | df['Location_Type'].isna().to_numpy())
+    with pytest.raises(ValueError, match='Unknown level'):
+        GeoHierarchy(df).mask('barangay')
+
+
+def test_subtree_totals_match_region_year_rollup():
+    df = toy_frame()
+    geography = GeoHierarchy(df)
+    totals = pd.DataFrame(geography.subtree_totals(), index=geography.names, columns=geography.years)
+
+    rollup = df.groupby(['Region', 'Start_Year'], observed=True)['Value'].sum().unstack()
+    regions = geography.nodes.index[geography.nodes['Level'] == 'region']
+    region_totals = totals.iloc[regions]
+    np.testing.assert_allclose(region_totals.loc[rollup.index, rollup.columns].to_numpy(), rollup.to_numpy())
+    np.testing.assert_allclose(totals.loc[NATIONAL_NAME], df.groupby('Start_Year')['Value'].sum())
+
+
+def test_parent_links_of_province_rows():
+    df = toy_frame()
+    geography = GeoHierarchy(df)
+    nodes = geography.nodes
+    assert nodes.loc[0, 'Name'] == NATIONAL_NAME and nodes.loc[0, 'Parent'] == -1
+    assert (nodes.loc[nodes['Level'] == 'region', 'Parent'] == 0).all()
+
+    rows = np.flatnonzero(geography.mask('province'))
+    row_nodes = geography.row_nodes[rows]
+    # Each province/HUC row sits on a node with its own name, whose parent is its region
+    np.testing.assert_array_equal(nodes['Name'].to_numpy()[row_nodes], df['Location_Name'].to_numpy(dtype=object)[rows])
+    np.testing.assert_array_equal(nodes['Name'].to_numpy()[geography.parents[row_nodes]],
+                                  df['Region'].to_numpy(dtype=object)[rows])
+    assert (nodes['Level'].to_numpy()[row_nodes] == 'province').all()
+    # One node per (region, location): 'Capital' appears under two regions
+    capitals = nodes[nodes['Name'] == 'Capital']
+    assert sorted(nodes.loc[capitals['Parent'], 'Name']) == ['Region I', 'Region II']
+
+    # parent_total is the region's subtree total in the row's year
+    expected = df.groupby(['Region', 'Start_Year'], observed=True)['Value'].transform('sum').to_numpy()[rows]
+    np.testing.assert_allclose(geography.parent_total(rows), expected)
+    assert LEVEL_CODES['province'] in set(geography.node_levels.tolist())
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from growth import GrowthPanel
+
+# 2022 is missing for every entity, and ('Region II', 'South') also misses 2020
+YEARS = [2018, 2019, 2020, 2021, 2023]
+PROVINCES = {'Region I': ['North', 'Capital'], 'Region II': ['South', 'East']}
+
+
+def province_frame(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [{'Region': region, 'Province': province, 'Start_Year': year, 'Value': rng.uniform(10, 100)}
+            for region, provinces in PROVINCES.items() for province in provinces for year in YEARS
+            if (province, year) != ('South', 2020)]
+    # Shuffled, so the panel has to sort by entity and year itself
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def region_frame(provinces):
+    return provinces.groupby(['Region', 'Start_Year'], as_index=False)['Value'].sum()
+
+
+def calendar_pct_change(frame, entity_cols):
+    """
+    Growth (%) against the previous calendar year via groupby().pct_change(), after filling
+    in the missing years so a gap gives NaN instead of growth over two years
+    """
+    full = pd.MultiIndex.from_product([sorted(frame[col].unique()) for col in entity_cols]
+                                      + [range(min(YEARS), max(YEARS) + 1)], names=entity_cols + ['Start_Year'])
+    values = frame.set_index(entity_cols + ['Start_Year'])['Value'].reindex(full)
+    growth = values.groupby(level=entity_cols).pct_change(fill_method=None) * 100
+    return growth.loc[frame.set_index(entity_cols + ['Start_Year']).index].to_numpy()
+
+
+def test_yoy_matches_calendar_pct_change():
+    frame = province_frame()
+    panel = GrowthPanel(frame, ['Region', 'Province'])
+    result = panel.to_frame({'Growth': panel.yoy()})
+    expected = calendar_pct_change(result, ['Region', 'Province'])
+    np.testing.assert_allclose(result['Growth'], expected)
+
+    # NaN in the first year, after the 2022 gap and after South's 2020 gap
+    missing = set(result.loc[result['Growth'].isna(), ['Province', 'Start_Year']].itertuples(index=False, name=None))
+    provinces = [province for names in PROVINCES.values() for province in names]
+    assert missing == {(p, 2018) for p in provinces} | {(p, 2023) for p in provinces} | {('South', 2021)}
+
+def test_mean_yoy_ignores_missing_years():
+    frame = province_frame()
+    panel = GrowthPanel(frame, ['Region', 'Province'])
+    growth = panel.to_frame({'Growth': panel.yoy()})
+    expected = growth.groupby(['Region', 'Province'], sort=True)['Growth'].mean().to_numpy()
+    np.testing.assert_allclose(panel.mean_yoy(), expected)
+
+
+@pytest.mark.parametrize('base, target', [(2018, 2023), (2019, 2021), (2020, 2023)])
+def test_change_and_cagr_between_two_years(base, target):
+    frame = province_frame()
+    panel = GrowthPanel(frame, ['Region', 'Province'])
+    values = frame.pivot_table(index=['Region', 'Province'], columns='Start_Year', values='Value')
+    start, end = values[base].to_numpy(), values[target].to_numpy()
+
+    np.testing.assert_allclose(panel.change(base, target), (end / start - 1) * 100)
+    expected_cagr = [(e / s) ** (1 / (target - base)) * 100 - 100 for s, e in zip(start, end)]
+    np.testing.assert_allclose(panel.cagr(base, target), expected_cagr)
+    # South has no 2020 value
+    south = list(panel.entities['Province']).index('South')
+    assert np.isnan(panel.cagr(base, target)[south]) == (2020 in (base, target))
+
+
+def test_cagr_needs_a_later_target_year():
+    panel = GrowthPanel(province_frame(), ['Region', 'Province'])
+    with pytest.raises(ValueError):
+        panel.cagr(2021, 2021)
+    # A year with no data gives NaN rather than an error
+    assert np.isnan(panel.cagr(2018, 2022)).all()
+
+
+def test_gap_is_child_minus_parent_growth():
+    provinces = province_frame()
+    regions = region_frame(provinces)
+    child = GrowthPanel(provinces, ['Region', 'Province'])
+    parent = GrowthPanel(regions, ['Region'])
+    assert list(child.parent_index(parent)) == [0, 0, 1, 1]
+
+    result = child.to_frame({'Gap': child.gap(parent)})
+    region_growth = regions.assign(Region_Growth=calendar_pct_change(regions, ['Region']))
+    expected = result.merge(region_growth[['Region', 'Start_Year', 'Region_Growth']], on=['Region', 'Start_Year'])
+    expected_gap = calendar_pct_change(result, ['Region', 'Province']) - expected['Region_Growth'].to_numpy()
+    np.testing.assert_allclose(result['Gap'], expected_gap)
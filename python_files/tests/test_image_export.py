@@ -0,0 +1,51 @@
+import os
+import pytest
+from image_export import ImageExporter, check_kaleido
+
+# Set in CI so a missing kaleido or Chrome fails the real export instead of skipping it
+REQUIRED = os.environ.get('EDM_REQUIRE_IMAGE_EXPORT') == '1'
+
+try:
+    check_kaleido()
+except ImportError as e:
+    if REQUIRED:
+        raise
+    pytest.skip(str(e), allow_module_level=True)
+
+from choreographer.browsers.chromium import ChromeNotFoundError
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = ImageExporter(tmp_path, format='png', renderers=2)
+    try:
+        exporter.start()
+    except ChromeNotFoundError as e:
+        if REQUIRED:
+            raise
+        pytest.skip(f"No Chrome for kaleido to drive: {e}")
+    yield exporter
+    exporter.close()
+
+
+def test_renders_a_batch_of_dashboard_charts(dashboard, exporter):
+    figures = {'region_yearly_gdp': dashboard.total_gdp_by_region_yearly(),
+               'regions_industries_heatmap': dashboard.gdp_heatmap_regions_vs_industries()}
+    paths = exporter.write_all(figures)
+    assert exporter.errors == {}
+    for name in figures:
+        with open(paths[name], 'rb') as f:
+            assert f.read(8) == PNG_SIGNATURE
+
+    # The renderer stays up between batches, and unchanged figures are not redrawn
+    kaleido = exporter._kaleido
+    assert exporter.write_all(figures) == paths
+    assert exporter._kaleido is kaleido
+
+
+def test_close_without_renderers():
+    exporter = ImageExporter(format='svg')
+    exporter.close()
+    assert exporter._kaleido is None
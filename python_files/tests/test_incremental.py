@@ -0,0 +1,35 @@
+from incremental import called_helpers, chart_slices, depends_on, method_fingerprint
+
+
+class Charts:
+    @property
+    def rows(self):
+        return self.share_rows()
+
+    def share_rows(self):
+        return 1
+
+    def unused(self):
+        return None
+
+    @depends_on('year:{base_year}', 'year:{target_year}')
+    def chart(self, base_year=2018, target_year=2023):
+        return self.rows
+
+
+class EditedHelperCharts(Charts):
+    # Same chart, edited helper
+    def share_rows(self):
+        return 2
+
+
+def test_chart_fingerprint_follows_helpers():
+    assert called_helpers(Charts, 'chart') == ['chart', 'rows', 'share_rows']
+    assert method_fingerprint(Charts().chart) == method_fingerprint(Charts().chart)
+    assert method_fingerprint(Charts().chart) != method_fingerprint(EditedHelperCharts().chart)
+
+
+def test_chart_slices_follow_arguments():
+    chart = Charts().chart
+    assert chart_slices(chart) == ['year:2018', 'year:2023']
+    assert chart_slices(chart, 2020, target_year=2022) == ['year:2020', 'year:2022']
@@ -0,0 +1,42 @@
+import pandas as pd
+from data_cache import read_meta
+from ingest import ChunkedStore, load_streamed_frame, prepare_frame, read_source
+
+
+def toy_csv(path):
+    """
+    Twelve rows read in chunks of 4: Source is entirely empty in the second chunk,
+    which holds only year numbers in Year_Range, and one row there has no Value
+    """
+    pd.DataFrame({
+        'Industry': ['Mining', 'Construction'] * 6,
+        'Region': ['Region I'] * 6 + ['Region II'] * 6,
+        'Location_Type': ['Region', 'Province'] * 6,
+        'Location_Name': ['Region I', 'Ilocos Norte'] * 3 + ['Region II', 'Batanes'] * 3,
+        'Metric': ['Growth Rate'] * 4 + ['GDP'] * 4 + ['Growth Rate', 'GDP', 'GDP', 'Growth Rate'],
+        'Year_Range': ['2018-2019', '2019-2020', '2018-2019', '2019-2020', 2018, 2019, 2020, 2021,
+                       '2020-2021', 2022, 2023, '2022-2023'],
+        'Start_Year': [2018, 2019, 2018, 2019, 2018, 2019, 2020, 2021, 2020, 2022, 2023, 2022],
+        'End_Year': [2019, 2020, 2019, 2020, 2018, 2019, 2020, 2021, 2021, 2022, 2023, 2023],
+        'Value': [1.5, 2.5, 3.5, 4.5, 100.0, None, 120.0, 130.0, 5.5, 140.0, 150.0, 6.5],
+        'Source': ['PSA', 'PSA', 'RSSO', 'PSA', None, None, None, None, 'RSSO', 'PSA', 'PSA', 'RSSO'],
+    }).to_csv(path, index=False)
+
+
+def test_streamed_frame_matches_eager_prepare(tmp_path):
+    path = str(tmp_path / 'toy.csv')
+    toy_csv(path)
+    eager = prepare_frame(read_source(path))
+
+    streamed = load_streamed_frame(path, chunk_size=4, cache_dir=str(tmp_path / 'cache'))
+    assert len(read_meta(ChunkedStore(path, str(tmp_path / 'cache')).manifest_path)['parts']) == 3
+    pd.testing.assert_frame_equal(streamed, eager, check_index_type=False)
+
+
+def test_streamed_frame_with_a_metric_filter(tmp_path):
+    path = str(tmp_path / 'toy.csv')
+    toy_csv(path)
+    eager = prepare_frame(read_source(path), metrics=['GDP'])
+
+    streamed = load_streamed_frame(path, metrics=['GDP'], chunk_size=4, cache_dir=str(tmp_path / 'cache'))
+    pd.testing.assert_frame_equal(streamed, eager, check_index_type=False)
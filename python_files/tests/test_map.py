@@ -0,0 +1,31 @@
+import pandas as pd
+from EDM import GDPAnalysisDashboard
+
+# Region names as they appear in cleaned_data.xlsx
+REGIONS = [
+    'National Capital Region (NCR)', 'Cordillera Administrative Region (CAR)', 'Region I (Ilocos Region)',
+    'Region II (Cagayan Valley)', 'Region III (Central Luzon)', 'Region IV-A (CALABARZON)',
+    'Region IV-B (MIMAROPA)', 'Region V (Bicol Region)', 'Region VI (Western Visayas)',
+    'Region VII (Central Visayas)', 'Region VIII (Eastern Visayas)', 'Region IX (Zamboanga Peninsula)',
+    'Region X (Northern Mindanao)', 'Region XI (Davao Region)', 'Region XII (SOCCSKSARGEN)',
+    'Region XIII (Caraga)', 'Bangsamoro Autonomous Region in Muslim Mindanao (BARMM)',
+]
+YEARS = [2021, 2022, 2023]
+
+
+def test_regional_gdp_map_covers_every_region():
+    rows = [
+        {'Industry': 'Construction', 'Region': region, 'Location_Type': 'Region', 'Location_Name': region,
+         'Metric': 'GDP', 'Year_Range': year, 'Start_Year': year, 'End_Year': year, 'Value': 1000.0 * (r + 1) + year}
+        for r, region in enumerate(REGIONS) for year in YEARS
+    ]
+    dashboard = GDPAnalysisDashboard.from_frame(pd.DataFrame(rows))
+    dashboard.geometry_url = 'regions.geojson'
+
+    fig = dashboard.regional_gdp_map()
+    [trace] = fig.data
+    assert trace.type == 'choroplethmap'
+    assert sorted(trace.text) == sorted(REGIONS)
+    assert len(set(trace.locations)) == len(REGIONS)
+    assert [step.label for step in fig.layout.sliders[0].steps] == [str(year) for year in YEARS]
+    assert fig.layout.map.style == 'carto-positron'
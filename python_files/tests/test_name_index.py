@@ -0,0 +1,112 @@
+import json
+import numpy as np
+import pytest
+from name_index import REGION_ALIASES, NameIndex
+
+# Feature names as in the region GeoJSON (one per REGION_ALIASES target)
+FEATURES = [
+    'Ilocos', 'Cagayan Valley', 'Central Luzon', 'Calabarzon', 'Mimaropa', 'Bicol', 'Western Visayas',
+    'Central Visayas', 'Eastern Visayas', 'Zamboanga Peninsula', 'Northern Mindanao', 'Davao',
+    'Soccsksargen', 'Caraga', 'Autonomous Region in Muslim Mindanao', 'National Capital Region',
+    'Cordillera Administrative Region',
+]
+
+
+def feature_id(name):
+    return FEATURES.index(name) + 1
+
+
+def region_geojson(features=FEATURES):
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'id': feature_id(name), 'geometry': None,
+         'properties': {'name': name, 'code': f"PH{feature_id(name):02d}"}}
+        for name in features
+    ]}
+
+
+@pytest.fixture
+def geojson_file(tmp_path):
+    path = tmp_path / 'regions.geojson'
+    path.write_text(json.dumps(region_geojson()), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('name, feature', [
+    ('Central Luzon', 'Central Luzon'),
+    ('CENTRAL  LUZON', 'Central Luzon'),
+    ('PH06', 'Bicol'),
+    ('Cagayán Valley', 'Cagayan Valley'),
+])
+def test_canonical_hits(name, feature):
+    index = NameIndex.build(region_geojson())
+    assert index.resolve(name) == feature_id(feature)
+
+
+@pytest.mark.parametrize('name, feature', [
+    ('Region V (Bicol Region)', 'Bicol'),
+    ('National Capital Region (NCR)', 'National Capital Region'),
+    ('Bangsamoro Autonomous Region in Muslim Mindanao (BARMM)', 'Autonomous Region in Muslim Mindanao'),
+    ('Region IV-A (CALABARZON)', 'Calabarzon'),
+    ('Region 12', 'Soccsksargen'),
+])
+def test_alias_hits(name, feature):
+    index = NameIndex.build(region_geojson())
+    assert index.resolve(name) == feature_id(feature)
+    assert index.feature_name(index.resolve(name)) == feature
+
+
+def test_fuzzy_hit():
+    index = NameIndex.build(region_geojson())
+    assert index.resolve('Westren Visayas') == feature_id('Western Visayas')
+    assert index.resolve('Zamboanga Peninsular') == feature_id('Zamboanga Peninsula')
+
+
+def test_near_miss_with_another_numeral_is_unmatched(capsys):
+    index = NameIndex.build(region_geojson())
+    # 'REGION IV' is within the fuzzy cutoff of 'REGION V' and 'REGION IV-A'
+    ids = index.lookup(['Region IV', 'Region V', 'Region IV', 'Region XV'])
+    np.testing.assert_array_equal(ids, [-1, feature_id('Bicol'), -1, -1])
+    assert index.unmatched == ['Region IV', 'Region XV']
+    assert "2 name(s) without a map feature: ['Region IV', 'Region XV']" in capsys.readouterr().out
+
+
+def test_alias_to_a_missing_feature_is_rejected():
+    with pytest.raises(ValueError, match='not a feature name'):
+        NameIndex.build(region_geojson(FEATURES[1:]))
+
+
+def test_persisted_index_is_reused(geojson_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = NameIndex.for_geojson(geojson_file, cache_dir)
+    first.lookup(['Region I (Ilocos Region)', 'Region IV'])
+
+    again = NameIndex.for_geojson(geojson_file, cache_dir)
+    assert again.path == first.path
+    assert again.resolved == {'Region I (Ilocos Region)': feature_id('Ilocos'), 'Region IV': None}
+
+
+def test_changed_geojson_rebuilds_the_index(geojson_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    NameIndex.for_geojson(geojson_file, cache_dir).lookup(['Region IV'])
+
+    changed = region_geojson()
+    changed['features'].append({'type': 'Feature', 'id': 18, 'geometry': None,
+                                'properties': {'name': 'Negros Island Region', 'code': 'PH18'}})
+    with open(geojson_file, 'w', encoding='utf-8') as f:
+        json.dump(changed, f)
+
+    rebuilt = NameIndex.for_geojson(geojson_file, cache_dir)
+    assert rebuilt.resolved == {}
+    assert rebuilt.resolve('Negros Island Region') == 18
+
+
+def test_changed_aliases_rebuild_the_index(geojson_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    NameIndex.for_geojson(geojson_file, cache_dir).lookup(['Region IV'])
+
+    aliases = dict(REGION_ALIASES, **{'REGION IV': 'Calabarzon'})
+    rebuilt = NameIndex.for_geojson(geojson_file, cache_dir, aliases=aliases)
+    assert rebuilt.resolved == {}
+    assert rebuilt.resolve('Region IV') == feature_id('Calabarzon')
+    # The default table is a different index again
+    assert NameIndex.for_geojson(geojson_file, cache_dir).resolve('Region IV') is None
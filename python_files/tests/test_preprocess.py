@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from preprocess import CLEANED_COLUMNS, clean_workbook, parse_year_ranges
+
+TITLE = ['Gross Regional Domestic Product by Industry', None, None, None, None, None]
+METRICS = [None, None, 'GDP', None, 'Growth Rate', None]
+UNITS = [None, None, 'at constant 2018 prices', None, 'in percent', None]
+PERIODS = [None, None, 2018, 2019, '2018-2019', '2019-2020']
+
+# Industry headings sit on the first row of their block; sub-locations are dot-indented
+DATA = [
+    ['Construction', 'National Capital Region (NCR)', 100.0, 110.0, 5.0, 10.0],
+    [None, '..City of Manila', 40.0, '/s', 2.0, '/s'],
+    [None, 'Cordillera Administrative Region (CAR)', 50.0, 55.0, 1.0, 10.0],
+    [None, '..Benguet', 20.0, 22.0, 3.0, 10.0],
+    [None, '..Benguet', 20.0, 22.0, 3.0, 10.0],
+    ['Mining and Quarrying', 'MIMAROPA Region', 7.0, 'n.a.', 4.0, 6.0],
+    [None, '..Province of Palawan', 3.0, 4.0, None, 33.3],
+    ['Note:', '/s - suppressed', None, None, None, None],
+]
+
+LAYOUTS = {
+    'three_row_header': [TITLE, METRICS, PERIODS],
+    'four_row_header': [TITLE, METRICS, UNITS, PERIODS],
+}
+
+
+def expected_rows():
+    """
+    The cleaned rows built by hand: hierarchy per location, then melted column by column
+    """
+    locations = pd.DataFrame({
+        'Industry': ['Construction'] * 5 + ['Mining and Quarrying'] * 2,
+        'Region': ['National Capital Region (NCR)'] * 2 + ['Cordillera Administrative Region (CAR)'] * 3
+                  + ['Region IV-B (MIMAROPA)'] * 2,
+        'Location_Type': ['Region', 'City', 'Region', 'Province', 'Province', 'Region', 'Province'],
+        'Location_Name': ['National Capital Region (NCR)', 'City of Manila', 'Cordillera Administrative Region (CAR)',
+                          'Benguet', 'Benguet', 'Region IV-B (MIMAROPA)', 'Province of Palawan'],
+    })
+    columns = [('GDP', '2018', 2018, 2018), ('GDP', '2019', 2019, 2019),
+               ('Growth Rate', '2018-2019', 2018, 2019), ('Growth Rate', '2019-2020', 2019, 2020)]
+    values = [[100, 40, 50, 20, 20, 7, 3], [110, np.nan, 55, 22, 22, np.nan, 4],
+              [5, 2, 1, 3, 3, 4, np.nan], [10, np.nan, 10, 10, 10, 6, 33.3]]
+    frames = [locations.assign(Metric=metric, Year_Range=label, Start_Year=start, End_Year=end, Value=column)
+              for (metric, label, start, end), column in zip(columns, values)]
+    expected = pd.concat(frames, ignore_index=True)[CLEANED_COLUMNS]
+    for col in ['Start_Year', 'End_Year']:
+        expected[col] = expected[col].astype('Int64')
+    return expected
+
+
+@pytest.fixture(params=[(layout, ext) for layout in LAYOUTS for ext in ('.xlsx', '.csv')],
+                ids=lambda param: f"{param[0]}{param[1]}")
+def raw_source(request, tmp_path):
+    layout, ext = request.param
+    raw = pd.DataFrame(LAYOUTS[layout] + DATA)
+    path = str(tmp_path / f"raw{ext}")
+    if ext == '.csv':
+        raw.to_csv(path, header=False, index=False)
+    else:
+        raw.to_excel(path, header=False, index=False)
+    return path
+
+
+def test_clean_workbook_rows(raw_source, tmp_path):
+    out_file = str(tmp_path / 'cleaned.csv')
+    cleaned, _ = clean_workbook(raw_source, out_file)
+    expected = expected_rows()
+    pd.testing.assert_frame_equal(cleaned.reset_index(drop=True), expected, check_dtype=False)
+    pd.testing.assert_frame_equal(pd.read_csv(out_file), expected, check_dtype=False)
+
+
+def test_clean_workbook_report(raw_source):
+    _, report = clean_workbook(raw_source)
+    assert report['locations'] == 7 and report['value_columns'] == 4 and report['rows'] == 28
+    assert report['metrics'] == ['GDP', 'Growth Rate']
+    assert report['year_ranges'] == ['2018', '2019', '2018-2019', '2019-2020']
+    assert report['note_rows'] == ['/s - suppressed']
+    assert report['suppressed_values'] == 2
+    assert report['non_numeric_values'] == 1 and report['non_numeric_samples'] == ['n.a.']
+    # Four value columns for the repeated Benguet row
+    assert report['duplicate_rows'] == 4
+    # Two suppressed, one 'n.a.' and one empty cell
+    assert report['missing_values'] == 4
+    assert report['unparsed_year_ranges'] == [] and report['reversed_year_ranges'] == []
+    assert not report['ok']
+
+
+def test_parse_year_ranges():
+    years = parse_year_ranges(['2018', '2018-2019', ' 2019 – 2020 ', 2021, 'Q1 2020', '2018', None])
+    assert years['Start_Year'].tolist() == [2018, 2018, 2019, 2021, pd.NA, 2018, pd.NA]
+    assert years['End_Year'].tolist() == [2018, 2019, 2020, 2021, pd.NA, 2018, pd.NA]
+    assert str(years['Start_Year'].dtype) == 'Int64'
@@ -0,0 +1,113 @@
+import json
+import pickle
+import threading
+import pytest
+from profiling import NullProfiler, Profiler, profiled
+
+
+class Job:
+    """
+    A stand-in for the dashboard: a profiler attribute and @profiled methods
+    """
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+
+    @profiled('render', 'chart')
+    def render(self, size):
+        return 'x' * size
+
+
+def nested_stages(profiler, name, barrier=None):
+    with profiler.stage(f"{name}:outer", 'build', worker=name):
+        with profiler.stage(f"{name}:inner"):
+            if barrier is not None:
+                # Every thread is inside its inner stage at once
+                barrier.wait()
+
+
+def test_nested_stages_per_thread():
+    profiler = Profiler()
+    barrier = threading.Barrier(3)
+    threads = [threading.Thread(target=nested_stages, args=(profiler, f"t{i}", barrier)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    by_stage = {record['stage']: record for record in profiler.stages}
+    assert len(by_stage) == 6
+    for i in range(3):
+        outer, inner = by_stage[f"t{i}:outer"], by_stage[f"t{i}:inner"]
+        # Each thread has its own stack: every inner stage is one level below its outer one
+        assert (outer['depth'], inner['depth']) == (0, 1)
+        assert outer['thread'] == inner['thread']
+        assert outer['worker'] == f"t{i}" and outer['category'] == 'build'
+        assert outer['start_seconds'] <= inner['start_seconds']
+        assert inner['start_seconds'] + inner['seconds'] <= outer['start_seconds'] + outer['seconds'] + 1e-6
+    assert len({record['thread'] for record in profiler.stages}) == 3
+
+
+def test_errors_are_recorded_and_raised():
+    profiler = Profiler()
+    with pytest.raises(KeyError):
+        with profiler.stage('lookup'):
+            {}['missing']
+    [record] = profiler.stages
+    assert record['error'] == "KeyError: 'missing'"
+
+
+def test_profiled_records_output_size():
+    profiler = Profiler()
+    assert Job(profiler).render(1500) == 'x' * 1500
+    [record] = profiler.stages
+    assert (record['stage'], record['category'], record['output_bytes']) == ('render', 'chart', 1500)
+    # Without a profiler the method runs unmeasured
+    assert Job().render(3) == 'xxx'
+
+
+def test_traced_memory_of_nested_stages():
+    profiler = Profiler(trace_memory=True)
+    with profiler.stage('outer'):
+        with profiler.stage('inner'):
+            block = bytearray(8_000_000)
+        del block
+    inner, outer = profiler.stages
+    assert inner['traced_peak_bytes'] >= 8_000_000
+    assert outer['traced_peak_bytes'] >= inner['traced_peak_bytes']
+
+
+def test_json_and_chrome_trace_export(tmp_path):
+    profiler = Profiler()
+    nested_stages(profiler, 'main')
+    Job(profiler).render(10)
+
+    data = profiler.to_json(str(tmp_path / 'stages.json'))
+    with open(tmp_path / 'stages.json') as f:
+        assert json.load(f) == data
+    assert [record['stage'] for record in data['stages']] == ['main:inner', 'main:outer', 'render']
+
+    trace = profiler.to_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(tmp_path / 'trace.json') as f:
+        assert json.load(f) == trace
+    events = {event['name']: event for event in trace['traceEvents']}
+    assert set(events) == {'main:inner', 'main:outer', 'render'}
+    for record in profiler.stages:
+        event = events[record['stage']]
+        assert event['ph'] == 'X' and event['cat'] == record['category'] and event['tid'] == record['thread']
+        assert event['ts'] == round(record['start_seconds'] * 1e6)
+        assert event['dur'] == round(record['seconds'] * 1e6)
+        assert event['args']['depth'] == record['depth']
+    # The inner event lies within the outer one on the same track
+    outer, inner = events['main:outer'], events['main:inner']
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'] + 1
+    assert events['render']['args']['output_bytes'] == 10
+    assert events['main:outer']['args']['worker'] == 'main'
+
+
+def test_pickled_profiler_becomes_null_profiler():
+    profiler = Profiler()
+    job = pickle.loads(pickle.dumps(Job(profiler)))
+    assert isinstance(job.profiler, NullProfiler)
+    # Work done by the copy (as in a worker process) records nothing
+    assert job.render(5) == 'xxxxx'
+    assert profiler.stages == [] and job.profiler.stages == []
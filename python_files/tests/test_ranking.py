@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ranking import top_n, bottom_n, TIES
+
+
+def tied_frame(seed=0, rows=300):
+    """
+    Values drawn from a handful of levels, so most groups have ties across the cut,
+    plus a few missing values and missing group keys
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.choice([1.0, 2.0, 3.0, 5.0, 8.0], size=rows)
+    values[rng.choice(rows, size=10, replace=False)] = np.nan
+    groups = rng.choice(['b', 'c', 'a', 'd', None], size=rows, p=[0.3, 0.3, 0.2, 0.15, 0.05])
+    frame = pd.DataFrame({'Region': groups, 'Value': values})
+    frame.index = rng.permutation(rows)
+    return frame
+
+
+def pandas_ranking(frame, k, largest, ties, sort_groups):
+    pick = (lambda g: g.nlargest(k, 'Value', keep=ties)) if largest else (lambda g: g.nsmallest(k, 'Value', keep=ties))
+    return pd.concat([pick(group) for _, group in frame.groupby('Region', sort=sort_groups)])
+
+
+@pytest.mark.parametrize('ties', TIES)
+@pytest.mark.parametrize('largest', [True, False])
+@pytest.mark.parametrize('sort_groups', [True, False])
+@pytest.mark.parametrize('k', [1, 3, 10])
+def test_ranking_matches_pandas_with_ties(k, largest, ties, sort_groups):
+    frame = tied_frame()
+    rank = top_n if largest else bottom_n
+    pd.testing.assert_frame_equal(rank(frame, 'Region', 'Value', k, ties, sort_groups),
+                                  pandas_ranking(frame, k, largest, ties, sort_groups))
+
+
+def test_rank_col_counts_within_each_group():
+    ranked = top_n(tied_frame(), 'Region', 'Value', k=4, rank_col='Rank')
+    assert (ranked.groupby('Region')['Rank'].agg(list) == [[1, 2, 3, 4]] * 4).all()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+from reconcile import METHODS, reconcile, summing_matrix
+
+# national -> 2 regions -> 2 and 3 provinces
+TOY_PARENTS = np.array([-1, 0, 0, 1, 1, 2, 2, 2])
+
+
+def toy_inputs(seed=0):
+    rng = np.random.default_rng(seed)
+    S, leaves = summing_matrix(TOY_PARENTS)
+    history = S @ rng.uniform(50, 150, size=(len(leaves), 6))
+    # Incoherent base forecasts for 4 periods, with one period missing a node
+    base = S @ rng.uniform(50, 150, size=(len(leaves), 4)) + rng.normal(0, 10, size=(len(TOY_PARENTS), 4))
+    base[3, 2] = np.nan
+    variances = rng.uniform(1, 20, size=len(TOY_PARENTS))
+    return base, history, variances
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_reconciled_forecasts_are_coherent(method):
+    base, history, variances = toy_inputs()
+    S, leaves = summing_matrix(TOY_PARENTS)
+    reconciled = reconcile(base, TOY_PARENTS, method, history, variances)
+
+    complete = ~np.isnan(base).any(axis=0)
+    np.testing.assert_allclose(reconciled[:, complete], S @ reconciled[leaves][:, complete])
+    # A period with a missing node is left as it was
+    np.testing.assert_array_equal(reconciled[:, ~complete], base[:, ~complete])
+
+
+def test_unknown_method():
+    base, _, _ = toy_inputs()
+    with pytest.raises(ValueError):
+        reconcile(base, TOY_PARENTS, 'middle_out')
@@ -0,0 +1,45 @@
+import json
+import asyncio
+import pytest
+from serve import ChartServer
+
+
+async def get(port, path, headers=None):
+    """
+    (status, headers, body) of one GET request
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), response_headers, body
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_serve_chart_etag_and_unknown_chart(dashboard, workers):
+    async def run():
+        server = ChartServer(dashboard, port=0, workers=workers, executor='thread')
+        await server.start()
+        try:
+            ok = await get(server.port, '/charts/region_yearly_gdp.json')
+            cached = await get(server.port, '/charts/region_yearly_gdp.json', {'If-None-Match': ok[1]['etag']})
+            missing = await get(server.port, '/charts/no_such_chart.json')
+        finally:
+            await server.close()
+        return ok, cached, missing
+
+    ok, cached, missing = asyncio.run(run())
+    assert ok[0] == 200
+    assert ok[1]['content-type'] == 'application/json'
+    assert 'data' in json.loads(ok[2])
+    assert cached[0] == 304 and cached[2] == b''
+    assert missing[0] == 404
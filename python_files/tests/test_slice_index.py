@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from geography import LEVEL_CODES, level_codes
+from slice_index import SliceIndex, split_by
+
+
+def toy_frame(seed=0, rows=200):
+    """
+    Shuffled rows over 3 regions (some rows without one), 3 industries, 4 years and both levels
+    """
+    rng = np.random.default_rng(seed)
+    regions = rng.choice(['Region I', 'Region II', 'Region III', None], size=rows, p=[0.3, 0.3, 0.3, 0.1])
+    df = pd.DataFrame({
+        'Region': pd.Categorical(regions),
+        'Industry': pd.Categorical(rng.choice(['Mining', 'Construction', 'Fishing'], size=rows)),
+        'Location_Type': pd.Categorical(rng.choice(['Region', 'Province', 'City'], size=rows)),
+        'Location_Name': pd.Categorical(rng.choice(['A', 'B', 'C', 'D'], size=rows)),
+        'Start_Year': rng.choice([2020, 2021, 2022, 2023], size=rows),
+        'Value': rng.uniform(0, 100, size=rows),
+    })
+    # A non-default index, so positions and labels differ
+    df.index = rng.permutation(rows) * 10
+    return df
+
+
+def test_group_offsets_match_groupby():
+    df = toy_frame()
+    index = SliceIndex(df)
+    keys = pd.DataFrame({'level': level_codes(df['Location_Type']), 'Region': df['Region'],
+                         'Industry': df['Industry'], 'Start_Year': df['Start_Year']})
+    groups = keys.groupby(['level', 'Region', 'Industry', 'Start_Year'], observed=True, dropna=False).indices
+    assert index.offsets[-1] == len(df)
+
+    for (level, region, industry, year), positions in groups.items():
+        group = np.ravel_multi_index((
+            level,
+            0 if pd.isna(region) else index.region_codes[region],
+            index.industry_codes[industry],
+            np.searchsorted(index.years, year),
+        ), index.shape)
+        # Rows of a group keep their original order
+        np.testing.assert_array_equal(index.order[index.offsets[group]:index.offsets[group + 1]], positions)
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'region': 'Region II'},
+    {'region': ['Region I', 'Region III'], 'industry': 'Mining'},
+    {'years': [2021, 2023], 'level': 'province'},
+    {'region': 'Region I', 'years': 2022, 'location': ['A', 'C']},
+    {'region': 'No such region'},
+])
+def test_query_matches_boolean_masks(filters):
+    df = toy_frame()
+    mask = np.ones(len(df), dtype=bool)
+    for col, key in [('Region', 'region'), ('Industry', 'industry'), ('Start_Year', 'years'), ('Location_Name', 'location')]:
+        if key in filters:
+            values = filters[key] if isinstance(filters[key], list) else [filters[key]]
+            mask &= df[col].isin(values).to_numpy()
+    if 'level' in filters:
+        mask &= level_codes(df['Location_Type']) == LEVEL_CODES[filters['level']]
+
+    pd.testing.assert_frame_equal(SliceIndex(df).query(**filters), df[mask])
+
+
+def test_split_by_matches_groupby():
+    df = toy_frame()
+    groups = df.groupby('Region', observed=True, sort=False)
+    split = list(split_by(df, 'Region'))
+    assert [value for value, _ in split] == list(df['Region'].dropna().unique())
+    for value, rows in split:
+        pd.testing.assert_frame_equal(rows, groups.get_group(value))